@@ -1,5 +1,5 @@
 import streamlit as st
-from utils.llm_engine import render_api_key_input, render_privacy_notice
+from utils.llm_engine import render_api_key_input, render_privacy_notice, get_daily_usage, DAILY_LIMIT
 
 # ==========================================
 # 全局页面配置
@@ -23,8 +23,6 @@ if 'user_profile' not in st.session_state:
         'experience_years': 0,
         'risk_preference': '稳健'
     }
-if 'daily_usage' not in st.session_state:
-    st.session_state['daily_usage'] = 0
 
 # ==========================================
 # 侧边栏：API配置 + 隐私声明 + 使用限制
@@ -330,4 +328,4 @@ footer_cols = st.columns([3, 1])
 with footer_cols[0]:
     st.caption("基于马江博周期共振理论构建 | 仅供职业规划研究参考")
 with footer_cols[1]:
-    st.caption(f"今日使用次数: {st.session_state['daily_usage']} / 20")
+    st.caption(f"今日使用次数: {get_daily_usage()} / {DAILY_LIMIT}")
@@ -1,18 +1,33 @@
 import streamlit as st
-import re
 import sys
 import os
 
 # 确保能正确引入 utils 模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.llm_engine import render_api_key_input, render_privacy_notice, get_deepseek_client, increment_usage
+from utils.llm_engine import render_api_key_input, render_privacy_notice, get_deepseek_client, get_api_key, increment_usage
 from utils.rag_engine import get_rag_engine
-from utils.data_processor import load_industry_data, get_growth_industries
+from utils.resume_analyzer import (
+    empty_parse_result,
+    get_parsed_industries,
+    get_experience_list,
+    get_current_industry,
+    analyze_industry_risks,
+    get_transition_recommendations
+)
+from utils.diagnosis_pipeline import DiagnosisPipeline
+from utils.exposure_engine import score_exposure
+from utils.document_extractor import (
+    extract_document_text,
+    SUPPORTED_EXTENSIONS,
+    MAX_UPLOAD_BYTES,
+    MAX_PDF_PAGES,
+    MAX_TEXT_CHARS
+)
 
 st.set_page_config(page_title="简历诊断中心", page_icon="📄", layout="wide")
 
 st.title("📄 简历诊断中心：AI识别行业风险并推荐方向")
-st.markdown("粘贴您的简历内容，AI将提取您的过往行业经历，自动与周期数据库对比，识别风险并推荐适合的转型方向。")
+st.markdown("粘贴或上传您的简历，AI将提取您的过往行业经历，自动与周期数据库对比，识别风险并推荐适合的转型方向。")
 
 # 渲染 API Key 和隐私声明
 render_api_key_input()
@@ -47,6 +62,35 @@ resume_text = st.text_area(
 """
 )
 
+# ==========================================
+# 简历文件上传（可选）
+# ==========================================
+uploaded_resume = st.file_uploader(
+    f"📎 或上传简历文件（{' / '.join(ext.upper() for ext in SUPPORTED_EXTENSIONS)}，"
+    f"不超过 {MAX_UPLOAD_BYTES // 1024 // 1024}MB，PDF 最多读取前 {MAX_PDF_PAGES} 页）：",
+    type=list(SUPPORTED_EXTENSIONS)
+)
+
+if uploaded_resume is not None:
+    if uploaded_resume.size > MAX_UPLOAD_BYTES:
+        st.error(f"⚠️ 文件过大，上限为 {MAX_UPLOAD_BYTES // 1024 // 1024}MB")
+    else:
+        with st.spinner("正在提取简历文件内容..."):
+            extracted = extract_document_text(uploaded_resume.name, uploaded_resume.getvalue())
+        
+        if extracted.get("error"):
+            st.error(f"⚠️ {extracted['error']}")
+        else:
+            page_note = f"{extracted['pages']}/{extracted['total_pages']} 页，" if extracted['total_pages'] > 1 else ""
+            st.success(f"✅ 已提取 {uploaded_resume.name}（{page_note}{len(extracted['text'])} 字）")
+            if extracted["truncated"]:
+                st.caption(f"文件较长，仅读取了前 {extracted['pages']} 页 / {MAX_TEXT_CHARS} 字")
+            with st.expander("查看提取的文本"):
+                st.text(extracted["text"])
+            
+            # 未粘贴文本时使用文件内容；两者都有时合并分析
+            resume_text = f"{resume_text}\n\n{extracted['text']}" if resume_text.strip() else extracted["text"]
+
 # ==========================================
 # 快速行业选择（可选）
 # ==========================================
@@ -72,222 +116,17 @@ with col2:
         custom_industry = ""
 
 # ==========================================
-# 简历解析函数
-# ==========================================
-def parse_resume_with_llm(resume_text: str) -> dict:
-    """使用LLM解析简历内容"""
-    if not resume_text or len(resume_text.strip()) < 20:
-        return {"error": "简历内容太短，无法解析"}
-    
-    client = get_deepseek_client()
-    
-    prompt = f"""请从以下简历中提取关键信息，以JSON格式返回：
-
-简历内容：
-{resume_text[:4000]}
-
-请提取以下字段：
-1. industries: 行业经历列表（每个包含 name行业名称, period时间段, role职位）
-2. skills: 核心技能列表（字符串数组）
-3. total_years: 工作年限（数字或字符串）
-4. education: 最高学历
-5. current_role: 当前/最近职位
-
-注意：
-- 如果找不到某字段，返回空字符串或空数组
-- 行业名称请尽量标准，如"房地产"、"互联网"、"金融"等
-- 必须返回有效的JSON格式
-
-返回示例：
-{{
-    "industries": [
-        {{"name": "房地产", "period": "2018-2022", "role": "项目经理"}},
-        {{"name": "建筑", "period": "2022-至今", "role": "高级工程师"}}
-    ],
-    "skills": ["项目管理", "工程管理", "团队协调"],
-    "total_years": "6年",
-    "education": "本科",
-    "current_role": "高级工程师"
-}}"""
-    
-    try:
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": "你是一个专业的简历解析助手，擅长从简历中提取结构化信息，只返回JSON格式。"},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1500
-        )
-        
-        import json
-        result_text = response.choices[0].message.content
-        
-        # 尝试提取JSON
-        try:
-            # 查找JSON代码块
-            json_block = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
-            if json_block:
-                return json.loads(json_block.group(1))
-            
-            # 查找普通JSON对象
-            json_match = re.search(r'\{[\s\S]*\}', result_text)
-            if json_match:
-                return json.loads(json_match.group())
-            
-            # 直接解析
-            return json.loads(result_text)
-        except json.JSONDecodeError:
-            return {
-                "industries": [],
-                "skills": [],
-                "parse_error": True,
-                "raw_response": result_text
-            }
-            
-    except Exception as e:
-        return {"error": str(e)}
-
-
-def extract_industries_from_text(text: str) -> list:
-    """从文本中提取行业关键词（备用方案）"""
-    industry_keywords = {
-        "房地产": ["房地产", "地产", "置业", "万科", "碧桂园", "恒大"],
-        "建筑": ["建筑", "施工", "基建", "中建", "中铁", "承包商"],
-        "互联网": ["互联网", "IT", "软件", "阿里", "腾讯", "字节", "美团"],
-        "金融": ["金融", "银行", "证券", "保险", "基金", "投资"],
-        "制造业": ["制造", "生产", "工厂", "工业", "汽车", "电子"],
-        "教育": ["教育", "培训", "学校", "教培", "新东方", "学而思"],
-        "医疗": ["医疗", "医药", "医院", "制药", "器械", "健康"],
-        "零售": ["零售", "电商", "超市", "商场", "销售", "贸易"],
-        "能源": ["能源", "电力", "石油", "煤炭", "新能源", "光伏"],
-        "传媒": ["传媒", "广告", "媒体", "影视", "出版", "新闻"],
-    }
-    
-    found_industries = []
-    for industry, keywords in industry_keywords.items():
-        for keyword in keywords:
-            if keyword in text:
-                found_industries.append(industry)
-                break
-    
-    return list(set(found_industries))  # 去重
-
-
-# ==========================================
-# 行业风险分析
+# 诊断按钮
 # ==========================================
-def analyze_industry_risks(industries: list) -> dict:
-    """分析行业风险"""
-    rag_engine = get_rag_engine()
-    
-    risk_analysis = {
-        "高风险": [],
-        "中风险": [],
-        "低风险": [],
-        "未识别": []
-    }
-    
-    for industry in industries:
-        results = rag_engine.search_industry(industry, top_k=1)
-        if results:
-            result = results[0]
-            stage = result['当前周期阶段']
-            sentiment = result['未来1-3年景气度']
-            
-            if stage in ['调整期', '衰退期'] or '承压' in sentiment:
-                risk_analysis["高风险"].append({
-                    "industry": industry,
-                    "stage": stage,
-                    "sentiment": sentiment,
-                    "warning": rag_engine.get_risk_warning(industry)
-                })
-            elif stage == '成熟期' and '平稳' in sentiment:
-                risk_analysis["中风险"].append({
-                    "industry": industry,
-                    "stage": stage,
-                    "sentiment": sentiment
-                })
-            else:
-                risk_analysis["低风险"].append({
-                    "industry": industry,
-                    "stage": stage,
-                    "sentiment": sentiment
-                })
-        else:
-            risk_analysis["未识别"].append(industry)
-    
-    return risk_analysis
+def _live_risk_label(result) -> str:
+    """实时列表中的风险状态：查询中 / 查询失败 / 风险等级"""
+    if result is None:
+        return "查询中…"
+    if isinstance(result, Exception):
+        return "查询失败"
+    return result[0]
 
 
-# ==========================================
-# 推荐转型方向
-# ==========================================
-def get_transition_recommendations(current_industries: list, skills: list = None) -> list:
-    """获取转型推荐"""
-    rag_engine = get_rag_engine()
-    df = load_industry_data()
-    
-    growth_industries = get_growth_industries(df)
-    
-    recommendations = []
-    
-    # 行业映射关系
-    skill_mappings = {
-        "房地产": ["智慧城市", "养老产业", "物业管理", "房地产科技"],
-        "建筑": ["光伏基建", "储能", "虚拟电厂", "智能建造"],
-        "传统制造": ["智能制造", "工业机器人", "新能源装备", "半导体设备"],
-        "教培": ["职业教育", "企业培训", "知识付费", "教育科技"],
-        "互联网": ["人工智能", "SaaS", "产业互联网", "云计算"],
-        "金融": ["金融科技", "绿色金融", "数字人民币", "区块链金融"],
-        "传媒": ["短视频", "直播电商", "AIGC内容", "数字营销"],
-        "能源": ["新能源", "储能", "氢能", "碳中和"],
-        "零售": ["电商", "直播带货", "跨境电商", "新零售"],
-        "医疗": ["生物医药", "医疗器械", "数字医疗", "AI医疗"]
-    }
-    
-    for industry in current_industries:
-        for key, targets in skill_mappings.items():
-            if key in industry:
-                for target in targets:
-                    target_data = rag_engine.search_industry(target, top_k=1)
-                    if target_data:
-                        cycle_stage = target_data[0]['当前周期阶段']
-                        if cycle_stage in ['成长期', '初创期']:
-                            recommendations.append({
-                                "from": industry,
-                                "to": target,
-                                "reason": f"{key}行业经验可迁移至{target}",
-                                "cycle_stage": cycle_stage,
-                                "sentiment": target_data[0]['未来1-3年景气度']
-                            })
-    
-    # 如果没有特定匹配，返回通用推荐
-    if not recommendations:
-        for ind in growth_industries[:5]:
-            recommendations.append({
-                "from": current_industries[0] if current_industries else "当前行业",
-                "to": ind['行业名称'],
-                "reason": "当前处于成长期，人才需求旺盛",
-                "cycle_stage": ind['周期阶段'],
-                "sentiment": ind['景气度']
-            })
-    
-    # 去重
-    seen = set()
-    unique_recommendations = []
-    for rec in recommendations:
-        if rec['to'] not in seen:
-            seen.add(rec['to'])
-            unique_recommendations.append(rec)
-    
-    return unique_recommendations[:5]
-
-
-# ==========================================
-# 诊断按钮
-# ==========================================
 st.markdown("---")
 
 if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"):
@@ -301,34 +140,54 @@ if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"
     
     # 检查是否有输入
     if not resume_text.strip() and not industries_from_select:
-        st.error("⚠️ 请粘贴简历内容或选择您所在的行业")
+        st.error("⚠️ 请粘贴或上传简历内容，或选择您所在的行业")
     else:
         with st.spinner("正在分析简历并识别行业风险..."):
             try:
                 increment_usage()
                 
-                # 解析简历
+                # 诊断流水线：本地提取、关键词识别与行业风险查询立即在后台开始，与 AI 解析并行；
+                # 后台线程不调用界面，这里在主线程中按事件到达顺序渲染
+                pipeline = DiagnosisPipeline(
+                    resume_text, industries_from_select,
+                    client=get_deepseek_client() if resume_text.strip() and get_api_key() else None
+                )
+                parsed = empty_parse_result()
                 if resume_text.strip():
                     st.info("📝 正在解析简历内容...")
-                    parsed = parse_resume_with_llm(resume_text)
+                    live_placeholder = st.empty()
+                    live_industries, live_risks, live_skills = [], {}, []
+                    for kind, payload in pipeline.events():
+                        if kind == "done":
+                            parsed = payload
+                            break
+                        if kind == "local":
+                            live_industries += [n for n in get_parsed_industries(payload) if n not in live_industries]
+                        elif kind == "industry" and payload["name"] not in live_industries:
+                            live_industries.append(payload["name"])
+                        elif kind == "risk":
+                            live_risks[payload[0]] = payload[1]
+                        elif kind == "skill":
+                            live_skills.append(str(payload))
+                        lines = [
+                            f"- **{name}**（{_live_risk_label(live_risks.get(name))}）" for name in live_industries
+                        ]
+                        if lines or live_skills:
+                            live_placeholder.markdown(
+                                "**已识别行业：**\n" + "\n".join(lines)
+                                + (f"\n\n**已识别技能：** {'、'.join(live_skills)}" if live_skills else "")
+                            )
+                    live_placeholder.empty()
                     
-                    # 如果LLM解析失败，使用备用方案
-                    if parsed.get("error") or parsed.get("parse_error"):
+                    if parsed.get("source") == "local":
+                        st.caption(f"⚡ 已通过本地规则识别简历（置信度 {parsed['confidence']:.0%}），未调用 AI 解析")
+                    elif parsed.get("fallback") or parsed.get("error"):
+                        # LLM 解析失败时使用备用识别方案（已与本地提取结果合并）
                         st.warning("使用备用识别方案...")
-                        extracted = extract_industries_from_text(resume_text)
-                        parsed = {
-                            "industries": [{"name": ind, "period": "", "role": ""} for ind in extracted],
-                            "skills": [],
-                            "total_years": "",
-                            "education": "",
-                            "current_role": ""
-                        }
-                else:
-                    parsed = {"industries": [], "skills": [], "total_years": "", "education": "", "current_role": ""}
                 
                 # 合并行业信息
-                parsed_industries = [ind.get("name", "") for ind in parsed.get("industries", []) if isinstance(ind, dict)]
-                all_industries = list(set(industries_from_select + parsed_industries))
+                parsed_industries = get_parsed_industries(parsed)
+                all_industries = list(dict.fromkeys(industries_from_select + parsed_industries))
                 
                 # 显示解析结果
                 st.markdown("---")
@@ -363,9 +222,35 @@ if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"
                     st.markdown("---")
                     st.markdown("### ⚠️ 行业风险分析")
                     
-                    risk_analysis = analyze_industry_risks(all_industries)
+                    # 风险卡片按查询完成顺序逐个显示，全部完成后再填入统计
+                    risk_count_placeholder = st.empty()
+                    risk_card_area = st.container()
+                    known_risks, high_risk_shown = {}, 0
+                    for industry, result in pipeline.iter_risks(all_industries):
+                        known_risks[industry] = result
+                        level, item = result
+                        if level != "高风险":
+                            continue
+                        if not high_risk_shown:
+                            risk_card_area.error("🚨 **红色预警：检测到高风险行业！**")
+                        high_risk_shown += 1
+                        warning = item.get('warning', {})
+                        with risk_card_area.container(border=True):
+                            st.markdown(f"🚨 **{item['industry']}** - {item['stage']}")
+                            st.markdown(f"景气度：**{item['sentiment']}**")
+                            if warning:
+                                st.markdown(f"💡 **建议**：{warning.get('建议', '建议尽早规划转型')}")
+                                
+                                # 显示推荐转型方向
+                                if warning.get('推荐方向'):
+                                    st.markdown("**推荐方向**：")
+                                    for rec in warning['推荐方向'][:3]:
+                                        st.markdown(f"- {rec['行业名称']}（{rec['周期阶段']}）")
+                    risk_analysis = analyze_industry_risks(all_industries, known=known_risks)
+                    if pipeline.failed_risks:
+                        st.caption(f"⚠️ 以下行业的风险查询失败，已按未识别处理：{'、'.join(pipeline.failed_risks)}")
                     
-                    risk_cols = st.columns(4)
+                    risk_cols = risk_count_placeholder.container().columns(4)
                     
                     with risk_cols[0]:
                         count = len(risk_analysis['高风险'])
@@ -380,24 +265,28 @@ if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"
                         count = len(risk_analysis['未识别'])
                         st.info(f"⚪ 未识别：{count} 个")
                     
-                    # 详细风险信息
-                    if risk_analysis["高风险"]:
-                        st.markdown("---")
-                        st.error("🚨 **红色预警：检测到高风险行业！**")
-                        
-                        for item in risk_analysis["高风险"]:
-                            warning = item.get('warning', {})
-                            with st.container(border=True):
-                                st.markdown(f"**{item['industry']}** - {item['stage']}")
-                                st.markdown(f"景气度：**{item['sentiment']}**")
-                                if warning:
-                                    st.markdown(f"💡 **建议**：{warning.get('建议', '建议尽早规划转型')}")
-                                    
-                                    # 显示推荐转型方向
-                                    if warning.get('推荐方向'):
-                                        st.markdown("**推荐方向**：")
-                                        for rec in warning['推荐方向'][:3]:
-                                            st.markdown(f"- {rec['行业名称']}（{rec['周期阶段']}）")
+                    # 任职加权的风险暴露：任职越久、越近期的行业占比越高
+                    exposure = score_exposure(get_experience_list(parsed, industries_from_select))
+                    if exposure["score"] is not None:
+                        exposure_cols = st.columns([1, 2])
+                        with exposure_cols[0]:
+                            st.metric(
+                                "📊 职业风险暴露度", f"{exposure['score']:.0f} / 100",
+                                help="按各行业的任职时长与近期程度加权周期阶段和景气度风险，越高表示职业积累越集中在下行行业"
+                            )
+                            st.caption(f"{exposure['level']}｜可评估经历占比 {exposure['coverage']:.0%}")
+                        with exposure_cols[1]:
+                            st.dataframe(
+                                [{
+                                    "行业": item["industry"],
+                                    "周期阶段": item["stage"],
+                                    "行业风险": round(item["risk"]),
+                                    "任职(月)": round(item["tenure_months"]),
+                                    "权重": f"{item['weight_share']:.0%}",
+                                    "贡献": round(item["contribution"], 1),
+                                } for item in exposure["breakdown"]],
+                                hide_index=True, use_container_width=True
+                            )
                     
                     if risk_analysis["中风险"]:
                         with st.expander(f"🟡 中风险行业详情 ({len(risk_analysis['中风险'])}个)"):
@@ -408,7 +297,10 @@ if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"
                     st.markdown("---")
                     st.markdown("### 🎯 转型推荐方向")
                     
-                    recommendations = get_transition_recommendations(all_industries, skills)
+                    recommendations = get_transition_recommendations(
+                        all_industries, skills, parsed.get('total_years'),
+                        current_industry=get_current_industry(parsed, industries_from_select)
+                    )
                     
                     if recommendations:
                         st.success("基于您的行业背景和周期数据，推荐以下转型方向：")
@@ -443,6 +335,7 @@ if st.button("🔍 开始简历诊断", use_container_width=True, type="primary"
 当前职位：{parsed.get('current_role', '未知')}
 技能：{parsed.get('skills', [])}
 风险分析：高风险{len(risk_analysis['高风险'])}个，中风险{len(risk_analysis['中风险'])}个
+职业风险暴露度：{exposure['score'] if exposure['score'] is not None else '无法评估'}（{exposure['level']}，按任职时长与近期程度加权）
 
 请提供以下分析：
 1. 当前职业路径的周期定位（基于马江博周期共振理论）
@@ -5,9 +5,12 @@ import sys
 
 # 确保能正确引入 utils 模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.data_processor import load_industry_data, filter_industry_data, get_industry_by_name
+from utils.data_processor import load_industry_data, filter_industry_data, get_industry_by_name, get_file_version
 from utils.visualization import (
+    WEBGL_POINT_THRESHOLD,
     create_cycle_quadrant_chart, 
+    create_cycle_bubble_chart,
+    get_quadrant_cell_members,
     create_cycle_distribution_chart,
     create_sentiment_pie_chart
 )
@@ -22,6 +25,7 @@ st.markdown("基于产业周期与政策周期的二元框架，可视化呈现
 # ==========================================
 data_path = "data/细分领域行业周期研判表.csv"
 df = load_industry_data(data_path)
+data_version = get_file_version(data_path)
 
 # ==========================================
 # 2. 侧边栏多维度筛选
@@ -77,12 +81,42 @@ st.markdown("---")
 st.markdown("### 🎯 周期共振象限图")
 st.info("📌 **解读说明**：横轴为政策周期阶段，纵轴为产业周期阶段。**第一象限（右上）** 为'红利交叠期'（成长期+聚焦政策），是最佳入场时机；**第四象限（右下）** 为'红利退坡期'，需谨慎。")
 
-quadrant_fig = create_cycle_quadrant_chart(filtered_df, 
-                                            highlight_industry if highlight_industry else None)
-if quadrant_fig:
-    st.plotly_chart(quadrant_fig, use_container_width=True)
+quadrant_view = st.radio(
+    "象限图展示方式：",
+    ["🔵 聚合气泡（重叠点合并，点击气泡查看成员）", "⚪ 散点明细"],
+    index=0 if len(filtered_df) > WEBGL_POINT_THRESHOLD else 1,
+    horizontal=True
+)
+
+if quadrant_view.startswith("🔵"):
+    bubble_fig = create_cycle_bubble_chart(filtered_df,
+                                           highlight_industry if highlight_industry else None,
+                                           data_version=data_version)
+    if bubble_fig:
+        bubble_event = st.plotly_chart(bubble_fig, use_container_width=True, key="quadrant_bubbles",
+                                       on_select="rerun", selection_mode="points")
+        
+        # 点击气泡下钻：列出该单元格内的全部行业
+        selected_points = [p for p in bubble_event.selection.points if p.get("customdata")]
+        if selected_points:
+            policy_score, industry_score, stage = selected_points[0]["customdata"][:3]
+            members = get_quadrant_cell_members(filtered_df, int(policy_score), int(industry_score), stage)
+            st.markdown(f"#### 🔎 {stage} · 政策评分 {policy_score} · 产业评分 {industry_score}（{len(members)} 个行业）")
+            st.dataframe(members, use_container_width=True, hide_index=True)
+        else:
+            st.caption("💡 点击任意气泡，查看该位置包含的全部行业")
+    else:
+        st.warning("暂无可视化数据")
 else:
-    st.warning("暂无可视化数据")
+    quadrant_fig = create_cycle_quadrant_chart(filtered_df, 
+                                                highlight_industry if highlight_industry else None,
+                                                data_version=data_version)
+    if quadrant_fig:
+        st.plotly_chart(quadrant_fig, use_container_width=True)
+        if len(filtered_df) > WEBGL_POINT_THRESHOLD:
+            st.caption(f"⚡ 当前共 {len(filtered_df)} 个数据点，已切换为 WebGL 渲染：仅标注综合评分最高的行业，其余行业名称请悬停查看。")
+    else:
+        st.warning("暂无可视化数据")
 
 st.markdown("---")
 
@@ -95,13 +129,13 @@ dist_cols = st.columns(2)
 
 with dist_cols[0]:
     # 周期阶段分布柱状图
-    cycle_fig = create_cycle_distribution_chart(filtered_df)
+    cycle_fig = create_cycle_distribution_chart(filtered_df, data_version=data_version)
     if cycle_fig:
         st.plotly_chart(cycle_fig, use_container_width=True)
 
 with dist_cols[1]:
     # 景气度分布饼图
-    sentiment_fig = create_sentiment_pie_chart(filtered_df)
+    sentiment_fig = create_sentiment_pie_chart(filtered_df, data_version=data_version)
     if sentiment_fig:
         st.plotly_chart(sentiment_fig, use_container_width=True)
 
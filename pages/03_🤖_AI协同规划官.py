@@ -10,10 +10,15 @@ from utils.llm_engine import (
     render_api_key_input, 
     render_privacy_notice,
     get_deepseek_client,
-    analyze_industry_stream,
+    increment_usage,
+    analyze_industry_with_rag,
     analyze_career_transition
 )
 from utils.rag_engine import get_rag_engine
+from utils.entity_linker import link_industries
+
+# 单条提问最多注入的行业数（控制上下文长度）
+MAX_CONTEXT_INDUSTRIES = 4
 
 # ==========================================
 # 页面配置与初始化
@@ -160,6 +165,9 @@ for message in st.session_state.messages:
 # ==========================================
 
 if prompt := st.chat_input("请输入您关注的行业或职业规划问题..."):
+    # 先在用量账本中记一次调用：已达上限时在写入对话历史之前停止，避免留下没有回复的提问
+    increment_usage()
+    
     # 构建上下文化提示
     contextual_prompt = prompt
     
@@ -176,13 +184,26 @@ if prompt := st.chat_input("请输入您关注的行业或职业规划问题..."
             profile_context += f"- 咨询目的：{user_goal}\n"
         contextual_prompt = profile_context + "\n【用户问题】\n" + prompt
     
-    # 如果有明确提到的行业，注入RAG上下文
+    # 注入RAG上下文：侧边栏行业 + 用户问题中提及的知识库行业（别名归到的泛称行业不注入，
+    # 避免按名称模糊匹配带入无关行业的数据）
     mentioned_industry = target_industry if target_industry else current_industry
-    if mentioned_industry:
+    linked_industries = []
+    try:
+        linked_industries = link_industries(prompt, kb_only=True)
+    except Exception:
+        pass
+    context_industries = list(dict.fromkeys(
+        ([mentioned_industry] if mentioned_industry else []) + linked_industries
+    ))[:MAX_CONTEXT_INDUSTRIES]
+    if context_industries:
         try:
             rag_engine = get_rag_engine()
-            rag_context = rag_engine.build_context_for_llm(mentioned_industry)
-            contextual_prompt = f"【知识库上下文】\n{rag_context}\n\n" + contextual_prompt
+            if len(context_industries) == 1:
+                rag_context = rag_engine.build_context_for_llm(context_industries[0])
+            else:
+                rag_context = rag_engine.build_context_for_industries(context_industries)
+            if rag_context:
+                contextual_prompt = f"【知识库上下文】\n{rag_context}\n\n" + contextual_prompt
         except Exception:
             pass
     
@@ -191,6 +212,8 @@ if prompt := st.chat_input("请输入您关注的行业或职业规划问题..."
     
     with st.chat_message("user"):
         st.markdown(prompt)
+        if linked_industries:
+            st.caption("📚 已检索知识库：" + "、".join(context_industries))
 
     # 调用API生成回复
     with st.chat_message("assistant"):
@@ -220,10 +243,6 @@ if prompt := st.chat_input("请输入您关注的行业或职业规划问题..."
             
     # 保存助手回复到历史
     st.session_state.messages.append({"role": "assistant", "content": full_response})
-    
-    # 增加使用次数
-    if 'daily_usage' in st.session_state:
-        st.session_state['daily_usage'] += 1
 
 # ==========================================
 # 快捷分析功能（页面底部）
@@ -252,7 +271,11 @@ with quick_cols[1]:
         st.markdown("生成目标行业的完整周期分析报告")
         if target_industry and st.button("生成研报", key="btn_report"):
             report_prompt = f"请为{target_industry}生成一份完整的周期分析研报，包括：1)产业周期定位 2)政策环境分析 3)四种典型组合研判 4)职业机会与风险 5)具体行动建议"
+            # 研报请求与用户档案无关，多位用户同时查看同一热门行业时合并为一次上游调用
+            with st.spinner("正在生成行业研报..."):
+                result = analyze_industry_with_rag(target_industry, report_prompt)
             st.session_state.messages.append({"role": "user", "content": report_prompt})
+            st.session_state.messages.append({"role": "assistant", "content": result})
             st.rerun()
 
 with quick_cols[2]:
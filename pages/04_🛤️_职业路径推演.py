@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import re
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
@@ -10,7 +11,35 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.llm_engine import render_api_key_input, render_privacy_notice, get_deepseek_client, increment_usage
 from utils.rag_engine import get_rag_engine
-from utils.visualization import create_career_path_timeline
+from utils.visualization import (
+    create_career_path_timeline,
+    create_trajectory_comparison_chart,
+    create_outcome_band_chart,
+    TRAJECTORY_COLORS
+)
+from utils.trajectory_engine import (
+    backtrack_curve,
+    backtrack_labels,
+    transition_curve,
+    transition_labels,
+    compare_trajectories,
+    replay_curve,
+    simulate_outcome_bands,
+    BASE_SCORE,
+    DEFAULT_N_PATHS,
+    REPLAY_SENSITIVITY
+)
+from utils.backtest_data_collector import INDUSTRY_INDEX_MAP, get_replay_series
+from utils.data_processor import load_industry_data, get_file_version
+from utils.transition_ranker import RISK_PREFERENCES, rank_transition_targets, get_ranking_weights
+
+# 多轨对比的候选目标行业数量上限
+MAX_COMPARE_TARGETS = 6
+
+
+def _format_band(bands: dict, row: int) -> str:
+    """格式化某情景期末的 P10~P90 区间"""
+    return f"{bands['P10'][row, -1]:.0f} ~ {bands['P90'][row, -1]:.0f}"
 
 st.set_page_config(page_title="职业路径推演", page_icon="🛤️", layout="wide")
 
@@ -31,7 +60,8 @@ sim_mode = st.radio(
     [
         "历史回溯：如果我N年前进入某行业，现在会怎样？",
         "未来推演：如果我现在跳槽去某行业，未来3-5年如何？",
-        "双轨对比：对比留在当前行业 vs 转型目标行业的差异"
+        "多轨对比：对比留在当前行业 vs 多个候选转型行业的差异",
+        "智能推荐：为我的画像排序所有候选转型行业"
     ],
     horizontal=True
 )
@@ -58,167 +88,189 @@ if "历史回溯" in sim_mode:
         entry_level = st.selectbox("假设入职时的职级：", 
                                     ["应届生/初级", "中级", "高级", "管理岗"])
     
-    if st.button("🚀 开始历史回溯推演", use_container_width=True):
-        with st.spinner("正在检索历史数据并进行推演分析..."):
-            try:
-                # 获取RAG引擎
-                rag_engine = get_rag_engine()
+    replay_mode = st.radio(
+        "推演方式：",
+        ["周期模型推演（基于当前周期阶段）", "真实指数回放（基于行业指数相对沪深300的实际表现）"],
+        horizontal=True
+    ).startswith("真实指数回放")
+    
+    if replay_mode:
+        st.caption(f"可回放的行业：{'、'.join(INDUSTRY_INDEX_MAP)}（细分行业会映射到所属指数，例如“光伏硅料”→“光伏”）")
+        
+        if st.button("⏪ 开始真实指数回放", use_container_width=True):
+            replay = get_replay_series(past_industry, past_year)
+            
+            if "error" in replay:
+                st.warning(replay["error"])
+            else:
+                st.success(f"📊 回放场景：{past_year}年前进入 **{past_industry}**（{entry_level}），"
+                           f"对标指数：{replay['指数名称']}")
                 
-                # 检索行业数据
-                search_results = rag_engine.search_industry(past_industry, top_k=1)
+                metric_cols = st.columns(4)
+                with metric_cols[0]:
+                    st.metric("行业指数涨幅", f"{replay['行业累计涨幅'][-1]:+.1f}%")
+                with metric_cols[1]:
+                    st.metric("沪深300涨幅", f"{replay['沪深300累计涨幅'][-1]:+.1f}%")
+                with metric_cols[2]:
+                    st.metric("相对收益", f"{replay['相对收益'][-1]:+.1f}%")
+                with metric_cols[3]:
+                    st.metric("是否跑赢大盘", "是" if replay['相对收益'][-1] > 0 else "否")
                 
-                if search_results:
-                    result = search_results[0]
-                    stage = result['当前周期阶段']
-                    sentiment = result['未来1-3年景气度']
-                    
-                    # 显示推演结果
-                    st.success(f"📊 推演场景：{past_year}年前进入 **{past_industry}**（{entry_level}）")
-                    
-                    # 计算时间线
-                    current_year = datetime.now().year
-                    start_year = current_year - past_year
+                st.markdown("### 📈 基于真实表现的职业发展轨迹")
+                replay_scores = replay_curve(replay['相对收益'])
+                replay_years = [int(d[:4]) for d in replay['dates']]
+                
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=replay_years, y=replay_scores,
+                    mode='lines+markers+text',
+                    text=backtrack_labels(past_year),
+                    textposition="top center",
+                    line=dict(color='#00C851', width=3),
+                    marker=dict(size=15)
+                ))
+                fig.update_layout(
+                    title=f"在{past_industry}的职业发展轨迹（{replay['dates'][0]} 至 {replay['dates'][-1]} 实际回放）",
+                    xaxis_title="年份",
+                    yaxis_title="职业价值指数",
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                returns_df = pd.DataFrame({
+                    "日期": replay['dates'],
+                    f"{replay['指数名称']}累计涨幅(%)": replay['行业累计涨幅'],
+                    "沪深300累计涨幅(%)": replay['沪深300累计涨幅'],
+                    "相对收益(%)": replay['相对收益'],
+                    "职业价值指数": replay_scores.round(1)
+                })
+                st.dataframe(returns_df, use_container_width=True, hide_index=True)
+                st.caption(f"职业价值指数 = {BASE_SCORE} + {REPLAY_SENSITIVITY} × 累计相对收益（限制在0-100）")
+    
+    else:
+        if st.button("🚀 开始历史回溯推演", use_container_width=True):
+            with st.spinner("正在检索历史数据并进行推演分析..."):
+                try:
+                    # 获取RAG引擎
+                    rag_engine = get_rag_engine()
                     
-                    # 构建时间线数据（模拟）
-                    milestones = []
-                    base_score = 50
+                    # 检索行业数据
+                    search_results = rag_engine.search_industry(past_industry, top_k=1)
                     
-                    if stage == "成长期":
-                        # 成长期的收益曲线
-                        for i in range(past_year + 1):
-                            year = start_year + i
-                            score = base_score + (i * 15) + (i * i * 2)  # 加速增长
-                            milestone = {
-                                "year": year,
-                                "score": min(score, 100),
-                                "label": f"第{i}年"
-                            }
-                            if i == 0:
-                                milestone["label"] = "入职"
-                            elif i == past_year:
-                                milestone["label"] = "当前"
-                            milestones.append(milestone)
+                    if search_results:
+                        result = search_results[0]
+                        stage = result['当前周期阶段']
+                        sentiment = result['未来1-3年景气度']
                         
-                        career_value = "💰 高增值"
-                        salary_growth = f"+{past_year * 20}% ~ +{past_year * 35}%"
-                        position_level = f"晋升 {past_year // 2} 级"
+                        # 显示推演结果
+                        st.success(f"📊 推演场景：{past_year}年前进入 **{past_industry}**（{entry_level}）")
                         
-                    elif stage == "初创期":
-                        # 初创期的高风险高回报
-                        for i in range(past_year + 1):
-                            year = start_year + i
-                            if i < 2:
-                                score = base_score + (i * 5)
-                            else:
-                                score = base_score + 10 + ((i-2) * 20)
-                            milestone = {
-                                "year": year,
-                                "score": min(score, 100),
-                                "label": f"第{i}年"
-                            }
-                            milestones.append(milestone)
+                        # 计算时间线
+                        current_year = datetime.now().year
+                        start_year = current_year - past_year
                         
-                        career_value = "🎲 高风险高回报"
-                        salary_growth = f"+{past_year * 15}% ~ +{past_year * 50}%（波动大）"
-                        position_level = "可能快速晋升或原地踏步"
+                        # 构建时间线数据
+                        curve = backtrack_curve(stage, past_year)
+                        milestones = []
+                        if curve is not None:
+                            milestones = [
+                                {"year": start_year + i, "score": float(score), "label": label}
+                                for i, (score, label) in enumerate(zip(curve, backtrack_labels(past_year)))
+                            ]
                         
-                    elif stage in ["成熟期", "调整期"]:
-                        # 成熟/调整期的平缓增长
-                        for i in range(past_year + 1):
-                            year = start_year + i
-                            score = base_score + (i * 5)
-                            milestone = {
-                                "year": year,
-                                "score": min(score, 80),
-                                "label": f"第{i}年"
-                            }
-                            milestones.append(milestone)
+                        if stage == "成长期":
+                            career_value = "💰 高增值"
+                            salary_growth = f"+{past_year * 20}% ~ +{past_year * 35}%"
+                            position_level = f"晋升 {past_year // 2} 级"
+                        elif stage == "初创期":
+                            career_value = "🎲 高风险高回报"
+                            salary_growth = f"+{past_year * 15}% ~ +{past_year * 50}%（波动大）"
+                            position_level = "可能快速晋升或原地踏步"
+                        elif stage in ["成熟期", "调整期"]:
+                            career_value = "📊 稳定/下滑"
+                            salary_growth = f"+{past_year * 5}% ~ +{past_year * 10}%"
+                            position_level = "晋升缓慢"
+                        else:
+                            career_value = "⚠️ 风险"
+                            salary_growth = "不稳定"
+                            position_level = "可能降级/失业"
                         
-                        career_value = "📊 稳定/下滑"
-                        salary_growth = f"+{past_year * 5}% ~ +{past_year * 10}%"
-                        position_level = "晋升缓慢"
-                    else:
-                        career_value = "⚠️ 风险"
-                        salary_growth = "不稳定"
-                        position_level = "可能降级/失业"
-                        milestones = []
-                    
-                    # 显示关键指标
-                    metric_cols = st.columns(4)
-                    with metric_cols[0]:
-                        st.metric("职业价值指数", career_value)
-                    with metric_cols[1]:
-                        st.metric(f"{past_year}年薪资涨幅", salary_growth)
-                    with metric_cols[2]:
-                        st.metric("职级变化", position_level)
-                    with metric_cols[3]:
-                        combo = rag_engine.get_cycle_combination(stage)
-                        st.metric("周期组合", combo.get('组合名称', '未知'))
-                    
-                    # 显示时间线图
-                    if milestones:
-                        st.markdown("### 📈 职业发展轨迹")
-                        fig = go.Figure()
+                        # 显示关键指标
+                        metric_cols = st.columns(4)
+                        with metric_cols[0]:
+                            st.metric("职业价值指数", career_value)
+                        with metric_cols[1]:
+                            st.metric(f"{past_year}年薪资涨幅", salary_growth)
+                        with metric_cols[2]:
+                            st.metric("职级变化", position_level)
+                        with metric_cols[3]:
+                            combo = rag_engine.get_cycle_combination(stage)
+                            st.metric("周期组合", combo.get('组合名称', '未知'))
                         
-                        years = [m['year'] for m in milestones]
-                        scores = [m['score'] for m in milestones]
+                        # 显示时间线图
+                        if milestones:
+                            st.markdown("### 📈 职业发展轨迹")
+                            fig = go.Figure()
+                            
+                            years = [m['year'] for m in milestones]
+                            scores = [m['score'] for m in milestones]
+                            
+                            fig.add_trace(go.Scatter(
+                                x=years, y=scores,
+                                mode='lines+markers+text',
+                                text=[m['label'] for m in milestones],
+                                textposition="top center",
+                                line=dict(color='#00C851', width=3),
+                                marker=dict(size=15)
+                            ))
+                            
+                            fig.update_layout(
+                                title=f"在{past_industry}的假设职业发展轨迹",
+                                xaxis_title="年份",
+                                yaxis_title="职业价值指数",
+                                height=400
+                            )
+                            
+                            st.plotly_chart(fig, use_container_width=True)
                         
-                        fig.add_trace(go.Scatter(
-                            x=years, y=scores,
-                            mode='lines+markers+text',
-                            text=[m['label'] for m in milestones],
-                            textposition="top center",
-                            line=dict(color='#00C851', width=3),
-                            marker=dict(size=15)
-                        ))
+                        # AI深度分析
+                        st.markdown("### 🤖 AI深度分析")
                         
-                        fig.update_layout(
-                            title=f"在{past_industry}的假设职业发展轨迹",
-                            xaxis_title="年份",
-                            yaxis_title="职业价值指数",
-                            height=400
-                        )
+                        client = get_deepseek_client()
+                        increment_usage()
                         
-                        st.plotly_chart(fig, use_container_width=True)
-                    
-                    # AI深度分析
-                    st.markdown("### 🤖 AI深度分析")
-                    
-                    client = get_deepseek_client()
-                    increment_usage()
-                    
-                    prompt = f"""请基于以下场景，为用户提供深度职业推演分析：
-场景：用户在{past_year}年前（{start_year}年）进入{past_industry}行业，入职职级为{entry_level}。
-当前该行业周期阶段：{stage}
-未来1-3年景气度：{sentiment}
+                        prompt = f"""请基于以下场景，为用户提供深度职业推演分析：
+    场景：用户在{past_year}年前（{start_year}年）进入{past_industry}行业，入职职级为{entry_level}。
+    当前该行业周期阶段：{stage}
+    未来1-3年景气度：{sentiment}
 
-请分析：
-1. 当时进入该行业的时机判断（是否符合周期共振原理）
-2. 这{past_year}年间可能经历的行业波动
-3. 当前的假设职业状态（薪资、职级、技能积累）
-4. 与当时其他选择的对比（如选择同期调整期行业）
-5. 经验教训总结
-"""
-                    
-                    messages = [
-                        {"role": "system", "content": "你是Cycle-Master AI职业规划专家，基于马江博周期共振理论进行分析。"},
-                        {"role": "user", "content": prompt}
-                    ]
-                    
-                    response = client.chat.completions.create(
-                        model="deepseek-chat",
-                        messages=messages,
-                        temperature=0.6,
-                        max_tokens=2000
-                    )
-                    
-                    st.markdown(response.choices[0].message.content)
-                    
-                else:
-                    st.warning(f"未在知识库中找到'{past_industry}'的相关数据，无法进行推演。")
-                    
-            except Exception as e:
-                st.error(f"推演失败: {str(e)}")
+    请分析：
+    1. 当时进入该行业的时机判断（是否符合周期共振原理）
+    2. 这{past_year}年间可能经历的行业波动
+    3. 当前的假设职业状态（薪资、职级、技能积累）
+    4. 与当时其他选择的对比（如选择同期调整期行业）
+    5. 经验教训总结
+    """
+                        
+                        messages = [
+                            {"role": "system", "content": "你是Cycle-Master AI职业规划专家，基于马江博周期共振理论进行分析。"},
+                            {"role": "user", "content": prompt}
+                        ]
+                        
+                        response = client.chat.completions.create(
+                            model="deepseek-chat",
+                            messages=messages,
+                            temperature=0.6,
+                            max_tokens=2000
+                        )
+                        
+                        st.markdown(response.choices[0].message.content)
+                        
+                    else:
+                        st.warning(f"未在知识库中找到'{past_industry}'的相关数据，无法进行推演。")
+                        
+                except Exception as e:
+                    st.error(f"推演失败: {str(e)}")
 
 # ==========================================
 # 场景2: 未来推演
@@ -300,28 +352,11 @@ elif "未来推演" in sim_mode:
                     st.markdown("#### 📅 假设转型后的发展轨迹")
                     
                     current_year = datetime.now().year
-                    future_milestones = []
-                    
-                    for i in range(forecast_years + 1):
-                        year = current_year + i
-                        if i == 0:
-                            label = "转型起点"
-                            score = 40  # 转型初期可能下降
-                        elif i == 1:
-                            label = "适应期"
-                            score = 50
-                        elif i == forecast_years:
-                            label = f"{forecast_years}年后"
-                            score = 70 if target_stage == "成长期" else 55
-                        else:
-                            label = f"第{i}年"
-                            score = 50 + (i * 10)
-                        
-                        future_milestones.append({
-                            "year": year,
-                            "score": min(score, 100),
-                            "label": label
-                        })
+                    future_curve = transition_curve(target_stage, forecast_years)
+                    future_milestones = [
+                        {"year": current_year + i, "score": float(score), "label": label}
+                        for i, (score, label) in enumerate(zip(future_curve, transition_labels(forecast_years)))
+                    ]
                     
                     fig = go.Figure()
                     fig.add_trace(go.Scatter(
@@ -343,6 +378,25 @@ elif "未来推演" in sim_mode:
                     
                     st.plotly_chart(fig, use_container_width=True)
                     
+                    # 风险区间：蒙特卡洛模拟
+                    st.markdown("#### 🎲 风险区间（蒙特卡洛模拟）")
+                    future_bands = simulate_outcome_bands(
+                        [target_stage], forecast_years,
+                        combinations=[combo.get('组合名称')], transition=[True]
+                    )
+                    band_fig = create_outcome_band_chart(
+                        [current_year + i for i in range(forecast_years + 1)], future_bands,
+                        [target_ind], colors=['#33B5E5']
+                    )
+                    st.plotly_chart(band_fig, use_container_width=True)
+                    
+                    band_cols = st.columns(4)
+                    band_cols[0].metric(f"{forecast_years}年后 P10（悲观）", f"{future_bands['P10'][0, -1]:.0f}")
+                    band_cols[1].metric(f"{forecast_years}年后 P50（中性）", f"{future_bands['P50'][0, -1]:.0f}")
+                    band_cols[2].metric(f"{forecast_years}年后 P90（乐观）", f"{future_bands['P90'][0, -1]:.0f}")
+                    band_cols[3].metric("低于转型前概率", f"{future_bands['below_start'][0]:.0%}")
+                    st.caption(f"基于 {DEFAULT_N_PATHS:,} 条模拟路径，年均变化与波动由周期阶段和周期组合决定（固定随机种子，结果可复现）")
+                    
                     # AI转型建议
                     st.markdown("### 🤖 AI转型建议")
                     
@@ -381,10 +435,10 @@ elif "未来推演" in sim_mode:
                 st.error(f"推演失败: {str(e)}")
 
 # ==========================================
-# 场景3: 双轨对比
+# 场景3: 多轨对比
 # ==========================================
-else:
-    st.markdown("### ⚖️ 双轨对比：留下 vs 转型")
+elif "多轨对比" in sim_mode:
+    st.markdown("### ⚖️ 多轨对比：留下 vs 转型")
     
     col1, col2 = st.columns(2)
     
@@ -395,115 +449,111 @@ else:
                                        key="stay_ind")
     
     with col2:
-        st.markdown("#### 🚀 方案B：转型目标行业")
-        move_industry = st.text_input("目标行业：", 
-                                       value=st.session_state.get('target_industry', ''),
-                                       key="move_ind")
+        st.markdown("#### 🚀 方案B：候选转型行业")
+        move_input = st.text_input(f"目标行业（可填多个，用逗号分隔，最多{MAX_COMPARE_TARGETS}个）：", 
+                                    value="、".join(st.session_state.get('compare_targets', []))
+                                          or st.session_state.get('target_industry', ''),
+                                    placeholder="例如：储能, 人工智能, 低空经济",
+                                    key="move_ind")
+    
+    move_industries = list(dict.fromkeys(
+        name.strip() for name in re.split(r"[,，、;；\n]", move_input) if name.strip()
+    ))[:MAX_COMPARE_TARGETS]
     
     compare_years = st.slider("对比时间跨度（年）：", 1, 10, 5)
     
-    if st.button("⚖️ 开始双轨对比", use_container_width=True):
-        if not stay_industry or not move_industry:
-            st.warning("请输入两个行业名称")
+    if st.button("⚖️ 开始多轨对比", use_container_width=True):
+        if not stay_industry or not move_industries:
+            st.warning("请输入当前行业和至少一个目标行业")
         else:
-            with st.spinner("正在生成双轨对比分析..."):
+            with st.spinner("正在生成多轨对比分析..."):
                 try:
                     rag_engine = get_rag_engine()
                     
                     stay_results = rag_engine.search_industry(stay_industry, top_k=1)
-                    move_results = rag_engine.search_industry(move_industry, top_k=1)
+                    move_found = []
+                    for name in move_industries:
+                        results = rag_engine.search_industry(name, top_k=1)
+                        if results:
+                            move_found.append((name, results[0]))
+                        else:
+                            st.warning(f"未找到'{name}'的行业数据，已从对比中移除")
                     
-                    if not stay_results or not move_results:
-                        st.warning("需要两个行业的数据才能进行对比")
+                    if not stay_results or not move_found:
+                        st.warning("需要当前行业和至少一个目标行业的数据才能进行对比")
                     else:
-                        # 创建对比图表
-                        current_year = datetime.now().year
-                        years = list(range(current_year, current_year + compare_years + 1))
-                        
-                        # 模拟两条轨迹
-                        stay_stage = stay_results[0]['当前周期阶段']
-                        move_stage = move_results[0]['当前周期阶段']
-                        
-                        # 轨迹A：留下
-                        if stay_stage in ["成长期", "初创期"]:
-                            stay_trajectory = [50 + i * 12 for i in range(compare_years + 1)]
-                        elif stay_stage == "成熟期":
-                            stay_trajectory = [50 + i * 5 for i in range(compare_years + 1)]
-                        else:
-                            stay_trajectory = [50 - i * 5 for i in range(compare_years + 1)]
-                        
-                        # 轨迹B：转型
-                        move_trajectory = [50]  # 转型起点
-                        if move_stage == "成长期":
-                            for i in range(1, compare_years + 1):
-                                if i == 1:
-                                    move_trajectory.append(45)  # 适应期下降
-                                else:
-                                    move_trajectory.append(45 + (i-1) * 15)
-                        elif move_stage == "初创期":
-                            for i in range(1, compare_years + 1):
-                                move_trajectory.append(40 + i * 10)
-                        else:
-                            for i in range(1, compare_years + 1):
-                                move_trajectory.append(45 + i * 5)
-                        
-                        # 绘制对比图
-                        fig = go.Figure()
+                        stay_record = stay_results[0]
+                        stay_stage = stay_record['当前周期阶段']
+                        move_names = [name for name, _ in move_found]
+                        move_records = [record for _, record in move_found]
                         
-                        fig.add_trace(go.Scatter(
-                            x=years, y=stay_trajectory,
-                            mode='lines+markers',
-                            name=f'留在{stay_industry}',
-                            line=dict(color='#FF8800', width=3)
-                        ))
-                        
-                        fig.add_trace(go.Scatter(
-                            x=years, y=move_trajectory,
-                            mode='lines+markers',
-                            name=f'转型{move_industry}',
-                            line=dict(color='#00C851', width=3)
-                        ))
+                        # 一次计算全部轨迹与交叉点
+                        comparison = compare_trajectories(
+                            stay_stage,
+                            [r['当前周期阶段'] for r in move_records],
+                            compare_years,
+                            stay_sentiment=stay_record['未来1-3年景气度'],
+                            target_sentiments=[r['未来1-3年景气度'] for r in move_records]
+                        )
                         
-                        # 添加交叉点标注
-                        for i in range(len(years)):
-                            if i > 0 and move_trajectory[i] > stay_trajectory[i] and move_trajectory[i-1] <= stay_trajectory[i-1]:
-                                fig.add_annotation(
-                                    x=years[i], y=move_trajectory[i],
-                                    text="转型收益<br>超过留下",
-                                    showarrow=True,
-                                    arrowhead=2
-                                )
+                        current_year = datetime.now().year
+                        years = (current_year + comparison["offsets"]).tolist()
                         
-                        fig.update_layout(
-                            title=f"{compare_years}年双轨对比：留下 vs 转型",
-                            xaxis_title="年份",
-                            yaxis_title="职业价值指数",
-                            height=500,
-                            legend=dict(orientation="h", yanchor="bottom", y=1.02)
+                        fig = create_trajectory_comparison_chart(
+                            years, comparison["stay"], comparison["targets"],
+                            stay_industry, move_names, comparison["crossovers"]
                         )
-                        
                         st.plotly_chart(fig, use_container_width=True)
                         
+                        # 风险区间：所有方案一次模拟
+                        st.markdown("### 🎲 风险区间（蒙特卡洛模拟）")
+                        all_records = [stay_record] + move_records
+                        mc_bands = simulate_outcome_bands(
+                            [r['当前周期阶段'] for r in all_records],
+                            compare_years,
+                            combinations=[rag_engine.get_cycle_combination(r['当前周期阶段']).get('组合名称')
+                                          for r in all_records],
+                            transition=[False] + [True] * len(move_records)
+                        )
+                        band_fig = create_outcome_band_chart(
+                            years, mc_bands,
+                            [f'留在{stay_industry}'] + [f'转型{name}' for name in move_names],
+                            colors=['#FF8800'] + TRAJECTORY_COLORS
+                        )
+                        st.plotly_chart(band_fig, use_container_width=True)
+                        st.caption(f"每个方案 {DEFAULT_N_PATHS:,} 条模拟路径，阴影为 P10-P90 区间，实线为中位数")
+                        
                         # 对比表格
                         st.markdown("### 📊 详细对比")
                         
                         comparison_data = {
-                            "维度": ["当前周期阶段", "未来景气度", "风险等级", f"{compare_years}年后预期价值", "推荐指数"],
+                            "维度": ["当前周期阶段", "未来景气度", "风险等级", f"{compare_years}年后预期价值",
+                                   f"{compare_years}年后区间(P10~P90)", "期末低于起点概率",
+                                   "首次超过留下", "推荐指数"],
                             f"留下 ({stay_industry})": [
                                 stay_stage,
-                                stay_results[0]['未来1-3年景气度'],
+                                stay_record['未来1-3年景气度'],
                                 "低" if stay_stage == "成熟期" else "中" if stay_stage == "成长期" else "高",
-                                f"{stay_trajectory[-1]:.0f}",
+                                f"{comparison['stay'][-1]:.0f}",
+                                _format_band(mc_bands, 0),
+                                f"{mc_bands['below_start'][0]:.0%}",
+                                "-",
                                 "⭐⭐⭐" if stay_stage == "成长期" else "⭐⭐" if stay_stage == "成熟期" else "⭐"
-                            ],
-                            f"转型 ({move_industry})": [
+                            ]
+                        }
+                        for row, (name, record) in enumerate(move_found):
+                            move_stage = record['当前周期阶段']
+                            first_cross = comparison["first_crossover"][row]
+                            comparison_data[f"转型 ({name})"] = [
                                 move_stage,
-                                move_results[0]['未来1-3年景气度'],
+                                record['未来1-3年景气度'],
                                 "高（短期）→ 低（长期）" if move_stage == "成长期" else "高",
-                                f"{move_trajectory[-1]:.0f}",
+                                f"{comparison['targets'][row, -1]:.0f}",
+                                _format_band(mc_bands, row + 1),
+                                f"{mc_bands['below_start'][row + 1]:.0%}",
+                                f"第{first_cross}年" if first_cross >= 0 else "未超过",
                                 "⭐⭐⭐⭐⭐" if move_stage == "成长期" else "⭐⭐⭐" if move_stage == "初创期" else "⭐⭐"
                             ]
-                        }
                         
                         comp_df = pd.DataFrame(comparison_data)
                         st.dataframe(comp_df, use_container_width=True, hide_index=True)
@@ -514,20 +564,25 @@ else:
                         client = get_deepseek_client()
                         increment_usage()
                         
-                        compare_prompt = f"""请对以下两个职业选择方案进行综合对比分析：
+                        move_lines = "\n\n".join(
+                            f"""方案{chr(ord('B') + row)}（转型）：{name}
+- 周期阶段：{record['当前周期阶段']}
+- 景气度：{record['未来1-3年景气度']}"""
+                            for row, (name, record) in enumerate(move_found)
+                        )
+                        
+                        compare_prompt = f"""请对以下职业选择方案进行综合对比分析：
 
 方案A（留下）：{stay_industry}
 - 周期阶段：{stay_stage}
-- 景气度：{stay_results[0]['未来1-3年景气度']}
+- 景气度：{stay_record['未来1-3年景气度']}
 
-方案B（转型）：{move_industry}
-- 周期阶段：{move_stage}
-- 景气度：{move_results[0]['未来1-3年景气度']}
+{move_lines}
 
 对比时间跨度：{compare_years}年
 
 请分析：
-1. 两个方案的优劣对比
+1. 各方案的优劣对比
 2. 不同风险偏好的选择建议
 3. 关键决策节点的判断标准
 4. 最终推荐及理由
@@ -550,6 +605,62 @@ else:
                 except Exception as e:
                     st.error(f"对比分析失败: {str(e)}")
 
+# ==========================================
+# 场景4: 智能推荐
+# ==========================================
+elif "智能推荐" in sim_mode:
+    st.markdown("### 🧭 智能推荐：为您的画像排序所有转型方向")
+    st.markdown("综合周期评分、周期组合、推演交叉年份与技能相近度，对知识库中的全部行业打分排序。")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        rank_current = st.text_input("您当前的行业：", 
+                                      value=st.session_state.get('user_profile', {}).get('current_industry', ''),
+                                      placeholder="例如：光伏硅料",
+                                      key="rank_current")
+        rank_skills = st.text_input("您的技能关键词（可选，用逗号分隔）：",
+                                     placeholder="例如：储能, 项目管理",
+                                     key="rank_skills")
+    
+    with col2:
+        rank_years = st.slider("工作年限（年）：", 0, 30, 3)
+        rank_horizon = st.slider("推演时间跨度（年）：", 1, 10, 5, key="rank_horizon")
+    
+    with col3:
+        risk_preference = st.radio("风险偏好：", RISK_PREFERENCES, index=1, horizontal=True)
+        rank_top_k = st.slider("推荐数量：", 3, 30, 10)
+    
+    if rank_current:
+        data_path = "data/细分领域行业周期研判表.csv"
+        ranked = rank_transition_targets(
+            load_industry_data(data_path), rank_current,
+            work_years=rank_years, risk_preference=risk_preference, top_k=rank_top_k,
+            skills=[s.strip() for s in re.split(r"[,，、;；]", rank_skills) if s.strip()],
+            horizon=rank_horizon, data_version=get_file_version(data_path)
+        )
+        
+        if ranked.empty:
+            st.info("暂无可推荐的行业")
+        else:
+            weights = get_ranking_weights(rank_years)
+            st.caption("综合得分权重：" + "，".join(f"{name} {w:.0%}" for name, w in weights.items()))
+            st.dataframe(
+                ranked,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "综合得分": st.column_config.ProgressColumn("综合得分", min_value=0, max_value=100, format="%.1f"),
+                }
+            )
+            
+            if st.button(f"⚖️ 将前{min(3, len(ranked))}名加入多轨对比", use_container_width=True):
+                # 候选列表单独存放；target_industry 只存单个行业名称（其他页面按单个行业读取）
+                st.session_state['compare_targets'] = ranked['行业名称'].head(3).tolist()
+                st.success("已填入多轨对比的目标行业，请在上方切换到“多轨对比”模式查看推演。")
+    else:
+        st.info("请输入您当前的行业")
+
 # ==========================================
 # 页面底部提示
 # ==========================================
@@ -1,15 +1,30 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-import time
-import random
 import sys
 import os
 
 # 确保能正确引入 utils 模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.llm_engine import render_api_key_input, render_privacy_notice
-from utils.visualization import create_sentinel_radar
+from utils.visualization import (
+    create_sentinel_radar,
+    create_readiness_trend_chart,
+    create_watchlist_heatmap,
+    get_downsample_info
+)
+from utils.data_processor import load_industry_data
+from utils.financial_indicators import FINANCIAL_DATA_DIR, get_skipped_financial_files, load_financial_indicators
+from utils.sentinel_engine import (
+    ACHIEVED_THRESHOLD,
+    SENTINEL_INDICATORS,
+    build_progress_matrix,
+    compute_readiness_scores,
+    get_financial_coverage,
+    get_sentinel_data,
+    rank_industries
+)
+from utils.sentinel_trend import get_trend_analytics, record_readiness_snapshot
 
 st.set_page_config(page_title="数据哨兵服务", page_icon="📡", layout="wide")
 st.title("📡 数据哨兵服务：新产业成长期拐点追踪")
@@ -25,6 +40,7 @@ st.warning("""📌 **当前为演示版本**
 **当前状态**：
 - ✅ 7大拐点指标框架已搭建
 - ✅ 可视化组件已完善
+- ✅ 支持从本地财务报表（`data/financials/`）计算技术成本、龙头盈利、资本开支、营收规模4项指标
 - ⏳ 实时数据接入（开发中）
 
 **未来计划**：
@@ -41,19 +57,6 @@ st.warning("""📌 **当前为演示版本**
 render_api_key_input()
 render_privacy_notice()
 
-# ==========================================
-# 7大拐点指标定义
-# ==========================================
-SENTINEL_INDICATORS = [
-    {"id": 1, "name": "技术成本下降", "description": "技术成本在2-3年内下降50%以上", "weight": 15},
-    {"id": 2, "name": "龙头盈利", "description": "龙头企业毛利率超过20%，净利润转正", "weight": 15},
-    {"id": 3, "name": "政策明确", "description": "政策文件中明确了财政资金规模和具体补贴标准", "weight": 15},
-    {"id": 4, "name": "渗透率区间", "description": "市场渗透率在5%-30%之间", "weight": 15},
-    {"id": 5, "name": "资本开支", "description": "行业资本开支增速维持30%以上", "weight": 15},
-    {"id": 6, "name": "营收规模", "description": "出现了3家以上年营收超过10亿的企业", "weight": 15},
-    {"id": 7, "name": "产业链配套", "description": "产业链上下游配套开始完善", "weight": 10},
-]
-
 # ==========================================
 # 初始化关注列表
 # ==========================================
@@ -69,103 +72,6 @@ if 'target_industry' in st.session_state and st.session_state['target_industry']
     # 清除传递的参数
     st.session_state['target_industry'] = ""
 
-# ==========================================
-# 模拟数据生成函数
-# ==========================================
-def get_sentinel_data(industry_name: str) -> dict:
-    """
-    为特定行业生成模拟的7大指标数据
-    
-    Args:
-        industry_name: 行业名称
-        
-    Returns:
-        指标数据字典
-    """
-    # 基于行业名称生成一个固定种子，确保同一行业数据一致
-    seed = sum(ord(c) for c in industry_name)
-    random.seed(seed)
-    
-    # 根据行业特性调整基准分数
-    high_growth_industries = ["人工智能", "低空经济", "人形机器人", "脑机接口", "量子计算",
-                               "储能", "新能源汽车", "半导体", "氢能源"]
-    
-    if any(hg in industry_name for hg in high_growth_industries):
-        base_score = random.uniform(0.6, 0.9)
-    else:
-        base_score = random.uniform(0.3, 0.7)
-    
-    indicators = []
-    achieved_count = 0
-    
-    for indicator in SENTINEL_INDICATORS:
-        # 根据权重和随机因素确定是否达标
-        threshold = 1 - (indicator['weight'] / 100) * base_score
-        status = random.random() > threshold
-        
-        if status:
-            achieved_count += 1
-        
-        indicators.append({
-            **indicator,
-            "status": status,
-            "progress": random.uniform(70, 100) if status else random.uniform(20, 70)
-        })
-    
-    readiness_score = int((achieved_count / 7) * 100)
-    
-    # 生成趋势数据（近12个月）
-    months = []
-    scores = []
-    for i in range(12):
-        month_score = readiness_score + random.randint(-10, 10)
-        month_score = max(0, min(100, month_score))
-        months.append(f"{i+1}月")
-        scores.append(month_score)
-    
-    return {
-        "industry": industry_name,
-        "indicators": indicators,
-        "readiness_score": readiness_score,
-        "achieved_count": achieved_count,
-        "trend_months": months,
-        "trend_scores": scores,
-        "assessment": get_assessment(readiness_score)
-    }
-
-
-def get_assessment(score: int) -> dict:
-    """根据就绪分数返回评估结果"""
-    if score >= 80:
-        return {
-            "level": "🟢 强烈推荐",
-            "color": "green",
-            "message": "该行业已进入红利交叠期，是最佳入场时机！",
-            "action": "建议果断入场，优先选择头部企业"
-        }
-    elif score >= 60:
-        return {
-            "level": "🟡 值得关注",
-            "color": "orange",
-            "message": "该行业正在快速发展中，多数指标已达标。",
-            "action": "可以开始关注和准备，择机入场"
-        }
-    elif score >= 40:
-        return {
-            "level": "🟠 观察等待",
-            "color": "orange",
-            "message": "该行业尚处于早期阶段，部分指标未达标。",
-            "action": "建议持续关注，等待更明确的信号"
-        }
-    else:
-        return {
-            "level": "🔴 高风险",
-            "color": "red",
-            "message": "该行业尚未进入成长期，存在较大不确定性。",
-            "action": "建议谨慎观望，不宜贸然进入"
-        }
-
-
 # ==========================================
 # 侧边栏：管理控制台
 # ==========================================
@@ -196,6 +102,36 @@ with st.sidebar:
             if st.button("🗑️", key=f"del_{i}"):
                 st.session_state.watchlist.pop(i)
                 st.rerun()
+    
+    st.markdown("---")
+    
+    # 指标权重调节
+    st.markdown("### ⚖️ 指标权重")
+    with st.expander("调整7大指标权重", expanded=False):
+        indicator_weights = [
+            st.slider(ind['name'], 0, 30, ind['weight'], key=f"weight_{ind['id']}")
+            for ind in SENTINEL_INDICATORS
+        ]
+        if sum(indicator_weights) == 0:
+            st.warning("权重不能全部为0，已恢复默认权重")
+            indicator_weights = [ind['weight'] for ind in SENTINEL_INDICATORS]
+
+# ==========================================
+# 就绪度计算：所有追踪行业 + 知识库行业一次性计算
+# ==========================================
+industry_df = load_industry_data()
+tracked_industries = tuple(dict.fromkeys(
+    list(st.session_state.watchlist) + industry_df['行业名称'].tolist()
+))
+financial_indicators = load_financial_indicators()
+progress_matrix = build_progress_matrix(tracked_industries, financial_indicators)
+financial_coverage = get_financial_coverage(tracked_industries, financial_indicators)
+readiness_scores = compute_readiness_scores(progress_matrix, indicator_weights)
+industry_index = {name: i for i, name in enumerate(tracked_industries)}
+
+# 历史快照统一按默认权重记录，避免权重调节污染历史；每个行业每月仅记录一次
+record_readiness_snapshot(tracked_industries, compute_readiness_scores(progress_matrix))
+trend = get_trend_analytics(tracked_industries)
 
 # ==========================================
 # 主界面：行业追踪卡片
@@ -205,79 +141,155 @@ if not st.session_state.watchlist:
 else:
     st.markdown(f"### 🔍 正在追踪 **{len(st.session_state.watchlist)}** 个行业")
     
-    # 动态生成追踪卡片
-    cols = st.columns(2)
+    view_mode = st.radio(
+        "展示方式：",
+        ["🧮 对比矩阵", "🗂️ 卡片视图"],
+        index=0 if len(st.session_state.watchlist) > 4 else 1,
+        horizontal=True
+    )
     
-    for i, industry in enumerate(st.session_state.watchlist):
-        data = get_sentinel_data(industry)
+    if view_mode == "🧮 对比矩阵":
+        # 一次索引取出所有追踪行业的进度与趋势，渲染为单张热力图
+        watch_rows = np.array([industry_index[name] for name in st.session_state.watchlist])
+        watch_progress = progress_matrix[watch_rows]
+        comparison_df = pd.DataFrame({
+            "行业名称": st.session_state.watchlist,
+            "就绪度": np.round(readiness_scores[watch_rows], 1),
+            "已达标指标": (watch_progress >= ACHIEVED_THRESHOLD).sum(axis=1),
+            "月均变化": np.round(trend['slope'][watch_rows], 2),
+            "动量": np.round(trend['momentum'][watch_rows], 2),
+            "距入场线(月)": np.round(trend['months_to_threshold'][watch_rows], 1),
+        })
+        
+        sort_col = st.selectbox("排序依据：", ["就绪度", "已达标指标", "月均变化", "动量"])
+        order = comparison_df[sort_col].to_numpy(dtype=float)
+        order = np.argsort(-np.nan_to_num(order, nan=-np.inf), kind="stable")
+        
+        heatmap_fig = create_watchlist_heatmap(
+            comparison_df["行业名称"].to_numpy()[order].tolist(),
+            watch_progress[order],
+            [ind['name'] for ind in SENTINEL_INDICATORS],
+            comparison_df["就绪度"].to_numpy()[order]
+        )
+        st.plotly_chart(heatmap_fig, use_container_width=True, key="watchlist_heatmap")
         
-        with cols[i % 2]:
-            with st.container(border=True):
-                # 标题和总体评分
-                header_cols = st.columns([2, 1])
-                with header_cols[0]:
-                    st.subheader(f"📊 {industry}")
-                with header_cols[1]:
-                    st.markdown(f"<h2 style='text-align: right; color: {data['assessment']['color']};'>{data['readiness_score']}%</h2>", 
-                               unsafe_allow_html=True)
+        st.dataframe(
+            comparison_df.iloc[order],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "就绪度": st.column_config.ProgressColumn("就绪度", min_value=0, max_value=100, format="%.1f")
+            }
+        )
+        st.caption("点击表头可按任意列排序；在卡片视图中可查看单个行业的雷达图与操作按钮。")
+    else:
+        # 动态生成追踪卡片
+        cols = st.columns(2)
+    
+        for i, industry in enumerate(st.session_state.watchlist):
+            row = industry_index[industry]
+            data = get_sentinel_data(industry, progress_matrix[row], readiness_scores[row], financial_coverage[row])
+        
+            with cols[i % 2]:
+                with st.container(border=True):
+                    # 标题和总体评分
+                    header_cols = st.columns([2, 1])
+                    with header_cols[0]:
+                        st.subheader(f"📊 {industry}")
+                    with header_cols[1]:
+                        st.markdown(f"<h2 style='text-align: right; color: {data['assessment']['color']};'>{data['readiness_score']}%</h2>", 
+                                   unsafe_allow_html=True)
                 
-                # 评估等级
-                st.markdown(f"**{data['assessment']['level']}**")
-                st.markdown(f"*{data['assessment']['message']}*")
+                    # 评估等级
+                    st.markdown(f"**{data['assessment']['level']}**")
+                    st.markdown(f"*{data['assessment']['message']}*")
                 
-                # 进度条
-                st.progress(data['readiness_score'] / 100)
-                st.caption(f"已达标指标：{data['achieved_count']} / 7")
+                    # 进度条
+                    st.progress(data['readiness_score'] / 100)
+                    st.caption(f"已达标指标：{data['achieved_count']} / 7")
                 
-                # 雷达图
-                radar_fig = create_sentinel_radar(data['indicators'])
-                st.plotly_chart(radar_fig, use_container_width=True, key=f"radar_{i}")
+                    # 雷达图
+                    radar_fig = create_sentinel_radar(data['indicators'])
+                    st.plotly_chart(radar_fig, use_container_width=True, key=f"radar_{i}")
                 
-                # 详细指标展开
-                with st.expander("📋 查看7大指标详情"):
-                    for ind in data['indicators']:
-                        icon = "✅" if ind["status"] else "⬜"
-                        progress_color = "green" if ind["status"] else "gray"
-                        st.markdown(f"{icon} **{ind['name']}**：{ind['description']}")
-                        st.progress(ind['progress'] / 100)
+                    # 详细指标展开
+                    with st.expander("📋 查看7大指标详情"):
+                        for ind in data['indicators']:
+                            icon = "✅" if ind["status"] else "⬜"
+                            progress_color = "green" if ind["status"] else "gray"
+                            st.markdown(f"{icon} **{ind['name']}**：{ind['description']}（{ind['source']}）")
+                            st.progress(ind['progress'] / 100)
                 
-                # 趋势图
-                with st.expander("📈 近12个月趋势"):
-                    trend_fig = go.Figure()
-                    trend_fig.add_trace(go.Scatter(
-                        x=data['trend_months'],
-                        y=data['trend_scores'],
-                        mode='lines+markers',
-                        line=dict(color='teal', width=2),
-                        marker=dict(size=8)
-                    ))
-                    trend_fig.add_hline(y=80, line_dash="dash", line_color="green", 
-                                       annotation_text="推荐入场线")
-                    trend_fig.add_hline(y=60, line_dash="dash", line_color="orange",
-                                       annotation_text="关注线")
-                    trend_fig.update_layout(
-                        height=250,
-                        margin=dict(l=20, r=20, t=20, b=20),
-                        showlegend=False,
-                        xaxis_title="月份",
-                        yaxis_title="就绪度评分"
-                    )
-                    st.plotly_chart(trend_fig, use_container_width=True, key=f"trend_{i}")
+                    # 趋势图
+                    with st.expander("📈 近12个月趋势"):
+                        observed = int(np.count_nonzero(~np.isnan(trend['scores'][row])))
+                        if observed < 2:
+                            st.caption("历史记录不足，系统每月自动记录一次就绪度快照，积累2个月以上后显示趋势。")
+                        trend_fig = create_readiness_trend_chart(
+                            trend['months'], trend['scores'][row], trend['rolling_mean'][row]
+                        )
+                        st.plotly_chart(trend_fig, use_container_width=True, key=f"trend_{i}")
+                        downsample_info = get_downsample_info(trend_fig)
+                        if downsample_info:
+                            st.caption(f"已降采样：{downsample_info['原始点数']} → {downsample_info['保留点数']} 个点"
+                                       f"（耗时 {downsample_info['耗时(ms)']} ms）")
+
+                        slope = trend['slope'][row]
+                        momentum = trend['momentum'][row]
+                        eta = trend['months_to_threshold'][row]
+                        trend_cols = st.columns(3)
+                        with trend_cols[0]:
+                            st.metric("月均变化", f"{slope:+.1f}" if not np.isnan(slope) else "—")
+                        with trend_cols[1]:
+                            st.metric("动量", f"{momentum:+.1f}" if not np.isnan(momentum) else "—")
+                        with trend_cols[2]:
+                            if np.isnan(eta):
+                                eta_text = "—"
+                            elif eta == 0:
+                                eta_text = "已达标"
+                            else:
+                                eta_text = f"约{int(np.ceil(eta))}个月"
+                            st.metric("距入场线", eta_text)
                 
-                # 行动建议
-                st.markdown("---")
-                st.markdown(f"**💡 行动建议**：{data['assessment']['action']}")
+                    # 行动建议
+                    st.markdown("---")
+                    st.markdown(f"**💡 行动建议**：{data['assessment']['action']}")
                 
-                # 操作按钮
-                btn_cols = st.columns(2)
-                with btn_cols[0]:
-                    if st.button(f"🤖 AI深度分析", key=f"ai_{i}"):
-                        st.session_state['target_industry'] = industry
-                        st.switch_page("pages/03_🤖_AI协同规划官.py")
-                with btn_cols[1]:
-                    if st.button(f"🛤️ 路径推演", key=f"path_{i}"):
-                        st.session_state['target_industry'] = industry
-                        st.switch_page("pages/04_🛤️_职业路径推演.py")
+                    # 操作按钮
+                    btn_cols = st.columns(2)
+                    with btn_cols[0]:
+                        if st.button(f"🤖 AI深度分析", key=f"ai_{i}"):
+                            st.session_state['target_industry'] = industry
+                            st.switch_page("pages/03_🤖_AI协同规划官.py")
+                    with btn_cols[1]:
+                        if st.button(f"🛤️ 路径推演", key=f"path_{i}"):
+                            st.session_state['target_industry'] = industry
+                            st.switch_page("pages/04_🛤️_职业路径推演.py")
+
+# ==========================================
+# 就绪度排行榜
+# ==========================================
+st.markdown("---")
+if financial_coverage.any():
+    covered = int(financial_coverage.any(axis=1).sum())
+    st.info(f"📊 已从本地财务数据（{FINANCIAL_DATA_DIR}）计算 {covered} 个行业的部分指标，其余指标仍为演示数据")
+skipped_files = get_skipped_financial_files()
+if skipped_files:
+    st.warning(f"⚠️ 未安装 pyarrow，已跳过 {len(skipped_files)} 个 Parquet 财务数据文件（pip install pyarrow 后可读取）")
+
+st.markdown("### 🏆 就绪度排行榜")
+st.caption(f"按当前指标权重对 {len(tracked_industries)} 个行业加权评分（部分达标按进度计入）")
+
+top_n = st.slider("显示前N名：", 5, min(100, len(tracked_industries)), min(20, len(tracked_industries)))
+leaderboard = rank_industries(tracked_industries, progress_matrix, indicator_weights, top_n=top_n)
+st.dataframe(
+    leaderboard,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "就绪度": st.column_config.ProgressColumn("就绪度", min_value=0, max_value=100, format="%.1f")
+    }
+)
 
 # ==========================================
 # 7大指标说明
@@ -1,12 +1,20 @@
 """
 马江博周期框架回测数据收集工具
 用于批量获取行业指数历史数据，计算收益率
+指数日线保存在本地行情库（data/index_prices/{指数代码}.csv），联网下载依赖 akshare（可选）
 """
 
-import akshare as ak
+import os
+from functools import lru_cache
+
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import akshare as ak
+except ImportError:  # akshare 仅在联网下载行情时需要
+    ak = None
 
 # 行业指数代码映射表（可根据需要扩展）
 INDUSTRY_INDEX_MAP = {
@@ -24,9 +32,210 @@ INDUSTRY_INDEX_MAP = {
     "CXO": {"code": "931750", "name": "中证创新药指数", "exchange": "csi"},
 }
 
+# 包含匹配时行业名称与映射名的最短长度（单字输入不做包含匹配）
+MIN_INDEX_MATCH_CHARS = 2
+
 # 基准指数
 BENCHMARK_INDEX = {"code": "000300", "name": "沪深300", "exchange": "sse"}
 
+# 本地指数行情库（每个指数一个 CSV：日期, 收盘）
+INDEX_PRICE_DIR = "data/index_prices"
+PRICE_COLUMNS = ['日期', '收盘']
+
+
+# ==========================================
+# 本地指数行情库
+# ==========================================
+def get_index_price_path(index_code: str, folder: str = INDEX_PRICE_DIR) -> str:
+    """返回指数在本地行情库中的文件路径"""
+    return os.path.join(folder, f"{index_code}.csv")
+
+
+@lru_cache(maxsize=64)
+def _read_index_history(path: str, version: str) -> pd.DataFrame:
+    """按文件版本缓存读取行情（文件更新后版本变化，自动重新读取）"""
+    df = pd.read_csv(path, encoding='utf-8', usecols=PRICE_COLUMNS, parse_dates=['日期'])
+    return df.dropna().sort_values('日期').drop_duplicates('日期', keep='last').reset_index(drop=True)
+
+
+def load_index_history(index_code: str, folder: str = INDEX_PRICE_DIR) -> Optional[pd.DataFrame]:
+    """
+    从本地行情库加载指数日线（带缓存，重复查询直接命中内存）
+
+    Args:
+        index_code: 指数代码
+        folder: 行情库目录
+
+    Returns:
+        按日期升序的 DataFrame（日期, 收盘）；本地无数据时返回 None
+    """
+    path = get_index_price_path(index_code, folder)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return _read_index_history(path, f"{stat.st_size}:{stat.st_mtime_ns}")
+
+
+def download_index_history(index_code: str, start_date: str, end_date: str,
+                           folder: str = INDEX_PRICE_DIR) -> int:
+    """
+    通过 akshare 下载指数日线并合并写入本地行情库
+
+    Args:
+        index_code: 指数代码
+        start_date: 开始日期 (YYYY-MM-DD)
+        end_date: 结束日期 (YYYY-MM-DD)
+        folder: 行情库目录
+
+    Returns:
+        写入后本地该指数的记录数
+    """
+    if ak is None:
+        raise ImportError("下载指数行情需要安装 akshare：pip install akshare")
+
+    df = ak.index_zh_a_hist(
+        symbol=index_code,
+        period="daily",
+        start_date=start_date.replace("-", ""),
+        end_date=end_date.replace("-", "")
+    )
+    df = df[PRICE_COLUMNS].copy()
+    df['日期'] = pd.to_datetime(df['日期'])
+
+    existing = load_index_history(index_code, folder)
+    if existing is not None:
+        df = pd.concat([existing, df], ignore_index=True)
+    df = df.dropna().sort_values('日期').drop_duplicates('日期', keep='last')
+
+    os.makedirs(folder, exist_ok=True)
+    df.to_csv(get_index_price_path(index_code, folder), index=False, encoding='utf-8',
+              date_format='%Y-%m-%d')
+    return len(df)
+
+
+def update_index_price_store(start_date: str = "2015-01-01", end_date: Optional[str] = None,
+                             folder: str = INDEX_PRICE_DIR) -> Dict[str, int]:
+    """
+    下载 INDUSTRY_INDEX_MAP 中所有行业指数及沪深300基准，更新本地行情库
+
+    Returns:
+        {指数代码: 记录数}，下载失败的指数记为 0
+    """
+    end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+    codes = [info["code"] for info in INDUSTRY_INDEX_MAP.values()] + [BENCHMARK_INDEX["code"]]
+    counts = {}
+    for code in dict.fromkeys(codes):
+        try:
+            counts[code] = download_index_history(code, start_date, end_date, folder)
+        except Exception as e:
+            print(f"下载指数 {code} 数据失败: {e}")
+            counts[code] = 0
+    return counts
+
+
+def match_index_industry(industry_name: str) -> Optional[str]:
+    """
+    将行业名称映射到 INDUSTRY_INDEX_MAP 中的行业（精确匹配优先，其次行业名称包含映射名）
+
+    例如“光伏硅料”映射到“光伏”，“新能源汽车零部件”映射到“新能源汽车”；
+    只做单向包含，“新能源”“能”这类比映射名更短的输入不会匹配到“新能源汽车”。
+
+    Returns:
+        INDUSTRY_INDEX_MAP 中的行业名称；无法映射时返回 None（调用方负责提示）
+    """
+    name = (industry_name or "").strip()
+    if not name:
+        return None
+    exact = {key.lower(): key for key in INDUSTRY_INDEX_MAP}
+    if name.lower() in exact:
+        return exact[name.lower()]
+    if len(name) < MIN_INDEX_MATCH_CHARS:
+        return None
+    # 较长的映射名优先，“新能源汽车零部件”命中“新能源汽车”而不是更短的映射名
+    for key in sorted(INDUSTRY_INDEX_MAP, key=len, reverse=True):
+        if len(key) >= MIN_INDEX_MATCH_CHARS and key.lower() in name.lower():
+            return key
+    return None
+
+
+def _price_on_or_before(history: pd.DataFrame, date: pd.Timestamp) -> Optional[float]:
+    """取指定日期（含）之前最近一个交易日的收盘价"""
+    pos = history['日期'].searchsorted(date, side='right') - 1
+    if pos < 0:
+        return None
+    return float(history['收盘'].iloc[pos])
+
+
+def get_index_return_from_store(index_code: str, start_date: str, end_date: str,
+                                folder: str = INDEX_PRICE_DIR) -> Optional[float]:
+    """
+    基于本地行情库计算指数区间收益率 (%)
+
+    本地数据未覆盖起点时返回 None
+    """
+    history = load_index_history(index_code, folder)
+    if history is None or history.empty:
+        return None
+    start_dt, end_dt = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    if history['日期'].iloc[0] > start_dt or history['日期'].iloc[-1] < start_dt:
+        return None
+    start_price = _price_on_or_before(history, start_dt)
+    end_price = _price_on_or_before(history, end_dt)
+    if not start_price or end_price is None:
+        return None
+    return round((end_price - start_price) / start_price * 100, 2)
+
+
+def get_replay_series(industry_name: str, years: int, end_date: Optional[str] = None,
+                      folder: str = INDEX_PRICE_DIR) -> Dict:
+    """
+    获取历史回放所需的逐年行业指数与沪深300累计涨幅
+
+    以 end_date 向前 years 年为起点，在起点及此后每个周年日取最近交易日收盘价。
+
+    Args:
+        industry_name: 行业名称（会通过 match_index_industry 映射到指数）
+        years: 回放年数
+        end_date: 回放终点 (YYYY-MM-DD)，默认今天（取本地数据的最后交易日与今天中较早者）
+        folder: 行情库目录
+
+    Returns:
+        成功时包含 行业、指数名称、dates、行业累计涨幅、沪深300累计涨幅、相对收益（均为逐年列表，单位%）；
+        失败时包含 error
+    """
+    matched = match_index_industry(industry_name)
+    if matched is None:
+        return {"error": f"未找到行业 '{industry_name}' 的指数映射，可选行业：{'、'.join(INDUSTRY_INDEX_MAP)}"}
+
+    index_info = INDUSTRY_INDEX_MAP[matched]
+    industry_history = load_index_history(index_info["code"], folder)
+    benchmark_history = load_index_history(BENCHMARK_INDEX["code"], folder)
+    if industry_history is None or benchmark_history is None:
+        return {"error": "本地行情库缺少该指数或沪深300数据，请先运行 "
+                         "python -m utils.backtest_data_collector --update-store 下载"}
+
+    end_dt = pd.Timestamp(end_date) if end_date else pd.Timestamp(datetime.now().date())
+    end_dt = min(end_dt, industry_history['日期'].iloc[-1], benchmark_history['日期'].iloc[-1])
+    anchors = [end_dt - pd.DateOffset(years=years - k) for k in range(years + 1)]
+
+    first_available = max(industry_history['日期'].iloc[0], benchmark_history['日期'].iloc[0])
+    if anchors[0] < first_available:
+        return {"error": f"本地行情库数据起始于 {first_available:%Y-%m-%d}，不足以回放 {years} 年"}
+
+    industry_prices = [_price_on_or_before(industry_history, d) for d in anchors]
+    benchmark_prices = [_price_on_or_before(benchmark_history, d) for d in anchors]
+    industry_cum = [round((p / industry_prices[0] - 1) * 100, 2) for p in industry_prices]
+    benchmark_cum = [round((p / benchmark_prices[0] - 1) * 100, 2) for p in benchmark_prices]
+
+    return {
+        "行业": matched,
+        "指数名称": index_info["name"],
+        "dates": [d.strftime("%Y-%m-%d") for d in anchors],
+        "行业累计涨幅": industry_cum,
+        "沪深300累计涨幅": benchmark_cum,
+        "相对收益": [round(i - b, 2) for i, b in zip(industry_cum, benchmark_cum)],
+    }
+
 
 def get_index_return(index_code: str, start_date: str, end_date: str) -> float:
     """
@@ -40,6 +249,13 @@ def get_index_return(index_code: str, start_date: str, end_date: str) -> float:
     Returns:
         区间收益率 (%)
     """
+    local_return = get_index_return_from_store(index_code, start_date, end_date)
+    if local_return is not None:
+        return local_return
+    if ak is None:
+        print(f"本地行情库无指数 {index_code} 数据，且未安装 akshare")
+        return None
+
     try:
         df = ak.index_zh_a_hist(
             symbol=index_code,
@@ -128,7 +344,9 @@ def batch_backtest(
     for industry, start_date in test_cases:
         print(f"正在计算: {industry} ({start_date})...")
         result = calculate_backtest_metrics(industry, start_date)
-        if "error" not in result:
+        if "error" in result:
+            print(f"  跳过 {industry}：{result['error']}")
+        else:
             results.append(result)
     
     return pd.DataFrame(results)
@@ -196,6 +414,14 @@ def validate_prediction(
 
 # 示例：快速测试
 if __name__ == "__main__":
+    import sys
+
+    if "--update-store" in sys.argv:
+        print("正在更新本地指数行情库...")
+        for code, count in update_index_price_store().items():
+            print(f"  {code}: {count} 条")
+        sys.exit(0)
+
     # 测试案例：新能源汽车 2020年6月
     print("=" * 50)
     print("马江博周期框架回测数据收集工具")
@@ -0,0 +1,362 @@
+"""
+批量简历诊断（命令行，无界面）
+对文件夹或 JSONL 中的大量简历运行「简历诊断中心」的解析、风险分析与转型推荐：
+文件文本提取在进程池中执行，LLM 调用用固定数量的异步工作协程限制并发，
+结果逐条追加写入 JSONL；输出文件本身即断点，中断后重新运行会跳过已完成的简历
+
+用法：
+    python -m utils.batch_diagnosis resumes/ -o results.jsonl --concurrency 16
+    python -m utils.batch_diagnosis resumes.jsonl -o results.jsonl --base-url http://127.0.0.1:8765/v1
+    python -m utils.batch_diagnosis resumes/ -o results.jsonl --mock --mock-latency 0.5   # 吞吐量测试
+
+JSONL 输入每行一个对象：{"id": "...", "text": "简历文本"} 或 {"id": "...", "path": "简历文件路径"}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional, Set
+
+import numpy as np
+
+from utils.document_extractor import (
+    EXTRACTION_TIMEOUT_S,
+    MAX_UPLOAD_BYTES,
+    SUPPORTED_EXTENSIONS,
+    ExtractionPool,
+    create_extraction_pool,
+    get_file_extension,
+    terminate_process_pool
+)
+from utils.resume_analyzer import (
+    RESUME_PARSE_MODEL,
+    diagnose_parsed_resume,
+    fallback_parse,
+    parse_resume_with_llm_async
+)
+from utils.resume_extractor import LOCAL_CONFIDENCE_THRESHOLD, extract_resume_locally, is_confident
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_EXTRACTION_WORKERS = 2
+DEFAULT_TIMEOUT_S = 60
+DEFAULT_MAX_RETRIES = 2
+FSYNC_EVERY = 50            # 每写入多少条结果强制落盘一次
+
+STATUS_OK = "ok"
+STATUS_FALLBACK = "fallback"    # LLM 解析失败，使用实体链接备用方案
+STATUS_ERROR = "error"          # 文件无法读取或提取
+
+
+# ==========================================
+# 输入与断点
+# ==========================================
+def iter_resume_records(input_path: str) -> Iterator[Dict]:
+    """
+    遍历待诊断简历
+
+    Args:
+        input_path: 简历文件夹（PDF/DOCX/TXT，按文件名排序）或 JSONL 文件
+
+    Yields:
+        {"id", "text"} 或 {"id", "path"}
+    """
+    if os.path.isdir(input_path):
+        for name in sorted(os.listdir(input_path)):
+            path = os.path.join(input_path, name)
+            if os.path.isfile(path) and get_file_extension(name) in SUPPORTED_EXTENSIONS:
+                yield {"id": name, "path": path}
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(input_path))
+    with open(input_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield {"id": f"line-{line_no}", "error": "输入行不是有效的 JSON"}
+                continue
+            record_id = str(record.get("id") or f"line-{line_no}")
+            if record.get("text"):
+                yield {"id": record_id, "text": str(record["text"])}
+            elif record.get("path"):
+                yield {"id": record_id, "path": os.path.join(base_dir, record["path"])}
+            else:
+                yield {"id": record_id, "error": "缺少 text 或 path 字段"}
+
+
+def load_completed_ids(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    读取已有结果作为断点：返回已完成的简历 id，并截掉崩溃时写了一半的最后一行
+
+    Args:
+        output_path: 结果 JSONL 路径
+        retry_errors: 为 True 时状态为 error 的简历不算完成（重新运行时会再次处理）
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    valid_bytes = 0
+    with open(output_path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(raw)
+            except json.JSONDecodeError:
+                break
+            valid_bytes += len(raw)
+            if retry_errors and record.get("status") == STATUS_ERROR:
+                completed.discard(record.get("id"))
+            else:
+                completed.add(record.get("id"))
+
+    if valid_bytes < os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return completed
+
+
+# ==========================================
+# 单份简历处理
+# ==========================================
+async def _load_resume_text(record: Dict, pool: ExtractionPool, timeout: float) -> str:
+    if "text" in record:
+        return record["text"]
+
+    path = record["path"]
+    extension = get_file_extension(path)
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"不支持的文件格式：{extension or '未知'}")
+    data = await asyncio.to_thread(_read_bytes, path)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(f"文件过大（{len(data) / 1024 / 1024:.1f}MB）")
+    # 超时或崩溃只结束处理该文件的进程，后续文件不受影响
+    result = await asyncio.to_thread(pool.run, extension, data, timeout)
+    return result["text"]
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def diagnose_record(record: Dict, client, model: str, pool: ExtractionPool,
+                          extraction_timeout: float = EXTRACTION_TIMEOUT_S,
+                          min_confidence: float = LOCAL_CONFIDENCE_THRESHOLD) -> Dict:
+    """
+    诊断一份简历：提取文本 → 本地规则提取（置信度不足时 LLM 解析，失败时用备用方案）→ 风险分析与转型推荐
+
+    Returns:
+        可直接写入 JSONL 的结果（包含 id、status 与诊断字段）
+    """
+    start = time.perf_counter()
+    result = {"id": record["id"], "source": record.get("path", "inline")}
+    if record.get("error"):
+        return {**result, "status": STATUS_ERROR, "error": record["error"]}
+
+    try:
+        text = await _load_resume_text(record, pool, extraction_timeout)
+    except Exception as e:
+        return {**result, "status": STATUS_ERROR, "error": f"文本提取失败：{e}"}
+    if not text.strip():
+        return {**result, "status": STATUS_ERROR, "error": "未能提取到文字"}
+
+    llm_ms = None
+    parsed = extract_resume_locally(text)
+    result["parse_source"] = "local"
+    if not is_confident(parsed, min_confidence):
+        llm_start = time.perf_counter()
+        parsed = await parse_resume_with_llm_async(text, client, model=model)
+        llm_ms = (time.perf_counter() - llm_start) * 1000
+        result["parse_source"] = "llm"
+
+    status = STATUS_OK
+    if parsed.get("error") or parsed.get("parse_error"):
+        status = STATUS_FALLBACK
+        result["llm_error"] = parsed.get("error") or "LLM 返回内容不是有效 JSON"
+        parsed = fallback_parse(text)
+
+    diagnosis = diagnose_parsed_resume(parsed)
+    risk = diagnosis["risk_analysis"]
+    return {
+        **result,
+        "status": status,
+        "chars": len(text),
+        **diagnosis,
+        "risk_summary": {level: len(items) for level, items in risk.items()},
+        **({"llm_ms": round(llm_ms, 1)} if llm_ms is not None else {}),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+# ==========================================
+# 批量调度
+# ==========================================
+async def run_batch(input_path: str, output_path: str, base_url: str, api_key: str,
+                    model: str = RESUME_PARSE_MODEL, concurrency: int = DEFAULT_CONCURRENCY,
+                    extraction_workers: int = DEFAULT_EXTRACTION_WORKERS, timeout: float = DEFAULT_TIMEOUT_S,
+                    max_retries: int = DEFAULT_MAX_RETRIES, limit: Optional[int] = None,
+                    retry_errors: bool = False, progress_every: int = 100,
+                    min_confidence: float = LOCAL_CONFIDENCE_THRESHOLD) -> Dict:
+    """
+    批量诊断主流程
+
+    Args:
+        input_path: 简历文件夹或 JSONL
+        output_path: 结果 JSONL（追加写入，同时作为断点）
+        base_url: OpenAI 兼容接口地址
+        api_key: API Key
+        model: 模型名称
+        concurrency: 同时进行的 LLM 请求数上限
+        extraction_workers: 文本提取进程数
+        timeout: 单个 LLM 请求超时（秒）
+        max_retries: LLM 请求失败重试次数
+        limit: 本次最多处理的简历数
+        retry_errors: 是否重新处理上次状态为 error 的简历
+        progress_every: 每处理多少份打印一次进度
+        min_confidence: 本地提取结果的采用阈值，大于 1 表示所有简历都调用 LLM
+
+    Returns:
+        运行统计
+    """
+    from openai import AsyncOpenAI
+
+    completed = load_completed_ids(output_path, retry_errors=retry_errors)
+    client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries)
+    pool = create_extraction_pool(extraction_workers)
+
+    # 有界队列：简历按需读入，内存占用与并发数成正比而非与简历总数成正比
+    todo: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    stats = {"skipped": 0, "submitted": 0, "local": 0, STATUS_OK: 0, STATUS_FALLBACK: 0, STATUS_ERROR: 0}
+    latencies = []
+
+    async def produce():
+        for record in iter_resume_records(input_path):
+            if record["id"] in completed:
+                stats["skipped"] += 1
+                continue
+            if limit is not None and stats["submitted"] >= limit:
+                break
+            stats["submitted"] += 1
+            await todo.put(record)
+        for _ in range(concurrency):
+            await todo.put(None)
+
+    async def work():
+        while True:
+            record = await todo.get()
+            if record is None:
+                return
+            try:
+                outcome = await diagnose_record(record, client, model, pool,
+                                                min_confidence=min_confidence)
+            except Exception as e:
+                outcome = {"id": record["id"], "status": STATUS_ERROR, "error": str(e)}
+            await results.put(outcome)
+
+    async def write():
+        written = 0
+        with open(output_path, "a", encoding="utf-8") as f:
+            while True:
+                outcome = await results.get()
+                if outcome is None:
+                    break
+                f.write(json.dumps(outcome, ensure_ascii=False, default=str) + "\n")
+                f.flush()
+                written += 1
+                stats[outcome["status"]] += 1
+                stats["local"] += outcome.get("parse_source") == "local"
+                if "llm_ms" in outcome:
+                    latencies.append(outcome["llm_ms"])
+                if written % FSYNC_EVERY == 0:
+                    os.fsync(f.fileno())
+                if progress_every and written % progress_every == 0:
+                    rate = written / (time.perf_counter() - start)
+                    print(f"已完成 {written} 份（{rate:.1f} 份/秒）", file=sys.stderr)
+            f.flush()
+            os.fsync(f.fileno())
+
+    start = time.perf_counter()
+    writer = asyncio.create_task(write())
+    try:
+        workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+        await asyncio.gather(produce(), *workers)
+        await results.put(None)
+        await writer
+    finally:
+        if not writer.done():
+            writer.cancel()
+        terminate_process_pool(pool)
+        await client.close()
+
+    elapsed = time.perf_counter() - start
+    processed = stats[STATUS_OK] + stats[STATUS_FALLBACK] + stats[STATUS_ERROR]
+    summary = {
+        "processed": processed,
+        "skipped": stats["skipped"],
+        "ok": stats[STATUS_OK],
+        "fallback": stats[STATUS_FALLBACK],
+        "error": stats[STATUS_ERROR],
+        "llm_calls_avoided": stats["local"],
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+    if latencies:
+        summary["llm_p50_ms"] = round(float(np.percentile(latencies, 50)), 1)
+        summary["llm_p95_ms"] = round(float(np.percentile(latencies, 95)), 1)
+    return summary
+
+
+def main(argv=None):
+    from utils.llm_engine import DEEPSEEK_BASE_URL
+
+    parser = argparse.ArgumentParser(description="批量简历诊断")
+    parser.add_argument("input", help="简历文件夹（PDF/DOCX/TXT）或 JSONL 文件")
+    parser.add_argument("-o", "--output", default="diagnosis_results.jsonl", help="结果 JSONL（同时作为断点）")
+    parser.add_argument("--base-url", default=DEEPSEEK_BASE_URL, help="OpenAI 兼容接口地址")
+    parser.add_argument("--api-key", default=os.environ.get("DEEPSEEK_API_KEY", ""),
+                        help="API Key（默认读取环境变量 DEEPSEEK_API_KEY）")
+    parser.add_argument("--model", default=RESUME_PARSE_MODEL)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="LLM 并发请求数上限")
+    parser.add_argument("--workers", type=int, default=DEFAULT_EXTRACTION_WORKERS, help="文本提取进程数")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_S, help="单个 LLM 请求超时（秒）")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--limit", type=int, default=None, help="本次最多处理的简历数")
+    parser.add_argument("--min-confidence", type=float, default=LOCAL_CONFIDENCE_THRESHOLD,
+                        help="本地规则提取结果的采用阈值（0-1），大于 1 表示总是调用 LLM")
+    parser.add_argument("--retry-errors", action="store_true", help="重新处理上次失败（error）的简历")
+    parser.add_argument("--mock", action="store_true", help="启动本地模拟 LLM 服务并使用它（吞吐量测试）")
+    parser.add_argument("--mock-latency", type=float, default=0.5, help="模拟服务的响应延迟（秒）")
+    args = parser.parse_args(argv)
+
+    base_url, api_key, mock_server = args.base_url, args.api_key, None
+    if args.mock:
+        from utils.mock_llm_server import start_mock_llm_server
+        mock_server = start_mock_llm_server(latency=args.mock_latency)
+        base_url, api_key = mock_server.base_url, "mock"
+    if not api_key:
+        parser.error("未提供 API Key：请设置 DEEPSEEK_API_KEY 或使用 --api-key / --mock")
+
+    try:
+        summary = asyncio.run(run_batch(
+            args.input, args.output, base_url, api_key, model=args.model,
+            concurrency=args.concurrency, extraction_workers=args.workers, timeout=args.timeout,
+            max_retries=args.max_retries, limit=args.limit, retry_errors=args.retry_errors,
+            min_confidence=args.min_confidence
+        ))
+    finally:
+        if mock_server is not None:
+            mock_server.shutdown()
+    print(json.dumps(summary, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 # utils/data_processor.py
+import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 
@@ -34,6 +36,18 @@ def load_industry_data(file_path="data/细分领域行业周期研判表.csv"):
         st.stop()
 
 
+def get_file_version(file_path: str) -> str:
+    """
+    获取数据文件的版本标识（大小 + 修改时间），文件变化时标识随之变化。
+    用作缓存键的一部分，保证数据更新后缓存自动失效；文件不存在时返回空字符串。
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return ""
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
 def get_cycle_distribution(df):
     """
     获取各个周期阶段的行业数量统计，用于前端渲染饼图或柱状图。
@@ -214,6 +228,16 @@ def get_risk_industries(df):
     return results
 
 
+# 产业周期阶段对应的可视化评分
+INDUSTRY_CYCLE_SCORES = {
+    "初创期": 25,
+    "成长期": 75,
+    "成熟期": 50,
+    "调整期": 25,
+    "衰退期": 10
+}
+
+
 def get_industry_cycle_score(industry_stage: str) -> int:
     """
     获取产业周期阶段评分（用于可视化）
@@ -224,14 +248,7 @@ def get_industry_cycle_score(industry_stage: str) -> int:
     Returns:
         0-100的评分
     """
-    scores = {
-        "初创期": 25,
-        "成长期": 75,
-        "成熟期": 50,
-        "调整期": 25,
-        "衰退期": 10
-    }
-    return scores.get(industry_stage, 50)
+    return INDUSTRY_CYCLE_SCORES.get(industry_stage, 50)
 
 
 def get_policy_cycle_score(sentiment: str) -> int:
@@ -251,3 +268,30 @@ def get_policy_cycle_score(sentiment: str) -> int:
     elif "承压" in sentiment or "低" in sentiment:
         return 20
     return 50
+
+
+def compute_cycle_scores(df) -> pd.DataFrame:
+    """
+    向量化计算整张表的产业周期评分与政策周期评分（与逐行调用
+    get_industry_cycle_score / get_policy_cycle_score 结果一致）
+
+    Args:
+        df: 行业数据DataFrame
+
+    Returns:
+        包含 产业周期评分、政策周期评分 两列的 DataFrame（索引与 df 一致）
+    """
+    industry_scores = df['当前周期阶段'].map(INDUSTRY_CYCLE_SCORES).fillna(50).astype(int)
+
+    sentiment = df['未来1-3年景气度'].astype(str)
+    policy_scores = np.select(
+        [
+            sentiment.str.contains('高', regex=False),
+            sentiment.str.contains('平稳', regex=False),
+            sentiment.str.contains('承压', regex=False) | sentiment.str.contains('低', regex=False),
+        ],
+        [80, 50, 20],
+        default=50
+    )
+
+    return pd.DataFrame({'产业周期评分': industry_scores, '政策周期评分': policy_scores}, index=df.index)
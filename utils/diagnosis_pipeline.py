@@ -0,0 +1,258 @@
+"""
+简历诊断流水线
+本地规则提取、关键词识别与知识库风险查询在线程池中立即开始，与（在单独线程池中运行的）LLM 流式解析并行；
+解析完成后合并结果。工作线程只做计算并把事件放入队列，不调用 Streamlit，
+页面在主线程中消费事件，按完成顺序逐个渲染行业风险
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from utils.rag_engine import get_rag_engine
+from utils.resume_analyzer import (
+    analyze_industry_risk,
+    empty_parse_result,
+    extract_industries_from_text,
+    fallback_parse,
+    get_parsed_industries,
+    merge_parse_results,
+    stream_resume_parse,
+)
+from utils.resume_extractor import (
+    LOCAL_CONFIDENCE_THRESHOLD,
+    SAMPLE_CORPUS_PATH,
+    extract_resume_locally,
+    is_confident,
+)
+
+logger = logging.getLogger(__name__)
+
+# 本地提取与行业风险查询的线程池大小（全进程共享，任务都很短）
+PIPELINE_WORKERS = 8
+
+# 解析线程池大小：LLM 流式解析会占用线程直到生成结束，单独成池，
+# 并发诊断较多时也不会让风险查询排在长时间的 LLM 请求后面
+PARSE_WORKERS = 16
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(name: str = "diagnosis", max_workers: int = PIPELINE_WORKERS) -> ThreadPoolExecutor:
+    with _executor_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return executor
+
+
+class DiagnosisPipeline:
+    """
+    一次简历诊断的并行流水线
+
+    事件（kind, payload）：
+        ("local", 本地提取结果)、("industry", {"name", "period", "role"})、("skill", 技能)、
+        ("risk", (行业, analyze_industry_risk 的结果，查询失败时为异常对象))、("done", 合并后的解析结果)
+
+    Args:
+        resume_text: 简历文本，为空时只查询 extra_industries 的风险
+        extra_industries: 额外指定的行业（页面上手动选择的行业），立即开始风险查询
+        rag_engine: 知识库检索引擎，默认在创建流水线的线程（页面主线程）中获取
+        client: OpenAI 兼容客户端，需在主线程中创建后传入；为 None 时无法调用 LLM，直接使用备用识别
+        min_confidence: 直接采用本地结果的最低置信度
+    """
+
+    def __init__(self, resume_text: str, extra_industries: Optional[Sequence[str]] = None, rag_engine=None,
+                 client=None, min_confidence: float = LOCAL_CONFIDENCE_THRESHOLD):
+        self.resume_text = resume_text or ""
+        self.extra_industries = [name for name in extra_industries or [] if name]
+        self.rag_engine = rag_engine or get_rag_engine()
+        self.client = client
+        self.min_confidence = min_confidence
+        self.local: Optional[Dict] = None
+        self.used_llm = False
+        self.failed_risks: Dict[str, Exception] = {}
+        self._events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._risk_futures: Dict[str, Future] = {}
+        self._risk_lock = threading.Lock()
+        self._executor = _get_executor()
+        self._parse_executor = _get_executor("diagnosis-parse", PARSE_WORKERS)
+        self._started = False
+
+    # ------------------------------------------
+    # 工作线程
+    # ------------------------------------------
+    def submit_risk(self, industry: str) -> Future:
+        """提交单个行业的风险查询（同名行业只查询一次），完成时放入 ("risk", ...) 事件"""
+        with self._risk_lock:
+            future = self._risk_futures.get(industry)
+            if future is None:
+                future = self._executor.submit(analyze_industry_risk, industry, self.rag_engine)
+                future.add_done_callback(lambda f, name=industry: self._on_risk_done(name, f))
+                self._risk_futures[industry] = future
+            return future
+
+    def _on_risk_done(self, industry: str, future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.warning("行业风险查询失败：%s（%s）", industry, error)
+        self._events.put(("risk", (industry, error if error is not None else future.result())))
+
+    def _prefetch_keyword_risks(self, future: Future):
+        if future.exception() is None:
+            for name in future.result():
+                self.submit_risk(name)
+
+    def _parse(self):
+        """本地提取 → （置信度不足时）LLM 流式解析 → 合并，始终以 ("done", ...) 结束"""
+        parsed = empty_parse_result()
+        try:
+            if not self.resume_text.strip():
+                return
+            keyword_future = self._executor.submit(extract_industries_from_text, self.resume_text)
+            local = extract_resume_locally(self.resume_text)
+            self.local = local
+            self._events.put(("local", local))
+            for name in get_parsed_industries(local):
+                self.submit_risk(name)
+            if is_confident(local, self.min_confidence):
+                parsed = local
+                return
+
+            # 正文关键词命中的行业也提前查询，备用识别时可直接复用
+            keyword_future.add_done_callback(self._prefetch_keyword_risks)
+            if self.client is None:
+                llm_result = {"error": "未配置 API Key，无法调用 AI 解析"}
+            else:
+                self.used_llm = True
+                llm_result = {"error": "AI 解析未返回结果"}
+                for kind, payload in stream_resume_parse(self.resume_text, client=self.client):
+                    if kind == "done":
+                        llm_result = payload
+                        break
+                    if kind == "industry":
+                        self.submit_risk(payload["name"])
+                    if kind in ("industry", "skill"):
+                        self._events.put((kind, payload))
+
+            if llm_result.get("error") or llm_result.get("parse_error"):
+                parsed = merge_parse_results(fallback_parse(self.resume_text), local)
+                parsed["fallback"] = True
+            else:
+                parsed = merge_parse_results(llm_result, local)
+        except Exception as e:
+            parsed = {**empty_parse_result(), "error": str(e)}
+        finally:
+            self._events.put(("done", parsed))
+
+    # ------------------------------------------
+    # 主线程接口
+    # ------------------------------------------
+    def start(self) -> "DiagnosisPipeline":
+        """立即开始指定行业的风险查询与简历解析"""
+        if not self._started:
+            self._started = True
+            for name in self.extra_industries:
+                self.submit_risk(name)
+            self._parse_executor.submit(self._parse)
+        return self
+
+    def events(self) -> Iterator[Tuple[str, Any]]:
+        """按到达顺序产出事件，直到 ("done", 解析结果) 为止（在主线程中消费并渲染）"""
+        self.start()
+        while True:
+            kind, payload = self._events.get()
+            yield kind, payload
+            if kind == "done":
+                return
+
+    def iter_risks(self, industries: Sequence[str]) -> Iterator[Tuple[str, Tuple[str, Any]]]:
+        """
+        按完成顺序产出各行业的风险分析结果（已完成的立即产出，未提交的现在提交）
+
+        查询失败的行业记入 failed_risks，并按"未识别"产出，不中断其余行业
+        """
+        futures = {self.submit_risk(name): name for name in dict.fromkeys(industries)}
+        for future in as_completed(futures):
+            name = futures[future]
+            error = future.exception()
+            if error is not None:
+                self.failed_risks[name] = error
+                yield name, ("未识别", name)
+            else:
+                yield name, future.result()
+
+    def collect_risks(self, industries: Sequence[str]) -> Dict[str, Tuple[str, Any]]:
+        """等待并返回各行业的风险分析结果，可作为 analyze_industry_risks 的 known 参数"""
+        return dict(self.iter_risks(industries))
+
+
+def benchmark_pipeline(corpus_path: str = SAMPLE_CORPUS_PATH, latency: float = 0.5, limit: int = 8) -> Dict:
+    """
+    用本地模拟 LLM 服务比较串行诊断与流水线的首个风险结果耗时与全部风险结果耗时（强制调用 LLM）
+
+    串行：本地提取 → LLM 流式解析（每识别一个行业当场查询风险）→ 查询其余行业风险
+
+    Returns:
+        样本数与两种方式的平均耗时（ms）
+    """
+    import json
+    import time
+
+    from openai import OpenAI
+
+    from utils.mock_llm_server import start_mock_llm_server
+    from utils.resume_analyzer import analyze_industry_risks
+
+    with open(corpus_path, encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()][:limit]
+
+    server = start_mock_llm_server(latency=latency)
+    client = OpenAI(base_url=server.base_url, api_key="mock")
+    rag_engine = get_rag_engine()
+    timings = {"serial_first": [], "serial_total": [], "pipeline_first": [], "pipeline_total": []}
+    try:
+        for text in texts:
+            start = time.perf_counter()
+            first, known, parsed = None, {}, empty_parse_result()
+            extract_resume_locally(text)
+            for kind, payload in stream_resume_parse(text, client=client):
+                if kind == "industry":
+                    known[payload["name"]] = analyze_industry_risk(payload["name"], rag_engine)
+                    first = first or time.perf_counter()
+                elif kind == "done":
+                    parsed = payload
+                    break
+            analyze_industry_risks(get_parsed_industries(parsed), known=known)
+            end = time.perf_counter()
+            timings["serial_first"].append((first or end) - start)
+            timings["serial_total"].append(end - start)
+
+            start = time.perf_counter()
+            first = None
+            pipeline = DiagnosisPipeline(text, rag_engine=rag_engine, client=client, min_confidence=2)
+            for kind, payload in pipeline.events():
+                if kind == "risk":
+                    first = first or time.perf_counter()
+                elif kind == "done":
+                    parsed = payload
+            pipeline.collect_risks(get_parsed_industries(parsed))
+            end = time.perf_counter()
+            timings["pipeline_first"].append((first or end) - start)
+            timings["pipeline_total"].append(end - start)
+    finally:
+        server.shutdown()
+
+    result = {"samples": len(texts)}
+    result.update({f"{name}_ms": round(sum(values) / len(values) * 1000, 1) for name, values in timings.items()})
+    return result
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("简历诊断流水线：首个风险结果耗时（模拟 LLM 延迟 0.5s）")
+    print("=" * 50)
+    print(benchmark_pipeline())
@@ -0,0 +1,331 @@
+"""
+简历文件文本提取
+在专用工作进程中逐页提取 PDF / DOCX / TXT 文本，带文件大小、页数、字数限制与超时；
+每个进程同一时间只处理一个文件，超时只结束该文件的进程，不影响其他会话正在进行的提取；
+相同内容（sha256）的重复上传直接命中缓存，Streamlit 脚本线程最多等待到超时为止
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from typing import Dict, Optional
+
+import streamlit as st
+
+# ==========================================
+# 提取限制
+# ==========================================
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024      # 单个文件最大 5MB
+MAX_PDF_PAGES = 20                       # PDF 最多提取前 20 页
+MAX_TEXT_CHARS = 20_000                  # 提取文本达到该字数后停止
+EXTRACTION_TIMEOUT_S = 15                # 单个文件提取超时（秒）
+EXTRACTION_WORKERS = 2                   # 同时运行的提取进程数上限
+
+SUPPORTED_EXTENSIONS = ("pdf", "docx", "txt")
+
+
+class DocumentExtractionError(ValueError):
+    """文件无法提取（格式不支持、超出限制、超时或文件损坏）"""
+
+
+# ==========================================
+# 工作进程中执行的提取函数（须为模块级函数以便序列化）
+# ==========================================
+def _extract_pdf(data: bytes, max_pages: int, max_chars: int) -> Dict:
+    """逐页提取 PDF 文本（pdfplumber 优先，失败时回退 PyPDF2）"""
+    try:
+        return _extract_pdf_pdfplumber(data, max_pages, max_chars)
+    except Exception:
+        return _extract_pdf_pypdf2(data, max_pages, max_chars)
+
+
+def _extract_pdf_pdfplumber(data: bytes, max_pages: int, max_chars: int) -> Dict:
+    import pdfplumber
+
+    texts, chars = [], 0
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        total_pages = len(pdf.pages)
+        processed = 0
+        for page in pdf.pages[:max_pages]:
+            text = page.extract_text() or ""
+            # 逐页释放解析缓存，避免大文件占用过多内存
+            page.close()
+            texts.append(text)
+            chars += len(text)
+            processed += 1
+            if chars >= max_chars:
+                break
+    return _build_result(texts, processed, total_pages, max_chars)
+
+
+def _extract_pdf_pypdf2(data: bytes, max_pages: int, max_chars: int) -> Dict:
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    total_pages = len(reader.pages)
+    texts, chars, processed = [], 0, 0
+    for index in range(min(total_pages, max_pages)):
+        text = reader.pages[index].extract_text() or ""
+        texts.append(text)
+        chars += len(text)
+        processed += 1
+        if chars >= max_chars:
+            break
+    return _build_result(texts, processed, total_pages, max_chars)
+
+
+def _extract_docx(data: bytes, max_chars: int) -> Dict:
+    """提取 DOCX 段落与表格文本"""
+    from docx import Document
+
+    document = Document(io.BytesIO(data))
+    texts, chars = [], 0
+    blocks = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            blocks.append(" | ".join(cell.text.strip() for cell in row.cells))
+    for block in blocks:
+        if not block.strip():
+            continue
+        texts.append(block)
+        chars += len(block)
+        if chars >= max_chars:
+            break
+    return _build_result(texts, 1, 1, max_chars)
+
+
+def _extract_txt(data: bytes, max_chars: int) -> Dict:
+    """按常见中文编码解码纯文本"""
+    for encoding in ("utf-8-sig", "gb18030"):
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        text = data.decode("utf-8", errors="ignore")
+    return _build_result([text], 1, 1, max_chars)
+
+
+def _build_result(texts, processed_pages: int, total_pages: int, max_chars: int) -> Dict:
+    text = "\n".join(t.strip() for t in texts if t and t.strip())
+    return {
+        "text": text[:max_chars],
+        "pages": processed_pages,
+        "total_pages": total_pages,
+        "truncated": processed_pages < total_pages or len(text) > max_chars,
+    }
+
+
+def extract_document_bytes(extension: str, data: bytes, max_pages: int = MAX_PDF_PAGES,
+                           max_chars: int = MAX_TEXT_CHARS) -> Dict:
+    """
+    工作进程入口：按扩展名提取文件文本（会阻塞，须在工作进程或进程池中调用）
+
+    Returns:
+        包含 text、pages、total_pages、truncated
+    """
+    if extension == "pdf":
+        return _extract_pdf(data, max_pages, max_chars)
+    if extension == "docx":
+        return _extract_docx(data, max_chars)
+    return _extract_txt(data, max_chars)
+
+
+# ==========================================
+# 进程池
+# ==========================================
+def _extraction_worker_loop(conn):
+    """工作进程主循环：逐个接收 (扩展名, 内容, 页数上限, 字数上限)，结果或错误信息经管道发回"""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", extract_document_bytes(*task)))
+        except Exception as e:
+            conn.send(("error", str(e) or type(e).__name__))
+
+
+class _ExtractionWorker:
+    """一个专用提取进程及其管道"""
+
+    def __init__(self):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_extraction_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, task: tuple, timeout: float):
+        """执行一个任务；超时返回 None，进程异常退出时抛出 EOFError"""
+        self.conn.send(task)
+        if not self.conn.poll(timeout):
+            return None
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1)
+
+
+class ExtractionPool:
+    """
+    按文件隔离的提取进程池
+
+    以 spawn 方式启动工作进程（避免 fork 带有多线程的服务进程），每个进程同一时间只处理一个文件；
+    超时或崩溃时只结束处理该文件的进程，其他正在进行的提取不受影响，空闲进程留待复用
+
+    Args:
+        max_workers: 同时运行的提取进程数上限
+    """
+
+    def __init__(self, max_workers: int = EXTRACTION_WORKERS):
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle = []
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _checkout(self) -> _ExtractionWorker:
+        with self._lock:
+            if self._closed:
+                raise DocumentExtractionError("提取进程池已关闭")
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                self._workers.discard(worker)
+                worker.close()
+            worker = _ExtractionWorker()
+            self._workers.add(worker)
+            return worker
+
+    def _discard(self, worker: _ExtractionWorker):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.close()
+
+    def run(self, extension: str, data: bytes, timeout: float, wait: Optional[float] = None) -> Dict:
+        """
+        在独占的工作进程中提取一个文件
+
+        Args:
+            extension: 小写扩展名
+            data: 文件内容
+            timeout: 提取超时（秒），超时后结束该进程
+            wait: 等待空闲名额的最长时间（秒），None 表示一直等待
+
+        Returns:
+            extract_document_bytes 的结果
+        """
+        if not self._slots.acquire(timeout=wait):
+            raise DocumentExtractionError("当前解析文件的用户较多，请稍后重试或直接粘贴简历文本")
+        try:
+            worker = self._checkout()
+            try:
+                reply = worker.run((extension, data, MAX_PDF_PAGES, MAX_TEXT_CHARS), timeout)
+            except (EOFError, OSError):
+                # 进程只在处理这一个文件，未返回结果就退出说明是该文件导致的崩溃
+                self._discard(worker)
+                raise DocumentExtractionError("文件解析进程异常退出，文件可能已损坏")
+            if reply is None:
+                self._discard(worker)
+                raise DocumentExtractionError(f"文件解析超时（超过 {timeout:g} 秒），请尝试粘贴文本或上传更小的文件")
+            with self._lock:
+                if self._closed:
+                    self._workers.discard(worker)
+                    worker.close()
+                else:
+                    self._idle.append(worker)
+        finally:
+            self._slots.release()
+
+        status, payload = reply
+        if status == "error":
+            raise DocumentExtractionError(f"文件解析失败：{payload}")
+        return payload
+
+    def close(self):
+        """结束全部工作进程（包括仍在执行的提取）"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle.clear()
+        for worker in workers:
+            worker.close()
+
+
+def create_extraction_pool(max_workers: int = EXTRACTION_WORKERS) -> ExtractionPool:
+    """创建按文件隔离的提取进程池"""
+    return ExtractionPool(max_workers)
+
+
+def terminate_process_pool(pool: ExtractionPool):
+    """立即结束进程池中的全部工作进程（包括仍在执行的提取）"""
+    pool.close()
+
+
+# 页面上的提取共用一个进程池；名额已满时最多等待到超时为止
+_page_pool = ExtractionPool(EXTRACTION_WORKERS)
+
+
+def _run_extraction(extension: str, data: bytes, timeout: float) -> Dict:
+    return _page_pool.run(extension, data, timeout, wait=timeout)
+
+
+# ==========================================
+# 对外接口
+# ==========================================
+def get_file_extension(filename: str) -> str:
+    """返回小写扩展名（不含点）"""
+    return os.path.splitext(filename or "")[1].lstrip(".").lower()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _extract_cached(digest: str, extension: str, _data: bytes) -> Dict:
+    """按内容哈希缓存提取结果（抛出异常的提取不会被缓存）"""
+    try:
+        result = _run_extraction(extension, _data, EXTRACTION_TIMEOUT_S)
+    except DocumentExtractionError:
+        raise
+    except Exception as e:
+        raise DocumentExtractionError(f"文件解析失败：{e}")
+    return {**result, "sha256": digest}
+
+
+def extract_document_text(filename: str, data: bytes) -> Dict:
+    """
+    提取上传文件的文本
+
+    Args:
+        filename: 文件名（用于判断格式）
+        data: 文件内容
+
+    Returns:
+        成功时包含 text、pages（已提取页数）、total_pages、truncated、sha256；
+        失败时包含 error
+    """
+    extension = get_file_extension(filename)
+    if extension not in SUPPORTED_EXTENSIONS:
+        return {"error": f"不支持的文件格式：{extension or '未知'}，请上传 {'/'.join(SUPPORTED_EXTENSIONS).upper()} 文件"}
+    if len(data) > MAX_UPLOAD_BYTES:
+        return {"error": f"文件过大（{len(data) / 1024 / 1024:.1f}MB），上限为 {MAX_UPLOAD_BYTES // 1024 // 1024}MB"}
+    if not data:
+        return {"error": "文件内容为空"}
+
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        result = _extract_cached(digest, extension, data)
+    except DocumentExtractionError as e:
+        return {"error": str(e)}
+
+    if not result["text"].strip():
+        return {"error": "未能从文件中提取到文字（可能是扫描件图片），请直接粘贴简历文本"}
+    return result
@@ -0,0 +1,320 @@
+"""
+任职加权的职业风险暴露评分
+把简历中每段行业经历的 period 解析为任职时长，按「任职时长 × 近期程度」加权各行业的周期阶段风险与景气度风险，
+得到组合式的总暴露分（0-100，越高越集中于下行行业）与逐行业明细；
+批量评分时把所有简历的经历展平为数组，一次向量运算完成
+"""
+
+import datetime
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import compute_cycle_scores
+from utils.resume_extractor import parse_date_range
+from utils.transition_ranker import get_transition_features, lookup_industry_rows
+
+DEFAULT_KB_PATH = "data/细分领域行业周期研判表.csv"
+
+# ==========================================
+# 评分参数
+# ==========================================
+# 产业周期阶段风险（0-100）
+STAGE_RISK = {
+    "初创期": 45,
+    "成长期": 15,
+    "成熟期": 40,
+    "调整期": 75,
+    "衰退期": 90,
+}
+DEFAULT_STAGE_RISK = 50
+
+# 行业风险 = 阶段风险与景气度风险（100 - 政策周期评分）的加权和
+STAGE_RISK_WEIGHT = 0.6
+SENTIMENT_RISK_WEIGHT = 0.4
+
+# 近期权重的半衰期：结束于 3 年前的经历权重减半，仍在职的经历权重为 1
+RECENCY_HALF_LIFE_MONTHS = 36
+# period 缺失或无法解析时按 2 年计，并视为近期经历（从严估计暴露）
+DEFAULT_TENURE_MONTHS = 24
+MIN_TENURE_MONTHS = 1
+
+# 暴露等级（分数下限, 等级）
+EXPOSURE_LEVELS = [(65, "高暴露"), (40, "中暴露"), (0, "低暴露")]
+UNSCORED_LEVEL = "无法评估"
+
+EXPOSURE_COLUMNS = ["profile", "industry", "stage", "sentiment", "risk", "tenure_months",
+                    "months_since_end", "weight_share", "contribution"]
+
+
+# ==========================================
+# 任职时长解析
+# ==========================================
+def _month_index(date: datetime.date) -> int:
+    return date.year * 12 + date.month - 1
+
+
+def _parse_single_year(text: str) -> Optional[int]:
+    digits = text.rstrip("年")
+    if len(digits) == 4 and digits.isdigit() and 1950 <= int(digits) <= 2100:
+        return int(digits)
+    return None
+
+
+def parse_period(period, today: Optional[datetime.date] = None) -> Optional[Tuple[int, int]]:
+    """
+    解析 "2018.06-2022.03"、"2022-至今"、"2019" 等时间段
+
+    Returns:
+        (起始月序号, 结束月序号)；无法解析时返回 None
+    """
+    text = str(period or "").strip()
+    if not text:
+        return None
+    parsed = parse_date_range(text, today)
+    if parsed:
+        return parsed[0], parsed[1]
+    single_year = _parse_single_year(text)
+    if single_year is not None:
+        return single_year * 12, single_year * 12 + 11
+    return None
+
+
+def period_arrays(periods: Sequence, today: Optional[datetime.date] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    把时间段序列转换为任职月数与距今月数
+
+    Returns:
+        (tenure_months, months_since_end)；无法解析的位置为 NaN
+    """
+    today = today or datetime.date.today()
+    now = _month_index(today)
+    # 同一批简历里的时间段写法重复很多，每个不同的写法只解析一次
+    codes, uniques = pd.factorize(pd.Series(list(periods), dtype=object).fillna(""), use_na_sentinel=False)
+    spans = np.full((len(uniques), 2), np.nan)
+    for i, period in enumerate(uniques):
+        parsed = parse_period(period, today)
+        if parsed:
+            spans[i] = parsed
+    start, end = spans[codes, 0], spans[codes, 1]
+    return end - start, np.maximum(now - end, 0)
+
+
+def exposure_weights(tenure_months: np.ndarray, months_since_end: np.ndarray,
+                     half_life: float = RECENCY_HALF_LIFE_MONTHS) -> np.ndarray:
+    """任职时长 × 近期衰减（0.5 ** (距今月数 / 半衰期)），缺失值按默认时长与近期处理"""
+    tenure = np.where(np.isnan(tenure_months), DEFAULT_TENURE_MONTHS, tenure_months)
+    tenure = np.maximum(tenure, MIN_TENURE_MONTHS)
+    since_end = np.where(np.isnan(months_since_end), 0, months_since_end)
+    return tenure * np.power(0.5, since_end / half_life)
+
+
+def industry_risk_scores(df: pd.DataFrame) -> np.ndarray:
+    """行业表逐行的风险分（0-100）"""
+    stage_risk = df['当前周期阶段'].map(STAGE_RISK).fillna(DEFAULT_STAGE_RISK).to_numpy(dtype=float)
+    sentiment_risk = 100 - compute_cycle_scores(df)['政策周期评分'].to_numpy(dtype=float)
+    return STAGE_RISK_WEIGHT * stage_risk + SENTIMENT_RISK_WEIGHT * sentiment_risk
+
+
+def get_exposure_level(score: float) -> str:
+    if score is None or np.isnan(score):
+        return UNSCORED_LEVEL
+    for threshold, level in EXPOSURE_LEVELS:
+        if score >= threshold:
+            return level
+    return EXPOSURE_LEVELS[-1][1]
+
+
+# ==========================================
+# 评分
+# ==========================================
+def _normalize_experience(item) -> Tuple[str, str]:
+    if isinstance(item, dict):
+        return str(item.get("name") or ""), str(item.get("period") or "")
+    return str(item or ""), ""
+
+
+def score_exposure_batch(profiles: Sequence[Sequence], df: pd.DataFrame, data_version: str = "",
+                         today: Optional[datetime.date] = None,
+                         half_life: float = RECENCY_HALF_LIFE_MONTHS) -> Dict:
+    """
+    批量计算职业风险暴露
+
+    Args:
+        profiles: 每份简历的行业经历列表，元素为 {"name", "period"} 或行业名称
+        df: 行业数据DataFrame
+        data_version: 数据版本（用于复用行业特征缓存）
+        today: 计算"至今"与近期权重的日期，默认今天
+        half_life: 近期权重半衰期（月）
+
+    Returns:
+        scores: 每份简历的暴露分（无可识别行业时为 NaN）
+        coverage: 每份简历中能在行业表中识别的经历权重占比
+        breakdown: 逐简历、逐行业的明细 DataFrame（同一行业的多段经历合并），
+                   列为 EXPOSURE_COLUMNS，weight_share 与 contribution 均按该简历已识别经历归一
+    """
+    n_profiles = len(profiles)
+    lengths = np.array([len(p or []) for p in profiles], dtype=np.int64)
+    profile_idx = np.repeat(np.arange(n_profiles), lengths)
+    pairs = [_normalize_experience(item) for p in profiles for item in (p or [])]
+    names = [name for name, _ in pairs]
+    periods = [period for _, period in pairs]
+
+    features = get_transition_features(df, data_version)
+    rows = lookup_industry_rows(features, names)
+    tenure, since_end = period_arrays(periods, today)
+    weights = exposure_weights(tenure, since_end, half_life)
+
+    if features["industry_risk"] is None:
+        features["industry_risk"] = industry_risk_scores(df)
+    known = rows >= 0
+    risks = np.where(known, features["industry_risk"][np.where(known, rows, 0)], np.nan)
+
+    total_weight = np.bincount(profile_idx, weights=weights, minlength=n_profiles)
+    known_weight = np.bincount(profile_idx, weights=np.where(known, weights, 0), minlength=n_profiles)
+    weighted_risk = np.bincount(profile_idx, weights=np.where(known, weights * np.nan_to_num(risks), 0),
+                                minlength=n_profiles)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(known_weight > 0, weighted_risk / known_weight, np.nan)
+        coverage = np.where(total_weight > 0, known_weight / total_weight, 0.0)
+
+    # 明细：同一简历中同一行业的多段经历合并（按 简历序号 × 行业编码 分组后 bincount 累加）
+    name_codes, name_uniques = pd.factorize(pd.Series(names, dtype=object))
+    group_key = profile_idx[known] * max(len(name_uniques), 1) + name_codes[known]
+    groups, first, inverse = np.unique(group_key, return_index=True, return_inverse=True)
+    member = np.flatnonzero(known)[first]
+    group_weight = np.bincount(inverse, weights=weights[known], minlength=len(groups))
+    group_profile = profile_idx[member]
+    # 距今月数取组内最小值：按组排序后用 reduceat 求各段最小值
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(len(groups)))
+    known_since_end = np.nan_to_num(since_end[known], nan=0)
+    group_since_end = np.minimum.reduceat(known_since_end[order], starts) if len(groups) else np.zeros(0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight_share = group_weight / known_weight[group_profile]
+    breakdown = pd.DataFrame({
+        "profile": group_profile,
+        "industry": np.asarray(names, dtype=object)[member] if len(member) else np.array([], dtype=object),
+        "stage": features["stages"][rows[member]],
+        "sentiment": features["sentiments"][rows[member]],
+        "risk": risks[member],
+        "tenure_months": np.bincount(inverse, weights=np.nan_to_num(tenure[known], nan=DEFAULT_TENURE_MONTHS),
+                                     minlength=len(groups)),
+        "months_since_end": group_since_end,
+        "weight_share": weight_share,
+        "contribution": weight_share * risks[member],
+    })
+    breakdown = breakdown.sort_values(["profile", "contribution"], ascending=[True, False], ignore_index=True)
+
+    return {"scores": scores, "coverage": coverage, "breakdown": breakdown[EXPOSURE_COLUMNS]}
+
+
+def score_exposure(industries: Sequence, df: Optional[pd.DataFrame] = None, data_version: str = "",
+                   today: Optional[datetime.date] = None) -> Dict:
+    """
+    计算单份简历的职业风险暴露
+
+    Args:
+        industries: 行业经历列表，元素为 {"name", "period"}（解析结果中的 industries）或行业名称
+        df: 行业数据DataFrame，默认读取知识库
+        data_version: 数据版本
+        today: 计算日期
+
+    Returns:
+        score（0-100，保留 1 位小数，无法评估时为 None）、level、coverage、
+        按贡献降序的 breakdown（industry、stage、sentiment、risk、tenure_months、months_since_end、
+        weight_share、contribution），以及行业表中找不到的 unrecognized
+    """
+    if df is None:
+        from utils.data_processor import get_file_version, load_industry_data
+        df = load_industry_data(DEFAULT_KB_PATH)
+        data_version = get_file_version(DEFAULT_KB_PATH)
+
+    experiences = list(industries or [])
+    result = score_exposure_batch([experiences], df, data_version, today)
+    score = float(result["scores"][0])
+    breakdown = result["breakdown"].drop(columns="profile")
+    scored = set(breakdown["industry"])
+
+    def clean(value):
+        if isinstance(value, (float, np.floating)):
+            return None if np.isnan(value) else round(float(value), 3)
+        return value
+
+    return {
+        "score": None if np.isnan(score) else round(score, 1),
+        "level": get_exposure_level(score),
+        "coverage": round(float(result["coverage"][0]), 3),
+        "breakdown": [{k: clean(v) for k, v in record.items()} for record in breakdown.to_dict("records")],
+        "unrecognized": list(dict.fromkeys(
+            name for name, _ in map(_normalize_experience, experiences) if name and name not in scored
+        )),
+    }
+
+
+# ==========================================
+# 基准测试
+# ==========================================
+def benchmark_exposure(n_profiles: int = 10_000, max_experiences: int = 4, repeat: int = 3,
+                       csv_path: str = DEFAULT_KB_PATH) -> Dict[str, float]:
+    """
+    批量评分基准：随机生成 n_profiles 份简历（每份 1-max_experiences 段经历），
+    对比向量化批量评分与逐份调用的耗时
+    """
+    from utils.data_processor import get_file_version, load_industry_data
+
+    df = load_industry_data(csv_path)
+    version = get_file_version(csv_path)
+    rng = np.random.default_rng(0)
+    names = df['行业名称'].astype(str).to_numpy()
+    profiles = []
+    for _ in range(n_profiles):
+        count = int(rng.integers(1, max_experiences + 1))
+        start = int(rng.integers(2005, 2020))
+        items = []
+        for _ in range(count):
+            end = start + int(rng.integers(1, 5))
+            items.append({"name": names[rng.integers(len(names))],
+                          "period": f"{start}.{rng.integers(1, 13):02d}-{end}.{rng.integers(1, 13):02d}"})
+            start = end
+        items[-1]["period"] = items[-1]["period"].split("-")[0] + "-至今"
+        profiles.append(items)
+
+    score_exposure_batch(profiles[:10], df, version)  # 预热特征缓存
+    batch_times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        score_exposure_batch(profiles, df, version)
+        batch_times.append(time.perf_counter() - t0)
+
+    sample = profiles[:200]
+    t0 = time.perf_counter()
+    for profile in sample:
+        score_exposure(profile, df, version)
+    single_ms = (time.perf_counter() - t0) / len(sample) * 1000
+
+    batch_s = min(batch_times)
+    return {
+        "profiles": n_profiles,
+        "batch_total_ms": round(batch_s * 1000, 1),
+        "batch_per_profile_us": round(batch_s / n_profiles * 1e6, 2),
+        "single_call_ms": round(single_ms, 3),
+        "speedup": round(single_ms / 1000 / (batch_s / n_profiles), 1),
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("职业风险暴露评分")
+    print("=" * 50)
+    example = [
+        {"name": "住宅地产", "period": "2012.07-2020.06", "role": "项目经理"},
+        {"name": "光伏逆变器", "period": "2020.07-至今", "role": "高级经理"},
+    ]
+    report = score_exposure(example)
+    print({k: v for k, v in report.items() if k != "breakdown"})
+    for item in report["breakdown"]:
+        print(item)
+    print(benchmark_exposure())
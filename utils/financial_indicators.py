@@ -0,0 +1,233 @@
+"""
+财务数据指标计算管道
+从本地公司财务报表目录（CSV/Parquet，带行业标签）分块读取数据，
+按行业分组向量化计算7大拐点清单中可由财务数据推导的指标
+"""
+
+import os
+import glob
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Iterator, List
+
+from utils.sentinel_engine import SENTINEL_INDICATORS, ACHIEVED_THRESHOLD
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 仅在读取 Parquet 文件时需要，缺失时跳过 Parquet 文件
+    pq = None
+
+# 默认财务数据目录
+FINANCIAL_DATA_DIR = "data/financials"
+
+# 财务报表字段（金额单位：元）
+KEY_COLUMNS = ['行业名称', '公司名称', '年份']
+VALUE_COLUMNS = ['营业收入', '营业成本', '净利润', '资本开支', '单位成本']
+
+# 指标阈值
+LEADER_MARGIN_THRESHOLD = 0.20      # 龙头毛利率 > 20%
+CAPEX_GROWTH_THRESHOLD = 0.30       # 资本开支增速 > 30%
+LARGE_FIRM_REVENUE = 1e9            # 年营收 > 10亿
+LARGE_FIRM_COUNT_THRESHOLD = 3      # 3家以上
+COST_DECLINE_THRESHOLD = 0.50       # 2-3年内成本下降 50%
+
+# 财务数据可推导的指标（其余指标如政策、渗透率、产业链需其他数据源）
+INDICATOR_NAMES = [ind['name'] for ind in SENTINEL_INDICATORS]
+FINANCIAL_INDICATORS = ["技术成本下降", "龙头盈利", "资本开支", "营收规模"]
+
+
+def _list_financial_files(folder: str) -> List[str]:
+    """列出目录下所有 CSV/Parquet 文件（按文件名排序）"""
+    patterns = ["*.csv", "*.parquet"]
+    files = []
+    for pattern in patterns:
+        files.extend(glob.glob(os.path.join(folder, "**", pattern), recursive=True))
+    return sorted(files)
+
+
+def get_skipped_financial_files(folder: str = FINANCIAL_DATA_DIR) -> List[str]:
+    """返回因未安装 pyarrow 而无法读取的 Parquet 文件"""
+    if pq is not None or not os.path.isdir(folder):
+        return []
+    return [path for path in _list_financial_files(folder) if path.endswith(".parquet")]
+
+
+def get_financial_data_version(folder: str = FINANCIAL_DATA_DIR) -> str:
+    """
+    获取财务数据目录的版本标识（文件路径、大小、修改时间）
+
+    任一文件新增、删除或修改都会产生新的版本标识
+    """
+    parts = []
+    for path in _list_financial_files(folder):
+        stat = os.stat(path)
+        parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def iter_financial_chunks(folder: str = FINANCIAL_DATA_DIR, chunksize: int = 500_000) -> Iterator[pd.DataFrame]:
+    """
+    分块读取财务报表，仅保留计算所需的列（未安装 pyarrow 时跳过 Parquet 文件，见 get_skipped_financial_files）
+
+    Args:
+        folder: 财务数据目录
+        chunksize: 每块的最大行数
+
+    Yields:
+        财务数据分块 DataFrame
+    """
+    wanted = set(KEY_COLUMNS + VALUE_COLUMNS)
+
+    for path in _list_financial_files(folder):
+        if path.endswith(".parquet"):
+            if pq is None:
+                continue
+            parquet_file = pq.ParquetFile(path)
+            columns = [c for c in parquet_file.schema_arrow.names if c in wanted]
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        else:
+            reader = pd.read_csv(path, encoding='utf-8', chunksize=chunksize,
+                                 usecols=lambda c: c in wanted)
+            for chunk in reader:
+                yield chunk
+
+
+def _aggregate_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """将一个分块聚合到（行业, 公司, 年份）粒度"""
+    missing = [c for c in KEY_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"财务数据缺少必要列：{', '.join(missing)}")
+
+    chunk = chunk.reindex(columns=KEY_COLUMNS + VALUE_COLUMNS)
+    chunk = chunk.dropna(subset=KEY_COLUMNS)
+    chunk['年份'] = pd.to_numeric(chunk['年份'], errors='coerce')
+    chunk = chunk.dropna(subset=['年份'])
+    chunk['年份'] = chunk['年份'].astype(int)
+    for col in VALUE_COLUMNS:
+        chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+
+    # 单位成本按均值合并，其余金额字段按合计合并，因此分开记录求和与计数
+    chunk['单位成本计数'] = chunk['单位成本'].notna().astype(np.int64)
+    return chunk.groupby(KEY_COLUMNS, sort=False).sum(min_count=1).reset_index()
+
+
+def aggregate_company_financials(folder: str = FINANCIAL_DATA_DIR, chunksize: int = 500_000) -> pd.DataFrame:
+    """
+    分块读取并聚合到（行业, 公司, 年份）粒度
+
+    内存占用只与公司×年份数量相关，与原始行数无关，可处理数百万行输入。
+
+    Returns:
+        公司年度财务汇总 DataFrame
+    """
+    combined = None
+    for chunk in iter_financial_chunks(folder, chunksize):
+        partial = _aggregate_chunk(chunk)
+        if combined is None:
+            combined = partial
+        else:
+            combined = pd.concat([combined, partial], ignore_index=True)
+            combined = combined.groupby(KEY_COLUMNS, sort=False).sum(min_count=1).reset_index()
+
+    if combined is None:
+        return pd.DataFrame(columns=KEY_COLUMNS + VALUE_COLUMNS)
+
+    counts = combined.pop('单位成本计数')
+    combined['单位成本'] = combined['单位成本'] / counts.where(counts > 0)
+    return combined
+
+
+def _ratio_to_progress(ratio: pd.Series) -> pd.Series:
+    """
+    将“实际值 / 达标阈值”映射为指标进度（0-100）
+
+    比值为1时恰好达到 ACHIEVED_THRESHOLD，超出部分线性增长至100
+    """
+    return (ratio * ACHIEVED_THRESHOLD).clip(lower=0, upper=100)
+
+
+def compute_industry_indicators(company_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    按行业分组计算财务可推导的拐点指标进度
+
+    Args:
+        company_df: aggregate_company_financials 的输出
+
+    Returns:
+        以行业名称为索引、7大指标名称为列的进度表（无法由财务数据推导的指标为 NaN）
+    """
+    result = pd.DataFrame(index=pd.Index(company_df['行业名称'].unique(), name='行业名称'),
+                          columns=INDICATOR_NAMES, dtype=float)
+    if company_df.empty:
+        return result
+
+    df = company_df.copy()
+    latest_year = df.groupby('行业名称')['年份'].transform('max')
+    latest = df[df['年份'] == latest_year]
+
+    # 龙头盈利：最新年度营收最高企业的毛利率 > 20% 且净利润为正
+    leaders = latest.loc[latest['营业收入'].fillna(-np.inf).groupby(latest['行业名称']).idxmax()]
+    leaders = leaders.set_index('行业名称')
+    margin = (leaders['营业收入'] - leaders['营业成本']) / leaders['营业收入'].where(leaders['营业收入'] > 0)
+    leader_progress = _ratio_to_progress(margin / LEADER_MARGIN_THRESHOLD)
+    # 净利润未转正时不计为达标
+    leader_progress = leader_progress.where(leaders['净利润'] > 0,
+                                            leader_progress.clip(upper=ACHIEVED_THRESHOLD - 1))
+    result['龙头盈利'] = leader_progress
+
+    # 营收规模：最新年度营收超过10亿的企业数量
+    large_firms = (latest['营业收入'] > LARGE_FIRM_REVENUE).groupby(latest['行业名称']).sum()
+    result['营收规模'] = _ratio_to_progress(large_firms / LARGE_FIRM_COUNT_THRESHOLD)
+
+    # 行业年度汇总：资本开支合计、单位成本均值
+    yearly = df.groupby(['行业名称', '年份']).agg(资本开支=('资本开支', lambda s: s.sum(min_count=1)),
+                                                 单位成本=('单位成本', 'mean'))
+    capex = yearly['资本开支'].unstack('年份').sort_index(axis=1)
+    unit_cost = yearly['单位成本'].unstack('年份').sort_index(axis=1)
+
+    # 取每个行业自己的最新年份所在列
+    industry_latest = df.groupby('行业名称')['年份'].max()
+
+    def _value_at(table: pd.DataFrame, offset: int) -> pd.Series:
+        years = (industry_latest - offset).reindex(table.index)
+        col_pos = table.columns.get_indexer(years)
+        values = table.to_numpy()[np.arange(len(table)), np.clip(col_pos, 0, None)] if len(table) else np.array([])
+        return pd.Series(np.where(col_pos >= 0, values, np.nan), index=table.index)
+
+    # 资本开支：最新年度同比增速 > 30%
+    capex_now, capex_prev = _value_at(capex, 0), _value_at(capex, 1)
+    capex_growth = capex_now / capex_prev.where(capex_prev > 0) - 1
+    result['资本开支'] = _ratio_to_progress(capex_growth / CAPEX_GROWTH_THRESHOLD)
+
+    # 技术成本下降：单位成本相对2-3年前的最大降幅 >= 50%
+    cost_now = _value_at(unit_cost, 0)
+    declines = pd.concat([
+        1 - cost_now / _value_at(unit_cost, offset).where(lambda s: s > 0)
+        for offset in (2, 3)
+    ], axis=1).max(axis=1, skipna=True)
+    result['技术成本下降'] = _ratio_to_progress(declines / COST_DECLINE_THRESHOLD)
+
+    return result
+
+
+@st.cache_data(show_spinner="正在计算财务指标...")
+def _load_financial_indicators(folder: str, data_version: str) -> pd.DataFrame:
+    """按数据版本缓存指标计算结果"""
+    return compute_industry_indicators(aggregate_company_financials(folder))
+
+
+def load_financial_indicators(folder: str = FINANCIAL_DATA_DIR) -> pd.DataFrame:
+    """
+    加载财务数据推导的行业指标进度（数据目录变化时自动重新计算）
+
+    Args:
+        folder: 财务数据目录
+
+    Returns:
+        以行业名称为索引的指标进度表；目录不存在或无数据时返回空表
+    """
+    if not os.path.isdir(folder):
+        return pd.DataFrame(columns=INDICATOR_NAMES, dtype=float)
+    return _load_financial_indicators(folder, get_financial_data_version(folder))
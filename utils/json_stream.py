@@ -0,0 +1,239 @@
+"""
+增量 JSON 解析
+逐块读入 LLM 的流式输出，在顶层对象的数组元素（如 industries、skills）闭合时立即产出该元素，
+无需等待整段回复结束；容忍 JSON 前后的说明文字、```json 代码块标记以及被截断的结尾
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 事件：(顶层键, 值, 是否为数组元素)
+JSONEvent = Tuple[str, Any, bool]
+
+_CLOSERS = {"{": "}", "[": "]"}
+MAX_REPAIR_ATTEMPTS = 8
+
+
+class IncrementalJSONParser:
+    """
+    容错的增量 JSON 解析器
+    只跟踪括号栈与字符串状态（每个字符 O(1)），元素闭合时对其所在片段调用一次 json.loads
+    """
+
+    def __init__(self, watch_arrays: Optional[Sequence[str]] = None):
+        """
+        Args:
+            watch_arrays: 需要逐元素产出的顶层数组键，None 表示全部顶层数组
+        """
+        self.watch_arrays = set(watch_arrays) if watch_arrays is not None else None
+        self.text = ""
+        self._pos = 0
+        self._root_start = -1
+        self._root_end = -1
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key = None              # 当前顶层键
+        self._key_start = -1          # 顶层键字符串的起点
+        self._expect_key = False      # 顶层对象中下一个字符串是否为键
+        self._value_start = -1        # 当前顶层值的起点
+        self._element_start = -1      # 当前数组元素的起点
+
+    # ------------------------------------------
+    # 对外接口
+    # ------------------------------------------
+    def feed(self, chunk: str) -> List[JSONEvent]:
+        """
+        读入一段文本，返回本段内闭合的元素与顶层字段
+
+        Returns:
+            [(顶层键, 值, 是否为数组元素), ...]；顶层数组本身闭合时也会以 (键, 整个数组, False) 产出
+        """
+        if not chunk or self._root_end >= 0:
+            return []
+        self.text += chunk
+        events: List[JSONEvent] = []
+        text = self.text
+        for pos in range(self._pos, len(text)):
+            self._step(text, pos, events)
+            if self._root_end >= 0:
+                break
+        self._pos = len(text)
+        return events
+
+    def finish(self) -> Dict:
+        """
+        输入结束后返回完整对象：优先严格解析，失败时补全未闭合的字符串与括号后再解析
+
+        Raises:
+            ValueError: 文本中没有可解析的 JSON 对象
+        """
+        if self._root_start < 0:
+            raise ValueError("未找到 JSON 对象")
+        end = self._root_end + 1 if self._root_end >= 0 else len(self.text)
+        candidate = self.text[self._root_start:end]
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            pass
+        repaired = self._repair(candidate)
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 无法补全：{e}") from e
+
+    @property
+    def complete(self) -> bool:
+        """根对象是否已闭合"""
+        return self._root_end >= 0
+
+    # ------------------------------------------
+    # 状态机
+    # ------------------------------------------
+    def _step(self, text: str, pos: int, events: List[JSONEvent]):
+        char = text[pos]
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._on_string_end(text, pos, events)
+            return
+
+        if self._root_start < 0:
+            # 跳过 JSON 之前的说明文字与代码块标记
+            if char == "{":
+                self._root_start = pos
+                self._stack.append("{")
+                self._expect_key = True
+            return
+
+        depth = len(self._stack)
+        if char == '"':
+            self._in_string = True
+            if depth == 1 and self._expect_key:
+                self._key_start = pos
+            elif depth == 1 and self._value_start < 0:
+                self._value_start = pos
+            elif depth == 2 and self._stack[-1] == "[" and self._element_start < 0:
+                self._element_start = pos
+        elif char in "{[":
+            if depth == 1:
+                self._value_start = pos
+            elif depth == 2 and self._stack[-1] == "[" and self._element_start < 0:
+                self._element_start = pos
+            self._stack.append(char)
+        elif char in "}]":
+            if depth == 2 and self._stack[-1] == "[":
+                self._close_scalar_element(text, pos, events)
+            if self._stack:
+                self._stack.pop()
+            depth = len(self._stack)
+            if depth == 0:
+                if self._value_start >= 0:
+                    self._emit_value(text, pos, events)
+                self._root_end = pos
+            elif depth == 1:
+                self._emit_value(text, pos + 1, events)
+            elif depth == 2 and self._stack[-1] == "[":
+                self._emit_element(text, pos + 1, events)
+        elif char == ",":
+            if depth == 1:
+                if self._value_start >= 0:
+                    self._emit_value(text, pos, events)
+                self._expect_key = True
+            elif depth == 2 and self._stack[-1] == "[":
+                self._close_scalar_element(text, pos, events)
+        elif char == ":":
+            if depth == 1:
+                self._expect_key = False
+        elif not char.isspace():
+            # 数字、true/false/null 的起点
+            if depth == 1 and not self._expect_key and self._value_start < 0:
+                self._value_start = pos
+            elif depth == 2 and self._stack[-1] == "[" and self._element_start < 0:
+                self._element_start = pos
+
+    def _on_string_end(self, text: str, pos: int, events: List[JSONEvent]):
+        depth = len(self._stack)
+        if depth == 1 and self._expect_key and self._key_start >= 0:
+            self._key = self._loads(text[self._key_start:pos + 1])
+            self._key_start = -1
+        elif depth == 2 and self._stack[-1] == "[" and self._element_start >= 0 \
+                and text[self._element_start] == '"':
+            self._emit_element(text, pos + 1, events)
+
+    def _close_scalar_element(self, text: str, pos: int, events: List[JSONEvent]):
+        """数字、布尔等非字符串数组元素在遇到 , 或 ] 时闭合"""
+        if self._element_start >= 0:
+            self._emit_element(text, pos, events)
+
+    def _emit_element(self, text: str, end: int, events: List[JSONEvent]):
+        start, self._element_start = self._element_start, -1
+        if start < 0 or self._key is None:
+            return
+        if self.watch_arrays is not None and self._key not in self.watch_arrays:
+            return
+        value = self._loads(text[start:end].strip())
+        if value is not None:
+            events.append((self._key, value, True))
+
+    def _emit_value(self, text: str, end: int, events: List[JSONEvent]):
+        start, self._value_start = self._value_start, -1
+        if start < 0 or self._key is None:
+            return
+        value = self._loads(text[start:end].strip())
+        if value is not None:
+            events.append((self._key, value, False))
+
+    @staticmethod
+    def _loads(fragment: str):
+        try:
+            return json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+
+    def _repair(self, candidate: str) -> str:
+        """按括号栈补全被截断的 JSON；补全后仍无效时回退到上一个逗号处（丢弃不完整的最后一项）再补全"""
+        for _ in range(MAX_REPAIR_ATTEMPTS):
+            probe = IncrementalJSONParser(watch_arrays=())
+            probe.feed(candidate)
+            if probe._in_string and probe._escape:
+                candidate = candidate[:-1]
+            repaired = candidate + ('"' if probe._in_string else "")
+            repaired = repaired.rstrip()
+            while repaired and repaired[-1] in ",:":
+                repaired = repaired[:-1].rstrip()
+            repaired += "".join(_CLOSERS[opener] for opener in reversed(probe._stack))
+            try:
+                json.loads(repaired)
+                return repaired
+            except json.JSONDecodeError:
+                cut = candidate.rfind(",")
+                if cut <= 0:
+                    return repaired
+                candidate = candidate[:cut]
+        return candidate
+
+
+def parse_json_stream(chunks, watch_arrays: Optional[Sequence[str]] = None):
+    """
+    逐块解析文本流的便捷生成器
+
+    Args:
+        chunks: 文本块的可迭代对象
+        watch_arrays: 需要逐元素产出的顶层数组键
+
+    Yields:
+        (顶层键, 值, 是否为数组元素)；流结束后产出 ("__result__", 完整对象或 None, False)
+    """
+    parser = IncrementalJSONParser(watch_arrays)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    try:
+        result = parser.finish()
+    except ValueError:
+        result = None
+    yield "__result__", result, False
@@ -1,7 +1,16 @@
 # utils/llm_engine.py
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterator
 import streamlit as st
 from openai import OpenAI
 from utils.rag_engine import get_rag_engine
+from utils.usage_ledger import get_usage, try_consume
+
+# OpenAI 兼容接口地址（可通过环境变量指向自建网关或本地模拟服务）
+DEEPSEEK_BASE_URL = os.environ.get("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
 
 # ==========================================
 # API Key 管理
@@ -93,19 +102,56 @@ def render_privacy_notice():
 
 DAILY_LIMIT = 20  # 每日使用次数限制
 
+# 部署在反向代理后面时，设置为可信代理的层数；X-Forwarded-For 由客户端可随意填写，
+# 只有可信代理自己追加的（从右数第 N 个）地址可信，0 表示不信任该请求头
+TRUSTED_PROXY_HOPS = int(os.environ.get("CYCLE_TRUSTED_PROXY_HOPS", "0"))
+
+
+def get_usage_key() -> str:
+    """
+    用量账本中的用户标识，优先级：
+    1. 用户自行输入的 API Key（只记录摘要）
+    2. 访问者 IP：连接的来源地址；配置了 TRUSTED_PROXY_HOPS 时取 X-Forwarded-For
+       中可信代理追加的地址（从右数第 N 个），不使用客户端可伪造的最左侧地址
+    3. 会话 ID（无法获取 IP 时，如本地测试；st.context.ip_address 需要 Streamlit 1.45+）
+    """
+    user_key = st.session_state.get("user_api_key")
+    if user_key:
+        return "key:" + hashlib.sha256(user_key.encode("utf-8")).hexdigest()[:16]
+    
+    ip_address = None
+    try:
+        if TRUSTED_PROXY_HOPS > 0:
+            hops = [hop.strip() for hop in st.context.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+            if len(hops) >= TRUSTED_PROXY_HOPS:
+                ip_address = hops[-TRUSTED_PROXY_HOPS]
+        ip_address = ip_address or st.context.ip_address
+    except Exception:
+        ip_address = None
+    if isinstance(ip_address, str) and ip_address:
+        return f"ip:{ip_address}"
+    
+    if "usage_session_id" not in st.session_state:
+        st.session_state["usage_session_id"] = os.urandom(8).hex()
+    return f"session:{st.session_state['usage_session_id']}"
+
+
+def get_daily_usage() -> int:
+    """当前用户今日已使用的 AI 生成次数（全站共享的用量账本）"""
+    return get_usage(get_usage_key())
+
+
 def check_usage_limit():
     """
     检查并显示每日使用次数限制
     """
-    if 'daily_usage' not in st.session_state:
-        st.session_state['daily_usage'] = 0
-    
-    remaining = DAILY_LIMIT - st.session_state['daily_usage']
+    used = get_daily_usage()
+    remaining = DAILY_LIMIT - used
     
     with st.sidebar:
         st.markdown("### 📊 今日使用配额")
-        st.progress(min(st.session_state['daily_usage'] / DAILY_LIMIT, 1.0))
-        st.caption(f"已使用: {st.session_state['daily_usage']} / {DAILY_LIMIT} 次")
+        st.progress(min(used / DAILY_LIMIT, 1.0))
+        st.caption(f"已使用: {used} / {DAILY_LIMIT} 次")
         
         if remaining <= 0:
             st.error("⚠️ 今日使用次数已达上限，请明日再试")
@@ -115,10 +161,14 @@ def check_usage_limit():
 
 
 def increment_usage():
-    """增加使用次数计数"""
-    if 'daily_usage' not in st.session_state:
-        st.session_state['daily_usage'] = 0
-    st.session_state['daily_usage'] += 1
+    """
+    记一次 AI 生成调用：所有调用 LLM 的入口都在请求前调用本函数，
+    配额检查与计数在用量账本中原子完成，已达上限时提示并停止本次运行
+    """
+    allowed, _ = try_consume(get_usage_key(), DAILY_LIMIT)
+    if not allowed:
+        st.error("⚠️ 今日使用次数已达上限，请明日再试")
+        st.stop()
 
 
 def get_deepseek_client():
@@ -134,7 +184,7 @@ def get_deepseek_client():
     try:
         client = OpenAI(
             api_key=api_key, 
-            base_url="https://api.deepseek.com"
+            base_url=DEEPSEEK_BASE_URL
         )
         return client
     except Exception as e:
@@ -227,6 +277,135 @@ def get_system_prompt(user_identity: str = "", user_risk_preference: str = "稳
 """
 
 
+# ==========================================
+# 相同请求合并（single-flight）
+# ==========================================
+
+class _Flight:
+    """一次进行中的上游请求：非流式保存返回结果，流式保存已收到的分块供各会话依次读取"""
+    
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+_flights: Dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_flight_stats = {"upstream": 0, "coalesced": 0}
+
+
+def request_fingerprint(client, params: Dict) -> str:
+    """请求指纹：接口地址、API Key 摘要与全部请求参数（模型、消息、温度等）"""
+    payload = {
+        "base_url": str(client.base_url),
+        "api_key": hashlib.sha256(str(client.api_key).encode("utf-8")).hexdigest()[:16],
+        "params": params,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _join_flight(key: str):
+    """加入指纹相同的进行中请求；没有时登记一个新请求，返回 (请求, 是否由本调用发起)"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            _flight_stats["coalesced"] += 1
+            return flight, False
+        flight = _flights[key] = _Flight()
+        _flight_stats["upstream"] += 1
+        return flight, True
+
+
+def _finish_flight(key: str, flight: _Flight, result=None, error=None):
+    # 合并只针对进行中的请求，完成后移除，之后的相同请求重新发往上游（不是结果缓存）
+    with _flights_lock:
+        _flights.pop(key, None)
+    with flight.cond:
+        flight.result, flight.error, flight.done = result, error, True
+        flight.cond.notify_all()
+
+
+def _pump_stream(client, params: Dict, key: str, flight: _Flight):
+    """后台线程：读取上游流式响应，逐块追加并通知所有等待的会话"""
+    error = None
+    try:
+        for chunk in client.chat.completions.create(**params):
+            with flight.cond:
+                flight.chunks.append(chunk)
+                flight.cond.notify_all()
+    except Exception as e:
+        error = e
+    _finish_flight(key, flight, error=error)
+
+
+def _subscribe(flight: _Flight) -> Iterator:
+    """按顺序产出流式分块（后加入的会话先补发已收到的分块），上游出错时在读取处抛出"""
+    index = 0
+    while True:
+        with flight.cond:
+            flight.cond.wait_for(lambda: index < len(flight.chunks) or flight.done)
+            pending = flight.chunks[index:]
+            finished, error = flight.done, flight.error
+        index += len(pending)
+        yield from pending
+        if finished:
+            if error is not None:
+                raise error
+            return
+
+
+def coalesced_chat_completion(client, **params):
+    """
+    合并相同请求的 client.chat.completions.create
+    
+    指纹相同的并发调用只向上游发出一次请求：非流式调用共享同一个返回结果；
+    stream=True 时由后台线程读取上游分块，逐块分发给每个等待的会话。
+    上游请求不依赖发起会话，发起者中途离开不影响其他会话
+    
+    Args:
+        client: OpenAI 兼容客户端
+        **params: chat.completions.create 的参数
+        
+    Returns:
+        非流式为 ChatCompletion；流式为分块迭代器
+    """
+    key = request_fingerprint(client, params)
+    flight, leader = _join_flight(key)
+    
+    if params.get("stream"):
+        if leader:
+            threading.Thread(
+                target=_pump_stream, args=(client, params, key, flight), name="llm-flight", daemon=True
+            ).start()
+        return _subscribe(flight)
+    
+    if leader:
+        try:
+            result = client.chat.completions.create(**params)
+        except Exception as e:
+            _finish_flight(key, flight, error=e)
+            raise
+        _finish_flight(key, flight, result=result)
+        return result
+    
+    with flight.cond:
+        flight.cond.wait_for(lambda: flight.done)
+    if flight.error is not None:
+        raise flight.error
+    return flight.result
+
+
+def get_coalescing_stats() -> Dict[str, int]:
+    """上游请求数与被合并的调用数（进程内累计）"""
+    with _flights_lock:
+        return dict(_flight_stats)
+
+
 def analyze_industry_with_rag(industry_name: str, user_input: str = "", 
                                user_identity: str = "", user_risk_preference: str = "稳健") -> str:
     """
@@ -260,7 +439,8 @@ def analyze_industry_with_rag(industry_name: str, user_input: str = "",
     ]
     
     try:
-        response = client.chat.completions.create(
+        response = coalesced_chat_completion(
+            client,
             model="deepseek-chat",
             messages=messages,
             temperature=0.5,  # 降低温度以获得更确定的回答
@@ -283,7 +463,7 @@ def analyze_industry_stream(industry_name: str, user_input: str = "",
         user_risk_preference: 用户风险偏好
         
     Returns:
-        流式响应生成器
+        流式响应分块迭代器（相同请求的并发会话共享一次上游调用）
     """
     # 增加使用次数
     increment_usage()
@@ -303,17 +483,14 @@ def analyze_industry_stream(industry_name: str, user_input: str = "",
         {"role": "user", "content": f"【知识库检索上下文】\n{context}\n\n【用户问题】\n请分析行业：{industry_name}\n\n补充信息：{user_input}"}
     ]
     
-    try:
-        stream = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=messages,
-            stream=True,
-            temperature=0.5,
-            max_tokens=4000
-        )
-        return stream
-    except Exception as e:
-        raise e
+    return coalesced_chat_completion(
+        client,
+        model="deepseek-chat",
+        messages=messages,
+        stream=True,
+        temperature=0.5,
+        max_tokens=4000
+    )
 
 
 def analyze_career_transition(current_industry: str, target_industry: str, 
@@ -361,7 +538,8 @@ def analyze_career_transition(current_industry: str, target_industry: str,
     ]
     
     try:
-        response = client.chat.completions.create(
+        response = coalesced_chat_completion(
+            client,
             model="deepseek-chat",
             messages=messages,
             temperature=0.6,
@@ -370,3 +548,129 @@ def analyze_career_transition(current_industry: str, target_industry: str,
         return response.choices[0].message.content
     except Exception as e:
         return f"❌ 分析失败: {str(e)}"
+
+
+def benchmark_coalescing(n_callers: int = 20, latency: float = 0.5) -> Dict:
+    """
+    并发合并测试：n_callers 个线程同时发出相同请求（非流式与流式各一轮），
+    对比直接调用与合并调用时本地模拟服务收到的请求数，并检查每个调用方拿到的内容一致
+    
+    Returns:
+        各轮的上游请求数、调用方数、内容是否一致与耗时（ms）
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    from utils.mock_llm_server import start_mock_llm_server
+    
+    server = start_mock_llm_server(latency=latency)
+    client = OpenAI(api_key="mock", base_url=server.base_url)
+    params = {
+        "model": "deepseek-chat",
+        "messages": [{"role": "user", "content": "请分析行业：储能系统集成"}],
+        "temperature": 0.5,
+    }
+    
+    def read_content(response, stream: bool) -> str:
+        if not stream:
+            return response.choices[0].message.content
+        return "".join(chunk.choices[0].delta.content or "" for chunk in response if chunk.choices)
+    
+    def run_round(name: str, call, stream: bool) -> Dict:
+        barrier = threading.Barrier(n_callers)
+        
+        def worker(_):
+            barrier.wait()
+            return read_content(call(stream), stream)
+        
+        before = server.request_count
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n_callers) as pool:
+            contents = list(pool.map(worker, range(n_callers)))
+        return {
+            "round": name,
+            "callers": n_callers,
+            "upstream_requests": server.request_count - before,
+            "identical": len(set(contents)) == 1 and bool(contents[0]),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+    
+    try:
+        return {"results": [
+            run_round("direct", lambda stream: client.chat.completions.create(**params, stream=stream), False),
+            run_round("coalesced", lambda stream: coalesced_chat_completion(client, **params, stream=stream), False),
+            run_round("direct-stream", lambda stream: client.chat.completions.create(**params, stream=stream), True),
+            run_round("coalesced-stream", lambda stream: coalesced_chat_completion(client, **params, stream=stream), True),
+        ], "stats": get_coalescing_stats()}
+    finally:
+        server.shutdown()
+
+
+def check_coalescing(n_callers: int = 8, latency: float = 0.4):
+    """
+    并发合并校验（断言失败时抛出 AssertionError）：
+    1. n_callers 个相同的非流式调用只产生 1 次上游请求，且拿到同一个结果
+    2. n_callers 个相同的流式调用只产生 1 次上游请求；一半调用方在上游开始输出后才加入，
+       每个调用方都按顺序收到完整的分块序列（从角色分块到 finish_reason 为 stop 的结束分块）
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    from utils.mock_llm_server import STREAM_CHUNK_CHARS, build_mock_reply, start_mock_llm_server
+    
+    server = start_mock_llm_server(latency=latency)
+    client = OpenAI(api_key="mock", base_url=server.base_url)
+    messages = [{"role": "user", "content": f"请分析行业：储能系统集成 {time.time_ns()}"}]
+    expected = build_mock_reply(messages)
+    expected_chunks = -(-len(expected) // STREAM_CHUNK_CHARS) + 2
+    
+    try:
+        barrier = threading.Barrier(n_callers)
+        
+        def call(_):
+            barrier.wait()
+            return coalesced_chat_completion(client, model="deepseek-chat", messages=messages)
+        
+        before = server.request_count
+        with ThreadPoolExecutor(max_workers=n_callers) as pool:
+            results = list(pool.map(call, range(n_callers)))
+        upstream = server.request_count - before
+        assert upstream == 1, f"非流式：{n_callers} 个调用产生了 {upstream} 次上游请求"
+        assert all(r is results[0] for r in results), "非流式：调用方拿到的结果不一致"
+        assert results[0].choices[0].message.content == expected, "非流式：返回内容不完整"
+        
+        def subscribe(i):
+            # 后一半调用方在上游已开始输出分块时加入，覆盖补发已收到分块的路径
+            if i >= n_callers // 2:
+                time.sleep(latency * 0.75)
+            return list(coalesced_chat_completion(client, model="deepseek-chat", messages=messages, stream=True))
+        
+        before = server.request_count
+        with ThreadPoolExecutor(max_workers=n_callers) as pool:
+            streams = list(pool.map(subscribe, range(n_callers)))
+        upstream = server.request_count - before
+        assert upstream == 1, f"流式：{n_callers} 个调用产生了 {upstream} 次上游请求"
+        for i, chunks in enumerate(streams):
+            content = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+            assert len(chunks) == expected_chunks, f"流式：第 {i} 个调用方收到 {len(chunks)}/{expected_chunks} 个分块"
+            assert content == expected, f"流式：第 {i} 个调用方收到的内容不完整"
+            assert chunks[-1].choices[0].finish_reason == "stop", f"流式：第 {i} 个调用方未收到结束分块"
+            assert [id(c) for c in chunks] == [id(c) for c in streams[0]], f"流式：第 {i} 个调用方的分块顺序不一致"
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("相同请求合并：并发校验")
+    print("=" * 50)
+    check_coalescing()
+    print("通过：相同的并发请求只产生 1 次上游请求，每个流式订阅方都收到完整分块序列")
+    
+    print("=" * 50)
+    print("相同请求合并：本地模拟服务并发测试")
+    print("=" * 50)
+    report = benchmark_coalescing()
+    for row in report["results"]:
+        print(row)
+    print(report["stats"])
@@ -0,0 +1,206 @@
+"""
+本地模拟 LLM 服务
+实现 OpenAI 兼容的 /v1/chat/completions（含 stream=True 的 SSE），按可配置的延迟返回简历解析 JSON，
+用于在不消耗 DeepSeek 配额的情况下测量批量诊断吞吐量
+
+用法：
+    python -m utils.mock_llm_server --port 8765 --latency 0.5
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from utils.entity_linker import link_industries
+
+DEFAULT_PORT = 8765
+DEFAULT_LATENCY_S = 0.5
+STREAM_CHUNK_CHARS = 16
+
+
+# ==========================================
+# 模拟回复
+# ==========================================
+def build_mock_reply(messages: List[Dict]) -> str:
+    """根据最后一条用户消息生成简历解析格式的 JSON 回复（行业由实体链接识别）"""
+    text = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    # 只分析提示词中的简历正文，避免把字段说明和返回示例里的行业识别进来
+    resume = re.search(r"简历内容：\n([\s\S]*?)\n\n请提取以下字段", text)
+    if resume:
+        text = resume.group(1)
+    years = re.search(r"(\d+(?:\.\d+)?)\s*年(?:工作|经验)?", text)
+    skills_line = re.search(r"技能[】:：\s]*\n?(.+)", text)
+    skills = re.split(r"[、,，/；;\s]+", skills_line.group(1).strip()) if skills_line else []
+    reply = {
+        "industries": [{"name": name, "period": "", "role": ""} for name in link_industries(text)[:5]],
+        "skills": [s for s in skills if s][:10],
+        "total_years": f"{years.group(1)}年" if years else "",
+        "education": "",
+        "current_role": "",
+    }
+    return "```json\n" + json.dumps(reply, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _completion_payload(model: str, content: str, prompt_chars: int) -> Dict:
+    return {
+        "id": f"mock-{random.getrandbits(48):x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_chars,
+            "completion_tokens": len(content),
+            "total_tokens": prompt_chars + len(content),
+        },
+    }
+
+
+def _chunk_payload(chunk_id: str, model: str, delta: Dict, finish_reason=None) -> Dict:
+    return {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+# ==========================================
+# HTTP 服务
+# ==========================================
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": {"message": "invalid JSON body"}})
+            return
+
+        server = self.server
+        with server.stats_lock:
+            server.request_count += 1
+
+        latency = max(server.latency + random.uniform(-server.jitter, server.jitter), 0)
+        if random.random() < server.error_rate:
+            time.sleep(latency)
+            self._send_json(500, {"error": {"message": "mock server error"}})
+            return
+
+        messages = request.get("messages") or []
+        model = request.get("model", "mock-chat")
+        content = build_mock_reply(messages)
+
+        if not request.get("stream"):
+            time.sleep(latency)
+            prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+            self._send_json(200, _completion_payload(model, content, prompt_chars))
+            return
+
+        # 流式回复：首个分片前等待一半延迟，其余延迟平摊到各分片
+        pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+        chunk_id = f"mock-{random.getrandbits(48):x}"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(latency / 2)
+        events = [_chunk_payload(chunk_id, model, {"role": "assistant", "content": ""})]
+        events += [_chunk_payload(chunk_id, model, {"content": piece}) for piece in pieces]
+        events.append(_chunk_payload(chunk_id, model, {}, finish_reason="stop"))
+        per_chunk = latency / 2 / max(len(events), 1)
+        try:
+            for event in events:
+                self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(per_chunk)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        self.close_connection = True
+
+
+def create_mock_llm_server(host: str = "127.0.0.1", port: int = DEFAULT_PORT, latency: float = DEFAULT_LATENCY_S,
+                           jitter: float = 0.0, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    """
+    创建模拟服务（未启动）
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机空闲端口
+        latency: 每个请求的平均延迟（秒）
+        jitter: 延迟的随机抖动幅度（秒）
+        error_rate: 随机返回 500 错误的比例
+
+    Returns:
+        ThreadingHTTPServer，base_url 属性为 OpenAI 客户端使用的接口地址
+    """
+    server = ThreadingHTTPServer((host, port), MockLLMHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.error_rate = error_rate
+    server.request_count = 0
+    server.stats_lock = threading.Lock()
+    server.base_url = f"http://{host}:{server.server_address[1]}/v1"
+    return server
+
+
+def start_mock_llm_server(port: int = 0, latency: float = DEFAULT_LATENCY_S, **kwargs) -> ThreadingHTTPServer:
+    """在后台线程中启动模拟服务，使用完毕后调用 server.shutdown()"""
+    server = create_mock_llm_server(port=port, latency=latency, **kwargs)
+    threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 LLM 服务（OpenAI 兼容接口）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_S, help="平均响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟随机抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机返回 500 错误的比例")
+    args = parser.parse_args()
+
+    server = create_mock_llm_server(args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"模拟 LLM 服务已启动：{server.base_url}（延迟 {args.latency}s）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"共处理 {server.request_count} 个请求")
+
+
+if __name__ == "__main__":
+    main()
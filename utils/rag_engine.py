@@ -8,6 +8,9 @@ import streamlit as st
 from typing import Dict, List, Optional, Tuple
 import re
 
+from utils.data_processor import get_file_version
+from utils.transition_ranker import lookup_growth_targets
+
 
 class IndustryRAGEngine:
     """
@@ -23,6 +26,7 @@ class IndustryRAGEngine:
             csv_path: 行业周期数据CSV文件路径
         """
         self.csv_path = csv_path
+        self.data_version = get_file_version(csv_path)
         self.df = self._load_data()
         self.cycle_theory = self._load_cycle_theory()
     
@@ -235,7 +239,48 @@ class IndustryRAGEngine:
         
         context_parts = []
         context_parts.append(f"【知识库检索结果】用户关注行业：{industry_name}\n")
+        context_parts.extend(self._format_context_records(search_results))
+        
+        context_parts.append("\n--- 分析要求 ---")
+        context_parts.append("请基于以上知识库数据，结合马江博周期理论，为用户提供有理有据的职业规划建议。")
+        context_parts.append("避免使用大话套话，所有建议必须基于上述数据支撑。")
+        
+        return "\n".join(context_parts)
+    
+    def build_context_for_industries(self, industry_names: List[str], top_k: int = 1) -> str:
+        """
+        为对话中提及的多个行业构建合并的检索上下文
+        
+        Args:
+            industry_names: 行业名称列表（如实体链接的结果）
+            top_k: 每个行业保留的匹配条数
+            
+        Returns:
+            格式化的上下文文本；没有任何行业命中知识库时返回空字符串
+        """
+        context_parts = []
+        seen = set()
+        for industry_name in industry_names:
+            search_results = [r for r in self.search_industry(industry_name, top_k=top_k)
+                              if r['行业名称'] not in seen]
+            if not search_results:
+                continue
+            seen.update(r['行业名称'] for r in search_results)
+            context_parts.append(f"\n【知识库检索结果】用户提及行业：{industry_name}")
+            context_parts.extend(self._format_context_records(search_results))
         
+        if not context_parts:
+            return ""
+        
+        context_parts.append("\n--- 分析要求 ---")
+        context_parts.append("请基于以上知识库数据，结合马江博周期理论，为用户提供有理有据的职业规划建议；涉及多个行业时请逐一对比。")
+        context_parts.append("避免使用大话套话，所有建议必须基于上述数据支撑。")
+        
+        return "\n".join(context_parts).lstrip("\n")
+    
+    def _format_context_records(self, search_results: List[Dict]) -> List[str]:
+        """把检索结果格式化为上下文文本行"""
+        context_parts = []
         for i, result in enumerate(search_results, 1):
             context_parts.append(f"\n--- 匹配结果 {i} ({result['匹配类型']}) ---")
             context_parts.append(f"行业名称：{result['行业名称']}")
@@ -259,11 +304,7 @@ class IndustryRAGEngine:
             context_parts.append(f"- 适合人群：{combo.get('适合人群', '')}")
             context_parts.append(f"- 行动建议：{combo.get('策略', '')}")
         
-        context_parts.append("\n--- 分析要求 ---")
-        context_parts.append("请基于以上知识库数据，结合马江博周期理论，为用户提供有理有据的职业规划建议。")
-        context_parts.append("避免使用大话套话，所有建议必须基于上述数据支撑。")
-        
-        return "\n".join(context_parts)
+        return context_parts
     
     def get_risk_warning(self, industry_name: str) -> Optional[Dict]:
         """
@@ -307,7 +348,7 @@ class IndustryRAGEngine:
     
     def _get_transition_recommendations(self, current_industry: str) -> List[Dict]:
         """
-        获取转型推荐方向
+        获取转型推荐方向：成长期/初创期且景气度高的行业（读取按数据版本预计算的列表）
         
         Args:
             current_industry: 当前行业
@@ -318,25 +359,14 @@ class IndustryRAGEngine:
         if self.df.empty:
             return []
         
-        # 获取成长期行业作为推荐
-        growth_industries = self.df[
-            self.df['当前周期阶段'].isin(['成长期', '初创期']) &
-            self.df['未来1-3年景气度'].str.contains('高成长|高', na=False)
-        ].head(5)
-        
-        recommendations = []
-        for _, row in growth_industries.iterrows():
-            recommendations.append({
-                "行业名称": row['行业名称'],
-                "周期阶段": row['当前周期阶段'],
-                "景气度": row['未来1-3年景气度'],
-                "推荐理由": row['评价']
-            })
-        
-        return recommendations
+        return lookup_growth_targets(self.df, top_k=5, data_version=self.data_version)
+
+
+@st.cache_resource(max_entries=2)
+def _get_rag_engine(csv_path: str, data_version: str) -> IndustryRAGEngine:
+    return IndustryRAGEngine(csv_path)
 
 
-@st.cache_resource
-def get_rag_engine() -> IndustryRAGEngine:
-    """获取RAG引擎单例（带缓存）"""
-    return IndustryRAGEngine()
+def get_rag_engine(csv_path: str = "data/细分领域行业周期研判表.csv") -> IndustryRAGEngine:
+    """获取RAG引擎单例（带缓存，知识库文件更新后自动重建）"""
+    return _get_rag_engine(csv_path, get_file_version(csv_path))
@@ -0,0 +1,435 @@
+"""
+简历诊断核心逻辑
+简历解析（本地规则提取 / LLM + 备用的实体链接识别）、行业风险分析与转型推荐，
+供「简历诊断中心」页面与批量诊断命令行（utils/batch_diagnosis.py）共用
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.data_processor import get_file_version, load_industry_data
+from utils.entity_linker import link_industries
+from utils.exposure_engine import parse_period, score_exposure
+from utils.json_stream import IncrementalJSONParser
+from utils.rag_engine import get_rag_engine
+from utils.resume_compactor import compact_resume_for_prompt
+from utils.resume_extractor import LOCAL_CONFIDENCE_THRESHOLD, extract_resume_locally, is_confident
+from utils.transition_ranker import rank_transition_targets
+
+DEFAULT_KB_PATH = "data/细分领域行业周期研判表.csv"
+
+# 简历解析参数
+MIN_RESUME_CHARS = 20
+RESUME_PARSE_MODEL = "deepseek-chat"
+RESUME_PARSE_TEMPERATURE = 0.3
+RESUME_PARSE_MAX_TOKENS = 1500
+
+RESUME_PARSE_SYSTEM_PROMPT = "你是一个专业的简历解析助手，擅长从简历中提取结构化信息，只返回JSON格式。"
+
+# 流式解析时逐元素产出的数组字段
+STREAM_ARRAY_KEYS = ("industries", "skills")
+
+RISK_LEVELS = ("高风险", "中风险", "低风险", "未识别")
+
+
+# ==========================================
+# 简历解析
+# ==========================================
+def build_resume_parse_messages(resume_text: str) -> List[Dict]:
+    """构建简历解析的对话消息（简历正文先经 compact_resume 去噪并压缩到 token 预算内）"""
+    prompt = f"""请从以下简历中提取关键信息，以JSON格式返回：
+
+简历内容：
+{compact_resume_for_prompt(resume_text)}
+
+请提取以下字段：
+1. industries: 行业经历列表（每个包含 name行业名称, period时间段, role职位）
+2. skills: 核心技能列表（字符串数组）
+3. total_years: 工作年限（数字或字符串）
+4. education: 最高学历
+5. current_role: 当前/最近职位
+
+注意：
+- 如果找不到某字段，返回空字符串或空数组
+- 行业名称请尽量标准，如"房地产"、"互联网"、"金融"等
+- 必须返回有效的JSON格式
+
+返回示例：
+{{
+    "industries": [
+        {{"name": "房地产", "period": "2018-2022", "role": "项目经理"}},
+        {{"name": "建筑", "period": "2022-至今", "role": "高级工程师"}}
+    ],
+    "skills": ["项目管理", "工程管理", "团队协调"],
+    "total_years": "6年",
+    "education": "本科",
+    "current_role": "高级工程师"
+}}"""
+    return [
+        {"role": "system", "content": RESUME_PARSE_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_resume_response(result_text: str) -> dict:
+    """从LLM回复中提取JSON（代码块 / 普通JSON对象 / 整段文本）"""
+    try:
+        # 查找JSON代码块
+        json_block = re.search(r'```json\s*(.*?)\s*```', result_text, re.DOTALL)
+        if json_block:
+            return json.loads(json_block.group(1))
+
+        # 查找普通JSON对象
+        json_match = re.search(r'\{[\s\S]*\}', result_text)
+        if json_match:
+            return json.loads(json_match.group())
+
+        # 直接解析
+        return json.loads(result_text)
+    except json.JSONDecodeError:
+        return {
+            "industries": [],
+            "skills": [],
+            "parse_error": True,
+            "raw_response": result_text
+        }
+
+
+def parse_resume_with_llm(resume_text: str, client=None, model: str = RESUME_PARSE_MODEL) -> dict:
+    """
+    使用LLM解析简历内容
+
+    Args:
+        resume_text: 简历文本
+        client: OpenAI 兼容客户端，默认使用页面配置的 DeepSeek 客户端
+        model: 模型名称
+
+    Returns:
+        解析结果；失败时包含 error 或 parse_error
+    """
+    if not resume_text or len(resume_text.strip()) < MIN_RESUME_CHARS:
+        return {"error": "简历内容太短，无法解析"}
+
+    if client is None:
+        from utils.llm_engine import get_deepseek_client
+        client = get_deepseek_client()
+
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=build_resume_parse_messages(resume_text),
+            temperature=RESUME_PARSE_TEMPERATURE,
+            max_tokens=RESUME_PARSE_MAX_TOKENS
+        )
+        return parse_resume_response(response.choices[0].message.content)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def parse_resume_with_llm_async(resume_text: str, client, model: str = RESUME_PARSE_MODEL) -> dict:
+    """
+    parse_resume_with_llm 的异步版本（批量诊断使用）
+
+    Args:
+        resume_text: 简历文本
+        client: AsyncOpenAI 兼容客户端
+        model: 模型名称
+    """
+    if not resume_text or len(resume_text.strip()) < MIN_RESUME_CHARS:
+        return {"error": "简历内容太短，无法解析"}
+
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=build_resume_parse_messages(resume_text),
+            temperature=RESUME_PARSE_TEMPERATURE,
+            max_tokens=RESUME_PARSE_MAX_TOKENS
+        )
+        return parse_resume_response(response.choices[0].message.content)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def parse_resume_local_first(resume_text: str, client=None, model: str = RESUME_PARSE_MODEL,
+                             min_confidence: float = LOCAL_CONFIDENCE_THRESHOLD) -> dict:
+    """
+    先用本地规则提取简历，置信度不足时再调用 LLM
+
+    Args:
+        resume_text: 简历文本
+        client: OpenAI 兼容客户端，默认使用页面配置的 DeepSeek 客户端
+        model: 模型名称
+        min_confidence: 直接采用本地结果的最低置信度，大于 1 表示总是调用 LLM
+
+    Returns:
+        解析结果；本地结果带 source="local" 与 confidence
+    """
+    local = extract_resume_locally(resume_text)
+    if is_confident(local, min_confidence):
+        return local
+    return parse_resume_with_llm(resume_text, client=client, model=model)
+
+
+def stream_resume_parse(resume_text: str, client=None,
+                        model: str = RESUME_PARSE_MODEL) -> Iterator[Tuple[str, Any]]:
+    """
+    流式解析简历：以 JSON 模式请求输出，并用增量解析器在 industries / skills 的每个元素闭合时立即产出
+
+    Args:
+        resume_text: 简历文本
+        client: OpenAI 兼容客户端，默认使用页面配置的 DeepSeek 客户端
+        model: 模型名称
+
+    Yields:
+        ("industry", {"name", "period", "role"})、("skill", 技能)、("field", (字段名, 值))，
+        最后产出 ("done", 完整解析结果)；失败时完整结果包含 error 或 parse_error
+    """
+    if not resume_text or len(resume_text.strip()) < MIN_RESUME_CHARS:
+        yield "done", {"error": "简历内容太短，无法解析"}
+        return
+
+    if client is None:
+        from utils.llm_engine import get_deepseek_client
+        client = get_deepseek_client()
+
+    parser = IncrementalJSONParser(watch_arrays=STREAM_ARRAY_KEYS)
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=build_resume_parse_messages(resume_text),
+            temperature=RESUME_PARSE_TEMPERATURE,
+            max_tokens=RESUME_PARSE_MAX_TOKENS,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for key, value, is_element in parser.feed(chunk.choices[0].delta.content):
+                if is_element and key == "industries":
+                    industry = value if isinstance(value, dict) else {"name": str(value)}
+                    if industry.get("name"):
+                        yield "industry", {"period": "", "role": "", **industry}
+                elif is_element and key == "skills":
+                    yield "skill", value
+                elif not is_element and key not in STREAM_ARRAY_KEYS:
+                    yield "field", (key, value)
+    except Exception as e:
+        yield "done", {"error": str(e)}
+        return
+
+    try:
+        yield "done", parser.finish()
+    except ValueError:
+        yield "done", parse_resume_response(parser.text)
+
+
+def extract_industries_from_text(text: str) -> list:
+    """从文本中提取行业（备用方案）：知识库行业名称与别名的单次扫描匹配"""
+    return link_industries(text)
+
+
+def empty_parse_result() -> dict:
+    return {"industries": [], "skills": [], "total_years": "", "education": "", "current_role": ""}
+
+
+def fallback_parse(resume_text: str) -> dict:
+    """LLM解析失败时的备用解析结果（仅包含行业）"""
+    parsed = empty_parse_result()
+    parsed["industries"] = [{"name": ind, "period": "", "role": ""}
+                            for ind in extract_industries_from_text(resume_text)]
+    return parsed
+
+
+def merge_parse_results(primary: dict, secondary: dict) -> dict:
+    """
+    合并两份解析结果：以 primary（如 LLM 结果）为准，其空字段用 secondary（如本地提取结果）补齐
+
+    Returns:
+        新的解析结果，只包含 empty_parse_result 中的字段
+    """
+    merged = empty_parse_result()
+    for key in merged:
+        merged[key] = primary.get(key) or secondary.get(key) or merged[key]
+    return merged
+
+
+def get_parsed_industries(parsed: dict) -> List[str]:
+    """解析结果中的行业名称列表"""
+    return [ind.get("name", "") for ind in parsed.get("industries", []) if isinstance(ind, dict)]
+
+
+def get_experience_list(parsed: dict, extra_industries: Optional[List[str]] = None) -> List[Dict]:
+    """
+    解析结果中的行业经历（含 period），用于任职加权的风险暴露评分
+
+    Args:
+        parsed: 简历解析结果
+        extra_industries: 额外指定的行业（没有时间段，按默认任职时长计）
+    """
+    experiences = [ind for ind in parsed.get("industries", []) if isinstance(ind, dict) and ind.get("name")]
+    named = {ind["name"] for ind in experiences}
+    experiences += [{"name": name, "period": ""} for name in extra_industries or [] if name and name not in named]
+    return experiences
+
+
+def get_current_industry(parsed: dict, extra_industries: Optional[List[str]] = None) -> str:
+    """
+    当前所在行业：页面上手动选择的行业优先；其次是任职至今或结束时间最晚的经历
+    （解析结果中的经历通常按时间由早到晚排列，不能直接取第一条）；都没有时间段时取第一条
+
+    Args:
+        parsed: 简历解析结果
+        extra_industries: 额外指定的行业（如页面上手动选择的行业）
+    """
+    selected = [name for name in extra_industries or [] if name]
+    if selected:
+        return selected[0]
+    experiences = [ind for ind in parsed.get("industries", []) if isinstance(ind, dict) and ind.get("name")]
+    current, current_key = "", None
+    for index, exp in enumerate(experiences):
+        span = parse_period(exp.get("period"))
+        if span is None:
+            continue
+        key = (span[1], span[0], index)
+        if current_key is None or key > current_key:
+            current, current_key = exp["name"], key
+    return current or (experiences[0]["name"] if experiences else "")
+
+
+# ==========================================
+# 行业风险分析
+# ==========================================
+def analyze_industry_risk(industry: str, rag_engine=None) -> Tuple[str, Any]:
+    """
+    分析单个行业的风险
+
+    Returns:
+        (风险等级, 明细)；未识别的行业明细为行业名称本身
+    """
+    rag_engine = rag_engine or get_rag_engine()
+    results = rag_engine.search_industry(industry, top_k=1)
+    if not results:
+        return "未识别", industry
+
+    result = results[0]
+    stage = result['当前周期阶段']
+    sentiment = result['未来1-3年景气度']
+    item = {"industry": industry, "stage": stage, "sentiment": sentiment}
+
+    if stage in ['调整期', '衰退期'] or '承压' in sentiment:
+        item["warning"] = rag_engine.get_risk_warning(industry)
+        return "高风险", item
+    if stage == '成熟期' and '平稳' in sentiment:
+        return "中风险", item
+    return "低风险", item
+
+
+def analyze_industry_risks(industries: list, known: Optional[Dict[str, Tuple[str, Any]]] = None) -> dict:
+    """
+    分析行业风险
+
+    Args:
+        industries: 行业名称列表
+        known: 已分析过的行业（如流式解析过程中提前完成的结果），行业名称 -> analyze_industry_risk 的结果
+    """
+    rag_engine = get_rag_engine()
+    known = known or {}
+
+    risk_analysis = {level: [] for level in RISK_LEVELS}
+    for industry in industries:
+        level, item = known.get(industry) or analyze_industry_risk(industry, rag_engine)
+        risk_analysis[level].append(item)
+
+    return risk_analysis
+
+
+# ==========================================
+# 推荐转型方向
+# ==========================================
+def parse_work_years(total_years, default: float = 3) -> float:
+    """从"6年"、"5.5"等表述中提取工作年限"""
+    years_match = re.search(r"\d+(\.\d+)?", str(total_years or ""))
+    return float(years_match.group()) if years_match else default
+
+
+def get_transition_recommendations(current_industries: list, skills: list = None, total_years=None,
+                                   data_path: str = DEFAULT_KB_PATH, current_industry: Optional[str] = None) -> list:
+    """
+    获取转型推荐（对行业表全部行业排序，取前5名）
+
+    Args:
+        current_industries: 全部行业经历
+        skills: 技能
+        total_years: 工作年限
+        data_path: 行业数据文件
+        current_industry: 当前所在行业（见 get_current_industry），默认取 current_industries 的第一个
+    """
+    df = load_industry_data(data_path)
+
+    current = current_industry or (current_industries[0] if current_industries else "")
+    # 其余行业经历与技能一起参与技能相近度计算
+    query_terms = list(skills or []) + [ind for ind in current_industries if ind != current]
+    work_years = parse_work_years(total_years)
+
+    ranked = rank_transition_targets(
+        df, current, work_years=work_years, top_k=5,
+        skills=query_terms, data_version=get_file_version(data_path)
+    )
+
+    recommendations = []
+    for _, row in ranked.iterrows():
+        reasons = [f"{row['周期组合']}"]
+        if row['技能相近度'] > 0:
+            reasons.append(f"与{current or '现有经验'}技能相近度 {row['技能相近度']:.0f}")
+        if row['匹配技能']:
+            reasons.append(f"可迁移技能：{'、'.join(row['匹配技能'][:3])}")
+        if row['预计超越年份'] != "未超过":
+            reasons.append(f"预计{row['预计超越年份']}职业价值超过留在原行业")
+        recommendations.append({
+            "from": current or "当前行业",
+            "to": row['行业名称'],
+            "reason": "；".join(reasons),
+            "cycle_stage": row['当前周期阶段'],
+            "sentiment": row['未来1-3年景气度']
+        })
+
+    return recommendations
+
+
+# ==========================================
+# 完整诊断（无界面）
+# ==========================================
+def diagnose_parsed_resume(parsed: dict, extra_industries: Optional[List[str]] = None) -> dict:
+    """
+    基于解析结果生成诊断：行业、风险分析、风险暴露评分与转型推荐
+
+    Args:
+        parsed: parse_resume_with_llm / fallback_parse 的结果
+        extra_industries: 额外指定的行业（如页面上手动选择的行业）
+
+    Returns:
+        包含 industries、skills、total_years、current_role、risk_analysis、exposure、recommendations
+    """
+    all_industries = list(dict.fromkeys(list(extra_industries or []) + get_parsed_industries(parsed)))
+    all_industries = [ind for ind in all_industries if ind]
+    skills = parsed.get("skills", []) or []
+
+    diagnosis = {
+        "industries": all_industries,
+        "skills": skills,
+        "total_years": parsed.get("total_years", ""),
+        "current_role": parsed.get("current_role", ""),
+        "risk_analysis": {},
+        "exposure": {},
+        "recommendations": [],
+    }
+    if all_industries:
+        diagnosis["risk_analysis"] = analyze_industry_risks(all_industries)
+        diagnosis["exposure"] = score_exposure(get_experience_list(parsed, extra_industries))
+        diagnosis["recommendations"] = get_transition_recommendations(
+            all_industries, skills, parsed.get("total_years"),
+            current_industry=get_current_industry(parsed, extra_industries)
+        )
+    return diagnosis
@@ -0,0 +1,260 @@
+"""
+简历压缩
+提交 LLM 解析前按分节整理简历：去掉联系方式、页眉页脚等噪声与重复行，压缩空白，
+再按「工作经历首行 > 技能 > 基本信息与教育背景 > 工作经历描述 > 其他」的优先级在 token 预算内逐行保留；
+工作经历描述按经历结束时间由近到远取舍，不会像按字符截断那样丢掉最近的经历
+"""
+
+import json
+import logging
+import re
+from typing import Dict, List, Tuple
+
+from utils.resume_extractor import SAMPLE_CORPUS_PATH, parse_date_range, split_sections
+
+logger = logging.getLogger(__name__)
+
+# 简历正文的 token 预算（约 2000 个汉字，原先按字符截断为 4000 字）
+RESUME_TOKEN_BUDGET = 1200
+
+# DeepSeek 官方给出的换算：1 个中文字符约 0.6 token，1 个英文字符约 0.3 token
+CJK_TOKENS_PER_CHAR = 0.6
+ASCII_TOKENS_PER_CHAR = 0.3
+
+# 保留档位（数字越小越优先）：工作经历首行 > 技能 > 基本信息与教育背景 > 工作经历描述 > 其他
+# header 为分节标题之前的内容，通常含姓名、工作年限、求职意向
+LINE_PRIORITY = {"work_head": 0, "skills": 1, "header": 2, "education": 2, "work_detail": 3, "other": 4}
+
+# 输出的分节顺序与标题
+SECTION_ORDER = ["header", "work", "skills", "education", "other"]
+SECTION_TITLES = {"work": "工作经历", "skills": "技能", "education": "教育背景", "header": "", "other": "其他"}
+
+# 超过该长度的行（如 PDF 提取出的整段文字）按句切开后再参与取舍
+MAX_LINE_CHARS = 200
+
+# ==========================================
+# 噪声规则
+# ==========================================
+_CONTACT_PATTERNS = [
+    re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"),                          # 邮箱
+    re.compile(r"(?<!\d)(?:\+?86[-\s]?)?1[3-9]\d[-\s]?\d{4}[-\s]?\d{4}(?!\d)"),  # 手机
+    re.compile(r"(?<!\d)0\d{2,3}-?\d{7,8}(?!\d)"),                       # 座机
+    re.compile(r"https?://\S+|www\.\S+"),                                 # 网址
+    re.compile(r"(?<![\dXx])\d{17}[\dXx](?![\dXx])"),                     # 身份证号
+]
+# 与解析字段无关的个人信息字段：整项（字段名到下一个分隔处）删除
+_PERSONAL_FIELDS = re.compile(
+    r"(?:电话|手机|联系电话|邮箱|E-?mail|微信|QQ|地址|现居地?|住址|籍贯|户口|出生(?:日期|年月)?|年龄|性别|民族|"
+    r"政治面貌|婚姻状况|婚育|身高|体重|身份证(?:号)?|GitHub|博客|个人主页)\s*[：:]\s*[^\s|｜,，;；]*",
+    re.IGNORECASE
+)
+_BOILERPLATE_LINES = re.compile(
+    r"^(?:个人简历|简历|求职简历|resume|curriculum vitae|cv|第\s*\d+\s*页(?:\s*[/，,]?\s*共\s*\d+\s*页)?|"
+    r"page\s*\d+(?:\s*(?:of|/)\s*\d+)?|\d+\s*/\s*\d+)$",
+    re.IGNORECASE
+)
+_DECORATION = re.compile(r"^[\s\-–—=_*#•·●○■□◆◇▪►>|｜~～.。]+|[\s\-–—=_*#•·●○■□◆◇▪|｜]+$")
+_WHITESPACE = re.compile(r"[ \t　\xa0]+")
+_SENTENCE_END = re.compile(r"(?<=[。；;！？!?])")
+_CJK = re.compile(r"[　-〿一-鿿＀-￯]")
+
+
+# ==========================================
+# token 估算与行清理
+# ==========================================
+def estimate_tokens(text: str) -> int:
+    """按字符类型估算 token 数（中文及全角字符 0.6，其余非空白字符 0.3）"""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    other = len(text) - cjk - text.count(" ") - text.count("\n")
+    return int(round(cjk * CJK_TOKENS_PER_CHAR + max(other, 0) * ASCII_TOKENS_PER_CHAR + text.count("\n")))
+
+
+def clean_line(line: str) -> str:
+    """去掉联系方式、个人信息字段与行首尾的装饰符号，并压缩空白；整行都是噪声时返回空字符串"""
+    line = _PERSONAL_FIELDS.sub(" ", line)
+    for pattern in _CONTACT_PATTERNS:
+        line = pattern.sub(" ", line)
+    # 连续空白多为版式中的分栏（公司与职位之间），保留为两个空格，其余压缩为一个
+    line = _WHITESPACE.sub(lambda m: "  " if len(m.group()) > 1 or m.group() == "\t" else " ", line).strip()
+    line = _DECORATION.sub("", line).strip()
+    if not line or _BOILERPLATE_LINES.match(line):
+        return ""
+    return line
+
+
+def _split_long_line(line: str) -> List[str]:
+    if len(line) <= MAX_LINE_CHARS:
+        return [line]
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(line):
+        if current and len(current) + len(sentence) > MAX_LINE_CHARS:
+            pieces.append(current)
+            current = ""
+        current += sentence
+    if current:
+        pieces.append(current)
+    return [piece[i:i + MAX_LINE_CHARS] for piece in pieces for i in range(0, len(piece), MAX_LINE_CHARS)]
+
+
+def _dedupe_key(line: str) -> str:
+    return re.sub(r"[\s，,。.；;：:、]+", "", line).lower()
+
+
+# ==========================================
+# 按优先级取舍
+# ==========================================
+def _prioritize_lines(cleaned: Dict[str, List[str]]) -> List[Tuple[int, Tuple, str, int]]:
+    """
+    给每一行排定保留顺序：(档位, 档内顺序, 分节, 行号)
+
+    工作经历按日期行切成若干段经历，首行（日期、公司、职位）与描述行分属不同档位，
+    档内按经历结束时间由近到远排列，预算不足时先舍弃早年经历的描述
+    """
+    candidates = []
+    for name, lines in cleaned.items():
+        if name != "work":
+            tier = LINE_PRIORITY.get(name, LINE_PRIORITY["other"])
+            candidates += [(tier, (index,), name, index) for index in range(len(lines))]
+            continue
+        end = -1
+        for index, line in enumerate(lines):
+            parsed = parse_date_range(line)
+            if parsed:
+                end = parsed[1]
+                candidates.append((LINE_PRIORITY["work_head"], (-end, index), name, index))
+            else:
+                candidates.append((LINE_PRIORITY["work_detail"], (-end, index), name, index))
+    return sorted(candidates)
+
+
+# ==========================================
+# 对外接口
+# ==========================================
+def compact_resume(resume_text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> Dict:
+    """
+    压缩简历文本以适应 token 预算
+
+    Args:
+        resume_text: 简历原文
+        token_budget: 压缩后正文的 token 上限
+
+    Returns:
+        {"text": 压缩后的文本, "tokens_before", "tokens_after", "dropped_lines": 被删除或截掉的行数}
+    """
+    text = resume_text or ""
+    sections = split_sections("\n".join(piece for line in text.splitlines() for piece in _split_long_line(line)))
+
+    seen = set()
+    cleaned: Dict[str, List[str]] = {}
+    total_lines = 0
+    for name, lines in sections.items():
+        total_lines += len(lines)
+        for line in lines:
+            line = clean_line(line)
+            key = _dedupe_key(line)
+            if not line or key in seen:
+                continue
+            seen.add(key)
+            cleaned.setdefault(name, []).append(line)
+
+    kept: Dict[str, set] = {}
+    used = 0
+    for _, _, name, index in _prioritize_lines(cleaned):
+        cost = estimate_tokens(cleaned[name][index]) + 1
+        if name not in kept and SECTION_TITLES.get(name):
+            cost += estimate_tokens(f"【{SECTION_TITLES[name]}】") + 1
+        if used + cost > token_budget:
+            continue
+        kept.setdefault(name, set()).add(index)
+        used += cost
+
+    blocks = []
+    for name in SECTION_ORDER:
+        if name not in kept:
+            continue
+        title = SECTION_TITLES[name]
+        lines = [line for index, line in enumerate(cleaned[name]) if index in kept[name]]
+        blocks.append("\n".join(([f"【{title}】"] if title else []) + lines))
+    compacted = "\n".join(blocks)
+    kept_lines = sum(len(indexes) for indexes in kept.values())
+
+    tokens_before = estimate_tokens(text)
+    if tokens_before <= token_budget and estimate_tokens(compacted) >= tokens_before:
+        # 原文已足够紧凑（分节标题的开销抵消了清理的收益），直接使用原文
+        compacted, kept_lines = text.strip(), total_lines
+
+    return {
+        "text": compacted,
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(compacted),
+        "dropped_lines": total_lines - kept_lines,
+    }
+
+
+def compact_resume_for_prompt(resume_text: str, token_budget: int = RESUME_TOKEN_BUDGET) -> str:
+    """压缩简历并记录压缩前后的 token 数，返回压缩后的文本"""
+    result = compact_resume(resume_text, token_budget)
+    logger.info(
+        "简历压缩：%d → %d tokens（删除 %d 行）",
+        result["tokens_before"], result["tokens_after"], result["dropped_lines"]
+    )
+    return result["text"]
+
+
+def evaluate_compaction(corpus_path: str = SAMPLE_CORPUS_PATH, token_budget: int = RESUME_TOKEN_BUDGET) -> Dict:
+    """
+    在样本简历集上统计压缩效果，并检查压缩后本地提取的行业、年限、学历、技能是否与原文一致
+
+    Returns:
+        样本数、压缩前后 token 总数、节省比例与字段保持率
+    """
+    from utils.resume_extractor import extract_resume_locally
+
+    rows = []
+    with open(corpus_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+
+    before = after = preserved = 0
+    for row in rows:
+        result = compact_resume(row["text"], token_budget)
+        before += result["tokens_before"]
+        after += result["tokens_after"]
+        original, compacted = extract_resume_locally(row["text"]), extract_resume_locally(result["text"])
+        fields = ("industries", "total_years", "education", "skills")
+        preserved += all(original[field] == compacted[field] for field in fields)
+
+    return {
+        "samples": len(rows),
+        "tokens_before": before,
+        "tokens_after": after,
+        "saved_pct": round((1 - after / before) * 100, 1) if before else 0.0,
+        "fields_preserved_pct": round(preserved / len(rows) * 100, 1) if rows else None,
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("简历压缩：样本集评估")
+    print("=" * 50)
+    print(evaluate_compaction())
+    # 带联系方式、页码、重复段落和大段自我评价的长简历，预算截断时检查最近经历与技能是否保留
+    noisy = "\n".join(
+        ["个人简历", "张三  |  电话：138-1234-5678  |  邮箱：zhangsan@example.com", "性别：男  出生年月：1990.05  现居：上海",
+         "8年工作经验  求职意向：储能项目经理", "", "【自我评价】"]
+        + ["性格开朗，责任心强，具有良好的沟通协调能力和团队合作精神，能承受较大工作压力。"] * 3
+        + ["【工作经历】"]
+        + [line for year in range(2010, 2024, 2) for line in (
+            f"{year}.03 - {year + 2}.02    某{'地产' if year < 2016 else '储能'}公司{year}    项目经理",
+            "• 负责项目全流程管理，包括立项、招采、施工与验收，协调设计院、总包与监理单位。",
+            "• 负责项目全流程管理，包括立项、招采、施工与验收，协调设计院、总包与监理单位。",
+            f"• 主导{year}年度重点项目，编制进度计划与成本预算并跟踪风险整改。",
+            "第 1 页 / 共 3 页")]
+        + ["【技能】", "项目管理、成本控制、储能系统集成、PMP"]
+    )
+    demo = compact_resume(noisy, token_budget=200)
+    print({k: v for k, v in demo.items() if k != "text"})
+    print(demo["text"])
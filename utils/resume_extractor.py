@@ -0,0 +1,309 @@
+"""
+本地简历结构化提取
+用正则识别常见中文简历版式（分节标题、"2018.06 - 2022.03  公司  职位" 式的工作经历、技能列表、学历），
+公司与经历描述通过行业实体链接器对应到知识库行业，并给出置信度；
+置信度足够高时无需调用 LLM 解析简历
+"""
+
+import datetime
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils.entity_linker import get_entity_linker
+
+# 置信度达到该阈值时直接使用本地提取结果
+LOCAL_CONFIDENCE_THRESHOLD = 0.7
+
+# 置信度构成（合计 1.0）
+CONFIDENCE_WEIGHTS = {
+    "experience": 0.35,     # 识别到带日期的工作经历
+    "industry": 0.30,       # 经历中能链接到行业的比例
+    "skills": 0.15,
+    "total_years": 0.10,
+    "education": 0.05,
+    "current_role": 0.05,
+}
+
+SAMPLE_CORPUS_PATH = "data/sample_resumes.jsonl"
+
+# ==========================================
+# 版式规则
+# ==========================================
+SECTION_ALIASES = {
+    "work": ["工作经历", "工作经验", "职业经历", "任职经历", "实习经历", "项目经历", "项目经验"],
+    "education": ["教育背景", "教育经历", "学历"],
+    "skills": ["技能", "专业技能", "技能特长", "核心技能", "技能证书", "个人技能"],
+    "other": ["自我评价", "个人评价", "求职意向", "基本信息", "个人信息", "获奖情况", "荣誉奖项", "证书"],
+}
+_SECTION_LOOKUP = {alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases}
+_SECTION_PATTERN = re.compile(
+    r"^\s*[【\[#*\s]*(" + "|".join(sorted(_SECTION_LOOKUP, key=len, reverse=True)) + r")[】\]*\s]*[:：]?\s*(.*)$"
+)
+
+_DATE = r"(\d{4})\s*(?:[.\-/年]\s*(\d{1,2})\s*月?)?"
+DATE_RANGE_PATTERN = re.compile(
+    _DATE + r"\s*(?:-|–|—|~|～|至|到)+\s*(?:" + _DATE + r"|(至今|现在|今|present|Present|now))"
+)
+
+ROLE_KEYWORDS = (
+    "经理", "工程师", "主管", "总监", "专员", "设计师", "分析师", "顾问", "助理", "负责人", "架构师",
+    "研究员", "运营", "产品", "开发", "销售", "会计", "律师", "教师", "讲师", "医生", "护士", "主任",
+    "总裁", "总经理", "合伙人", "组长", "实习生", "技术员", "策划", "编辑", "记者", "店长", "采购",
+)
+
+EDUCATION_LEVELS = [("博士", "博士"), ("硕士", "硕士"), ("研究生", "硕士"), ("MBA", "硕士"),
+                    ("本科", "本科"), ("学士", "本科"), ("大专", "大专"), ("专科", "大专")]
+
+_SKILL_SPLIT = re.compile(r"[、,，/；;|]+|\s{2,}")
+_EXPLICIT_YEARS = re.compile(
+    r"(?:工作|从业)年限[：:\s]*(\d+(?:\.\d+)?)\s*年|(\d+(?:\.\d+)?)\s*年(?:以上)?(?:的)?(?:工作|从业|行业)?经验"
+)
+
+
+# ==========================================
+# 基础解析
+# ==========================================
+def _to_month_index(year: str, month: Optional[str]) -> Optional[int]:
+    year_value = int(year)
+    if not 1950 <= year_value <= 2100:
+        return None
+    month_value = int(month) if month else 1
+    if not 1 <= month_value <= 12:
+        month_value = 1
+    return year_value * 12 + month_value - 1
+
+
+def split_sections(text: str) -> Dict[str, List[str]]:
+    """按分节标题切分简历，标题前的内容归入 header"""
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        match = _SECTION_PATTERN.match(line)
+        if match and len(line.strip()) <= len(match.group(1)) + 30:
+            current = _SECTION_LOOKUP[match.group(1)]
+            sections.setdefault(current, [])
+            if match.group(2).strip():
+                sections[current].append(match.group(2).strip())
+            continue
+        if line.strip():
+            sections.setdefault(current, []).append(line.strip())
+    return sections
+
+
+def parse_date_range(line: str, today: Optional[datetime.date] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    解析行内的日期区间
+
+    Returns:
+        (起始月序号, 结束月序号, 日期区间结束位置)；没有日期区间时返回 None
+    """
+    match = DATE_RANGE_PATTERN.search(line)
+    if not match:
+        return None
+    start = _to_month_index(match.group(1), match.group(2))
+    if match.group(5):
+        today = today or datetime.date.today()
+        end = today.year * 12 + today.month - 1
+    else:
+        end = _to_month_index(match.group(3), match.group(4))
+    if start is None or end is None or end < start:
+        return None
+    return start, end, match.end()
+
+
+def _split_company_role(rest: str) -> Tuple[str, str]:
+    """把日期后的"公司  职位"拆开：带职位关键词的最后一段视为职位"""
+    parts = [p for p in re.split(r"\s*[|｜]\s*|\s{2,}|\t|\s+(?=\S*(?:" + "|".join(ROLE_KEYWORDS) + r")\S*$)", rest)
+             if p and p.strip()]
+    if not parts:
+        return "", ""
+    if len(parts) > 1 and any(k in parts[-1] for k in ROLE_KEYWORDS):
+        return " ".join(parts[:-1]).strip(), parts[-1].strip()
+    return parts[0].strip(), " ".join(parts[1:]).strip()
+
+
+def extract_experiences(lines: List[str], today: Optional[datetime.date] = None) -> List[Dict]:
+    """识别工作经历：以日期区间开头的行开始一段经历，其后的描述行归入该经历"""
+    linker = get_entity_linker()
+    experiences: List[Dict] = []
+    for line in lines:
+        parsed = parse_date_range(line, today)
+        if parsed:
+            start, end, date_end = parsed
+            company, role = _split_company_role(line[date_end:].strip(" ：:，,"))
+            experiences.append({"start": start, "end": end, "company": company, "role": role, "lines": [line]})
+        elif experiences:
+            experiences[-1]["lines"].append(line)
+
+    for exp in experiences:
+        # 依次尝试公司名、职位所在行、经历描述；同一来源中知识库行业优先于行业大类
+        exp["industry"] = ""
+        for source in (exp["company"], exp["lines"][0], "\n".join(exp["lines"][1:])):
+            mentions = linker.link(source)
+            if mentions:
+                kb_mentions = [m for m in mentions if m in linker.kb_set]
+                exp["industry"] = (kb_mentions or mentions)[0]
+                break
+    return experiences
+
+
+def merge_month_spans(spans: List[Tuple[int, int]]) -> int:
+    """合并重叠的经历区间，返回总月数"""
+    total, current_start, current_end = 0, None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def extract_skills(lines: List[str]) -> List[str]:
+    skills: List[str] = []
+    for line in lines:
+        for token in _SKILL_SPLIT.split(re.sub(r"^[\-•·*\d.、\s]+", "", line)):
+            token = token.strip(" 。.：:")
+            if 1 < len(token) <= 20:
+                skills.append(token)
+    return list(dict.fromkeys(skills))
+
+
+def extract_education(text: str) -> str:
+    for keyword, level in EDUCATION_LEVELS:
+        if keyword in text:
+            return level
+    return ""
+
+
+def _format_period(start: int, end: int, ongoing: bool) -> str:
+    start_text = f"{start // 12}.{start % 12 + 1:02d}"
+    return f"{start_text}-至今" if ongoing else f"{start_text}-{end // 12}.{end % 12 + 1:02d}"
+
+
+# ==========================================
+# 对外接口
+# ==========================================
+def extract_resume_locally(resume_text: str, today: Optional[datetime.date] = None) -> Dict:
+    """
+    本地提取简历结构化信息
+
+    Args:
+        resume_text: 简历文本
+        today: 计算"至今"时使用的日期，默认今天
+
+    Returns:
+        与 LLM 解析结果相同的字段（industries、skills、total_years、education、current_role），
+        另含 confidence（0-1）与 source="local"
+    """
+    text = resume_text or ""
+    today = today or datetime.date.today()
+    sections = split_sections(text)
+
+    work_lines = sections.get("work") or sections.get("header", [])
+    experiences = extract_experiences(work_lines, today)
+    if not experiences and "work" in sections:
+        experiences = extract_experiences(sections.get("header", []), today)
+
+    now_index = today.year * 12 + today.month - 1
+    industries = []
+    for exp in experiences:
+        if exp["industry"]:
+            industries.append({
+                "name": exp["industry"],
+                "period": _format_period(exp["start"], exp["end"], exp["end"] >= now_index),
+                "role": exp["role"],
+            })
+
+    explicit_years = _EXPLICIT_YEARS.search(text)
+    if explicit_years:
+        total_years = f"{explicit_years.group(1) or explicit_years.group(2)}年"
+    elif experiences:
+        months = merge_month_spans([(e["start"], e["end"]) for e in experiences])
+        total_years = f"{round(months / 12 * 2) / 2:g}年" if months else ""
+    else:
+        total_years = ""
+
+    latest = max(experiences, key=lambda e: (e["end"], e["start"])) if experiences else None
+    skills = extract_skills(sections.get("skills", []))
+    education = extract_education("\n".join(sections.get("education", [])) or text)
+    current_role = latest["role"] if latest else ""
+
+    linked_share = sum(1 for e in experiences if e["industry"]) / len(experiences) if experiences else 0.0
+    confidence = (
+        CONFIDENCE_WEIGHTS["experience"] * (1.0 if experiences else 0.0)
+        + CONFIDENCE_WEIGHTS["industry"] * linked_share
+        + CONFIDENCE_WEIGHTS["skills"] * (1.0 if skills else 0.0)
+        + CONFIDENCE_WEIGHTS["total_years"] * (1.0 if total_years else 0.0)
+        + CONFIDENCE_WEIGHTS["education"] * (1.0 if education else 0.0)
+        + CONFIDENCE_WEIGHTS["current_role"] * (1.0 if current_role else 0.0)
+    )
+
+    return {
+        "industries": industries,
+        "skills": skills,
+        "total_years": total_years,
+        "education": education,
+        "current_role": current_role,
+        "confidence": round(confidence, 2),
+        "source": "local",
+    }
+
+
+def is_confident(parsed: Dict, threshold: float = LOCAL_CONFIDENCE_THRESHOLD) -> bool:
+    """本地提取结果是否足以跳过 LLM 解析（至少要识别出一个行业）"""
+    return bool(parsed.get("industries")) and parsed.get("confidence", 0) >= threshold
+
+
+def evaluate_local_extractor(corpus_path: str = SAMPLE_CORPUS_PATH,
+                             threshold: float = LOCAL_CONFIDENCE_THRESHOLD) -> Dict:
+    """
+    在样本简历集上统计本地提取可以省掉的 LLM 调用比例
+
+    Args:
+        corpus_path: JSONL 样本集（每行 {"id", "text", 可选 "expected_industries"}）
+        threshold: 置信度阈值
+
+    Returns:
+        样本数、跳过 LLM 的数量与比例、已标注样本的行业命中率，以及每份简历的置信度
+    """
+    rows = []
+    with open(corpus_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+
+    avoided, hits, labelled, details = 0, 0, 0, []
+    for row in rows:
+        parsed = extract_resume_locally(row["text"])
+        confident = is_confident(parsed, threshold)
+        avoided += confident
+        expected = row.get("expected_industries")
+        if confident and expected:
+            labelled += 1
+            found = {ind["name"] for ind in parsed["industries"]}
+            hits += set(expected) <= found
+        details.append({"id": row.get("id"), "confidence": parsed["confidence"], "skip_llm": confident,
+                        "industries": [ind["name"] for ind in parsed["industries"]]})
+
+    return {
+        "samples": len(rows),
+        "llm_calls_avoided": avoided,
+        "avoided_pct": round(avoided / len(rows) * 100, 1) if rows else 0.0,
+        "industry_recall_on_skipped": round(hits / labelled * 100, 1) if labelled else None,
+        "details": details,
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("本地简历提取：样本集评估")
+    print("=" * 50)
+    report = evaluate_local_extractor()
+    for item in report.pop("details"):
+        print(item)
+    print(report)
@@ -0,0 +1,219 @@
+"""
+数据哨兵评分引擎
+将7大拐点指标的进度整理为（行业 × 指标）矩阵，按权重向量一次性计算所有行业的加权就绪度
+"""
+
+import random
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional, Sequence
+
+# ==========================================
+# 7大拐点指标定义
+# ==========================================
+SENTINEL_INDICATORS = [
+    {"id": 1, "name": "技术成本下降", "description": "技术成本在2-3年内下降50%以上", "weight": 15},
+    {"id": 2, "name": "龙头盈利", "description": "龙头企业毛利率超过20%，净利润转正", "weight": 15},
+    {"id": 3, "name": "政策明确", "description": "政策文件中明确了财政资金规模和具体补贴标准", "weight": 15},
+    {"id": 4, "name": "渗透率区间", "description": "市场渗透率在5%-30%之间", "weight": 15},
+    {"id": 5, "name": "资本开支", "description": "行业资本开支增速维持30%以上", "weight": 15},
+    {"id": 6, "name": "营收规模", "description": "出现了3家以上年营收超过10亿的企业", "weight": 15},
+    {"id": 7, "name": "产业链配套", "description": "产业链上下游配套开始完善", "weight": 10},
+]
+
+# 指标进度达到该值（0-100）即视为达标
+ACHIEVED_THRESHOLD = 70
+
+# 演示数据中基准分数较高的行业关键词
+HIGH_GROWTH_INDUSTRIES = ["人工智能", "低空经济", "人形机器人", "脑机接口", "量子计算",
+                          "储能", "新能源汽车", "半导体", "氢能源"]
+
+
+def get_default_weights() -> np.ndarray:
+    """返回 SENTINEL_INDICATORS 中定义的默认权重向量"""
+    return np.array([ind["weight"] for ind in SENTINEL_INDICATORS], dtype=float)
+
+
+def _mock_indicator_progress(industry_name: str) -> List[float]:
+    """
+    为特定行业生成模拟的7大指标进度（0-100）
+
+    基于行业名称生成固定种子，确保同一行业数据一致
+    """
+    rng = random.Random(sum(ord(c) for c in industry_name))
+
+    if any(hg in industry_name for hg in HIGH_GROWTH_INDUSTRIES):
+        base_score = rng.uniform(0.6, 0.9)
+    else:
+        base_score = rng.uniform(0.3, 0.7)
+
+    progress = []
+    for indicator in SENTINEL_INDICATORS:
+        # 根据权重和随机因素确定是否达标
+        threshold = 1 - (indicator['weight'] / 100) * base_score
+        status = rng.random() > threshold
+        progress.append(rng.uniform(ACHIEVED_THRESHOLD, 100) if status else rng.uniform(20, ACHIEVED_THRESHOLD))
+
+    return progress
+
+
+@st.cache_data
+def build_progress_matrix(industries: Sequence[str], financial: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    构建（行业 × 7大指标）进度矩阵
+
+    Args:
+        industries: 行业名称序列
+        financial: 财务数据推导的指标进度表（行业名称为索引），有值的单元格覆盖演示数据
+
+    Returns:
+        形状为 (len(industries), 7) 的进度矩阵，取值 0-100
+    """
+    if not industries:
+        return np.zeros((0, len(SENTINEL_INDICATORS)))
+    matrix = np.array([_mock_indicator_progress(name) for name in industries], dtype=float)
+
+    if financial is not None and not financial.empty:
+        real = _align_financial(industries, financial)
+        matrix = np.where(np.isnan(real), matrix, real)
+
+    return matrix
+
+
+def _align_financial(industries: Sequence[str], financial: pd.DataFrame) -> np.ndarray:
+    """将财务指标表按行业和指标顺序对齐为矩阵（缺失为 NaN）"""
+    columns = [ind['name'] for ind in SENTINEL_INDICATORS]
+    return financial.reindex(index=list(industries), columns=columns).to_numpy(dtype=float)
+
+
+def get_financial_coverage(industries: Sequence[str], financial: Optional[pd.DataFrame]) -> np.ndarray:
+    """
+    返回（行业 × 指标）布尔矩阵，标记哪些指标来自真实财务数据
+    """
+    if financial is None or financial.empty or not industries:
+        return np.zeros((len(industries), len(SENTINEL_INDICATORS)), dtype=bool)
+    return ~np.isnan(_align_financial(industries, financial))
+
+
+def compute_readiness_scores(progress_matrix: np.ndarray, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    计算所有行业的加权就绪度
+
+    一次矩阵-向量乘法完成全部行业的评分，权重调整时无需逐个行业重算。
+    进度按部分完成计入（例如进度60即贡献该指标权重的60%）。
+
+    Args:
+        progress_matrix: (行业 × 指标) 进度矩阵，取值 0-100
+        weights: 指标权重向量，默认使用 SENTINEL_INDICATORS 中的权重
+
+    Returns:
+        每个行业的就绪度（0-100）
+    """
+    w = get_default_weights() if weights is None else np.asarray(weights, dtype=float)
+    total = w.sum()
+    if total <= 0:
+        return np.zeros(progress_matrix.shape[0])
+    return np.clip(progress_matrix, 0, 100) @ (w / total)
+
+
+def get_assessment(score: int) -> dict:
+    """根据就绪分数返回评估结果"""
+    if score >= 80:
+        return {
+            "level": "🟢 强烈推荐",
+            "color": "green",
+            "message": "该行业已进入红利交叠期，是最佳入场时机！",
+            "action": "建议果断入场，优先选择头部企业"
+        }
+    elif score >= 60:
+        return {
+            "level": "🟡 值得关注",
+            "color": "orange",
+            "message": "该行业正在快速发展中，多数指标已达标。",
+            "action": "可以开始关注和准备，择机入场"
+        }
+    elif score >= 40:
+        return {
+            "level": "🟠 观察等待",
+            "color": "orange",
+            "message": "该行业尚处于早期阶段，部分指标未达标。",
+            "action": "建议持续关注，等待更明确的信号"
+        }
+    else:
+        return {
+            "level": "🔴 高风险",
+            "color": "red",
+            "message": "该行业尚未进入成长期，存在较大不确定性。",
+            "action": "建议谨慎观望，不宜贸然进入"
+        }
+
+
+def get_sentinel_data(industry_name: str, progress: Sequence[float],
+                      readiness_score: float, from_financials: Optional[Sequence[bool]] = None) -> dict:
+    """
+    组装单个行业的哨兵卡片数据
+
+    Args:
+        industry_name: 行业名称
+        progress: 该行业7大指标进度（进度矩阵中的一行）
+        readiness_score: 该行业的加权就绪度
+        from_financials: 各指标是否来自真实财务数据
+
+    Returns:
+        指标数据字典
+    """
+    if from_financials is None:
+        from_financials = [False] * len(SENTINEL_INDICATORS)
+
+    indicators = []
+    for indicator, value, is_real in zip(SENTINEL_INDICATORS, progress, from_financials):
+        indicators.append({
+            **indicator,
+            "status": bool(value >= ACHIEVED_THRESHOLD),
+            "progress": float(value),
+            "source": "财务数据" if is_real else "演示数据"
+        })
+
+    achieved_count = sum(1 for ind in indicators if ind["status"])
+    readiness_score = int(round(readiness_score))
+
+    return {
+        "industry": industry_name,
+        "indicators": indicators,
+        "readiness_score": readiness_score,
+        "achieved_count": achieved_count,
+        "assessment": get_assessment(readiness_score)
+    }
+
+
+def rank_industries(industries: Sequence[str], progress_matrix: np.ndarray,
+                    weights: Optional[Sequence[float]] = None, top_n: Optional[int] = None) -> pd.DataFrame:
+    """
+    生成就绪度排行榜
+
+    Args:
+        industries: 行业名称序列（与进度矩阵的行对应）
+        progress_matrix: (行业 × 指标) 进度矩阵
+        weights: 指标权重向量
+        top_n: 仅返回前N名，默认返回全部
+
+    Returns:
+        按就绪度降序排列的 DataFrame
+    """
+    scores = compute_readiness_scores(progress_matrix, weights)
+    achieved = (progress_matrix >= ACHIEVED_THRESHOLD).sum(axis=1)
+
+    order = np.argsort(-scores, kind="stable")
+    if top_n is not None:
+        order = order[:top_n]
+
+    names = np.asarray(industries, dtype=object)
+    ranked_scores = scores[order]
+    return pd.DataFrame({
+        "排名": np.arange(1, len(order) + 1),
+        "行业名称": names[order],
+        "就绪度": np.round(ranked_scores, 1),
+        "已达标指标": achieved[order],
+        "评估": [get_assessment(s)["level"] for s in ranked_scores],
+    })
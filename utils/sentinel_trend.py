@@ -0,0 +1,186 @@
+"""
+数据哨兵趋势引擎
+基于已存储的月度就绪度历史，使用前缀和（cumsum）O(n) 滑动窗口一次性计算
+所有追踪行业的滚动均值、斜率、动量及达到入场线的预计月数
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import streamlit as st
+from datetime import date
+from typing import Dict, Optional, Sequence
+
+from utils.data_processor import get_file_version
+
+# 就绪度历史存储（长表：行业名称, 月份(YYYY-MM), 就绪度）
+SENTINEL_HISTORY_PATH = "data/sentinel_history.csv"
+
+HISTORY_COLUMNS = ['行业名称', '月份', '就绪度']
+
+# 推荐入场线
+ENTRY_THRESHOLD = 80
+
+
+def current_month() -> str:
+    """返回当前月份标识（YYYY-MM）"""
+    return date.today().strftime("%Y-%m")
+
+
+def recent_months(n: int, end_month: Optional[str] = None) -> list:
+    """返回截至 end_month（含）的最近 n 个月份标识，按时间升序"""
+    end = pd.Period(end_month or current_month(), freq="M")
+    return [str(p) for p in pd.period_range(end=end, periods=n, freq="M")]
+
+
+def load_readiness_history(path: str = SENTINEL_HISTORY_PATH) -> pd.DataFrame:
+    """
+    加载就绪度历史记录
+
+    Returns:
+        长表 DataFrame；文件不存在时返回空表
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=HISTORY_COLUMNS)
+    df = pd.read_csv(path, encoding='utf-8', dtype={'月份': str})
+    return df.reindex(columns=HISTORY_COLUMNS)
+
+
+def record_readiness_snapshot(industries: Sequence[str], scores: Sequence[float],
+                              month: Optional[str] = None, path: str = SENTINEL_HISTORY_PATH) -> int:
+    """
+    记录本月就绪度快照（同一行业同一月份只记录一次）
+
+    Args:
+        industries: 行业名称序列
+        scores: 与行业对应的就绪度
+        month: 月份标识，默认当前月份
+        path: 历史存储路径
+
+    Returns:
+        新写入的记录数
+    """
+    month = month or current_month()
+    history = load_readiness_history(path)
+    recorded = set(history.loc[history['月份'] == month, '行业名称'])
+
+    snapshot = pd.DataFrame({'行业名称': list(industries), '月份': month,
+                             '就绪度': np.round(np.asarray(scores, dtype=float), 1)})
+    snapshot = snapshot[~snapshot['行业名称'].isin(recorded)]
+    if snapshot.empty:
+        return 0
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_header = not os.path.exists(path)
+    snapshot.to_csv(path, mode='a', header=write_header, index=False, encoding='utf-8')
+    return len(snapshot)
+
+
+def build_history_matrix(history: pd.DataFrame, industries: Sequence[str], months: Sequence[str]) -> np.ndarray:
+    """
+    将长表历史整理为（行业 × 月份）矩阵，缺失月份为 NaN
+    """
+    if history.empty:
+        return np.full((len(industries), len(months)), np.nan)
+    table = history.pivot_table(index='行业名称', columns='月份', values='就绪度', aggfunc='last')
+    return table.reindex(index=list(industries), columns=list(months)).to_numpy(dtype=float)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    沿最后一维计算滑动窗口求和（窗口不足时按已有长度计算）
+
+    前缀和相减，每个窗口 O(1)，整体 O(n)
+    """
+    n_rows, n_cols = values.shape
+    prefix = np.zeros((n_rows, n_cols + 1))
+    np.cumsum(values, axis=1, out=prefix[:, 1:])
+    end = np.arange(1, n_cols + 1)
+    start = np.clip(end - window, 0, None)
+    return prefix[:, end] - prefix[:, start]
+
+
+def compute_trend_metrics(matrix: np.ndarray, window: int = 3,
+                          threshold: float = ENTRY_THRESHOLD) -> Dict[str, np.ndarray]:
+    """
+    批量计算趋势指标（所有行业一次完成）
+
+    Args:
+        matrix: （行业 × 月份）就绪度矩阵，缺失为 NaN
+        window: 滑动窗口长度（月）
+        threshold: 入场线
+
+    Returns:
+        rolling_mean: （行业 × 月份）滚动均值
+        slope: 最近窗口内的线性斜率（分/月）
+        momentum: 最新滚动均值相对一个窗口前的变化
+        latest: 最近一次观测值
+        months_to_threshold: 按当前斜率达到入场线的预计月数（已达到为0，无法达到为 NaN）
+    """
+    n_rows, n_cols = matrix.shape
+    valid = ~np.isnan(matrix)
+    y = np.where(valid, matrix, 0.0)
+    x = np.broadcast_to(np.arange(n_cols, dtype=float), matrix.shape)
+    xv = np.where(valid, x, 0.0)
+
+    count = _rolling_sum(valid.astype(float), window)
+    sum_y = _rolling_sum(y, window)
+    sum_x = _rolling_sum(xv, window)
+    sum_xy = _rolling_sum(xv * y, window)
+    sum_xx = _rolling_sum(xv * xv, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rolling_mean = np.where(count > 0, sum_y / count, np.nan)
+        denom = count * sum_xx - sum_x ** 2
+        slopes = np.where((count >= 2) & (denom > 0), (count * sum_xy - sum_x * sum_y) / denom, np.nan)
+
+    slope = slopes[:, -1] if n_cols else np.full(n_rows, np.nan)
+    if n_cols > window:
+        momentum = rolling_mean[:, -1] - rolling_mean[:, -1 - window]
+    else:
+        momentum = np.full(n_rows, np.nan)
+
+    # 最近一次观测值
+    has_any = valid.any(axis=1)
+    last_idx = n_cols - 1 - np.argmax(valid[:, ::-1], axis=1) if n_cols else np.zeros(n_rows, dtype=int)
+    latest = np.where(has_any, matrix[np.arange(n_rows), last_idx] if n_cols else np.nan, np.nan)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        eta = np.where(slope > 0, (threshold - latest) / slope, np.nan)
+    months_to_threshold = np.where(latest >= threshold, 0.0, eta)
+
+    return {
+        "rolling_mean": rolling_mean,
+        "slope": slope,
+        "momentum": momentum,
+        "latest": latest,
+        "months_to_threshold": months_to_threshold,
+    }
+
+
+@st.cache_data
+def _get_trend_analytics(industries: tuple, months: tuple, window: int, path: str,
+                         data_version: str) -> Dict[str, np.ndarray]:
+    """按历史数据版本缓存的趋势计算"""
+    history = load_readiness_history(path)
+    matrix = build_history_matrix(history, industries, months)
+    return {"scores": matrix, **compute_trend_metrics(matrix, window)}
+
+
+def get_trend_analytics(industries: Sequence[str], n_months: int = 12, window: int = 3,
+                        path: str = SENTINEL_HISTORY_PATH) -> Dict:
+    """
+    获取所有追踪行业的趋势分析结果（按历史文件版本缓存，一次计算全部行业）
+
+    Args:
+        industries: 行业名称序列
+        n_months: 展示的月份数
+        window: 滑动窗口长度（月）
+        path: 历史存储路径
+
+    Returns:
+        包含 months 以及 compute_trend_metrics 各项结果的字典，行顺序与 industries 一致
+    """
+    months = tuple(recent_months(n_months))
+    result = _get_trend_analytics(tuple(industries), months, window, path, get_file_version(path))
+    return {"months": list(months), **result}
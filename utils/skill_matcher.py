@@ -0,0 +1,338 @@
+"""
+技能 × 行业稀疏匹配引擎
+技能分类表（data/skill_taxonomy.csv）给出每项技能的别名与相关行业关键词，据此构建
+行业 × 技能的技能需求矩阵，按列压缩（CSC：data / indices / indptr，仅依赖 numpy）存储；
+候选人的技能先经 Aho-Corasick 自动机归一到分类表中的技能，再与全部行业做一次稀疏点积，
+用 argpartition 取 Top-K，匹配度作为转型排序中技能相近度的一部分
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import get_file_version
+from utils.entity_linker import IndustryEntityLinker
+
+SKILL_TAXONOMY_PATH = "data/skill_taxonomy.csv"
+
+# 技能需求权重：关键词出现在行业名称中为核心技能，仅出现在行业评价中为相关技能
+NAME_MATCH_WEIGHT = 1.0
+COMMENT_MATCH_WEIGHT = 0.5
+
+# 技能分类表与技能自动机缓存（按文件版本）
+TAXONOMY_CACHE_SIZE = 2
+_taxonomy_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_taxonomy_cache_lock = threading.Lock()
+
+
+# ==========================================
+# 技能分类表
+# ==========================================
+def _split_terms(value) -> List[str]:
+    if not isinstance(value, str):
+        return []
+    return [term.strip() for term in value.split("|") if term.strip()]
+
+
+def load_skill_taxonomy(path: str = SKILL_TAXONOMY_PATH) -> Dict:
+    """
+    读取技能分类表并构建技能识别自动机（每个文件版本只构建一次）
+
+    Returns:
+        version: 文件版本
+        skills / categories: 技能名称与类别（按文件顺序）
+        keywords: 每项技能的相关行业关键词列表
+        linker: 把自由文本中的技能说法归一为技能名称的 IndustryEntityLinker
+    """
+    key = (path, get_file_version(path))
+    with _taxonomy_cache_lock:
+        taxonomy = _taxonomy_cache.get(key)
+        if taxonomy is not None:
+            _taxonomy_cache.move_to_end(key)
+            return taxonomy
+
+    try:
+        df = pd.read_csv(path, encoding="utf-8").dropna(subset=["技能"])
+    except (OSError, ValueError):
+        df = pd.DataFrame(columns=["技能", "技能类别", "别名", "相关行业关键词"])
+    skills = df["技能"].astype(str).str.strip().tolist()
+    aliases = {skill: _split_terms(alias) for skill, alias in zip(skills, df["别名"])}
+    taxonomy = {
+        "version": key[1],
+        "skills": skills,
+        "categories": df["技能类别"].fillna("").astype(str).tolist(),
+        "keywords": [_split_terms(value) for value in df["相关行业关键词"]],
+        "linker": IndustryEntityLinker(skills, aliases),
+    }
+
+    with _taxonomy_cache_lock:
+        _taxonomy_cache[key] = taxonomy
+        while len(_taxonomy_cache) > TAXONOMY_CACHE_SIZE:
+            _taxonomy_cache.popitem(last=False)
+    return taxonomy
+
+
+def normalize_skills(skills: Sequence[str], taxonomy: Optional[Dict] = None) -> List[str]:
+    """
+    把简历中的技能说法（"熟练使用Python做数据分析"、"PMP"等）归一为分类表中的技能名称
+
+    Returns:
+        技能名称列表（按首次出现排序、去重），不在分类表中的说法被忽略
+    """
+    taxonomy = taxonomy or load_skill_taxonomy()
+    text = "\n".join(str(s) for s in skills or [] if s)
+    return taxonomy["linker"].link(text) if text else []
+
+
+# ==========================================
+# 技能需求矩阵（CSC）
+# ==========================================
+def csc_from_columns(columns: Sequence[Tuple[np.ndarray, np.ndarray]], n_rows: int) -> Dict:
+    """
+    由逐列的 (行号, 取值) 组装 CSC 稀疏矩阵
+
+    Returns:
+        shape / data（float32）/ indices（int32 行号，列内升序）/ indptr（int64）
+    """
+    lengths = np.array([len(rows) for rows, _ in columns], dtype=np.int64)
+    indptr = np.concatenate(([0], np.cumsum(lengths)))
+    if len(columns):
+        indices = np.concatenate([np.asarray(rows, dtype=np.int32) for rows, _ in columns])
+        data = np.concatenate([np.asarray(values, dtype=np.float32) for _, values in columns])
+    else:
+        indices, data = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    return {"shape": (n_rows, len(columns)), "data": data, "indices": indices, "indptr": indptr}
+
+
+def apply_idf(matrix: Dict) -> Dict:
+    """
+    按技能稀有度加权：idf = ln(1 + 行业数 / 需要该技能的行业数)，
+    "项目管理"这类通用技能的区分度低于"芯片设计"
+    """
+    n_rows = matrix["shape"][0]
+    column_df = np.diff(matrix["indptr"]).astype(float)
+    with np.errstate(divide="ignore"):
+        idf = np.where(column_df > 0, np.log1p(n_rows / np.maximum(column_df, 1)), 0.0)
+    column_of_entry = np.repeat(np.arange(len(column_df)), np.diff(matrix["indptr"]))
+    idf = idf.astype(np.float32)
+    return {**matrix, "idf": idf, "weighted": matrix["data"] * idf[column_of_entry]}
+
+
+def build_skill_matrix(industry_names: Sequence[str], industry_comments: Sequence[str],
+                       taxonomy: Optional[Dict] = None) -> Dict:
+    """
+    构建行业 × 技能需求矩阵
+
+    Args:
+        industry_names: 行业名称（矩阵的行）
+        industry_comments: 行业评价（关键词只出现在评价中时按 COMMENT_MATCH_WEIGHT 计）
+        taxonomy: load_skill_taxonomy 的结果
+
+    Returns:
+        csc_from_columns 的结果，另含 idf、weighted（乘以 idf 后的取值）、skills、categories、version
+    """
+    taxonomy = taxonomy or load_skill_taxonomy()
+    names = pd.Series(list(industry_names), dtype=object).fillna("").astype(str).str.lower()
+    comments = pd.Series(list(industry_comments), dtype=object).fillna("").astype(str).str.lower()
+
+    # 同一关键词常被多项技能共用，每个关键词只在行业表上匹配一次
+    keyword_hits: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    columns = []
+    for keywords in taxonomy["keywords"]:
+        name_hit = np.zeros(len(names), dtype=bool)
+        comment_hit = np.zeros(len(names), dtype=bool)
+        for keyword in keywords:
+            if keyword not in keyword_hits:
+                lowered = keyword.lower()
+                keyword_hits[keyword] = (names.str.contains(lowered, regex=False).to_numpy(),
+                                         comments.str.contains(lowered, regex=False).to_numpy())
+            in_name, in_comment = keyword_hits[keyword]
+            name_hit |= in_name
+            comment_hit |= in_comment
+        rows = np.flatnonzero(name_hit | comment_hit)
+        values = np.where(name_hit[rows], NAME_MATCH_WEIGHT, COMMENT_MATCH_WEIGHT)
+        columns.append((rows, values))
+
+    matrix = apply_idf(csc_from_columns(columns, len(names)))
+    matrix.update(skills=taxonomy["skills"], categories=taxonomy["categories"], version=taxonomy["version"])
+    return matrix
+
+
+def get_skill_matrix(features: Dict, taxonomy: Optional[Dict] = None) -> Dict:
+    """
+    获取行业特征索引对应的技能需求矩阵（首次使用时构建并存入 features["skill_matrix"]，技能分类表更新后重建）
+
+    Args:
+        features: transition_ranker.get_transition_features 的结果
+        taxonomy: load_skill_taxonomy 的结果
+    """
+    taxonomy = taxonomy or load_skill_taxonomy()
+    matrix = features.get("skill_matrix")
+    if matrix is None or matrix["version"] != taxonomy["version"]:
+        matrix = build_skill_matrix(features["names"], features["comments"], taxonomy)
+        features["skill_matrix"] = matrix
+    return matrix
+
+
+# ==========================================
+# 匹配与 Top-K
+# ==========================================
+def sparse_match(matrix: Dict, skill_ids: Sequence[int], skill_weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    候选技能向量与全部行业的一次稀疏点积
+
+    只取出候选技能对应的列（CSC 的列切片是连续内存），用 np.bincount 按行号累加；
+    除一次长度为行业数的累加数组外，只访问这些列的非零元
+
+    Returns:
+        每个行业的匹配度（0-100）：行业需要的候选技能占候选技能总量（按 idf 加权）的比例
+    """
+    n_rows = matrix["shape"][0]
+    skill_ids = np.asarray(skill_ids, dtype=np.int64)
+    if not len(skill_ids) or n_rows == 0:
+        return np.zeros(n_rows)
+    weights = np.ones(len(skill_ids)) if skill_weights is None else np.asarray(skill_weights, dtype=float)
+
+    indptr = matrix["indptr"]
+    starts, ends = indptr[skill_ids], indptr[skill_ids + 1]
+    lengths = ends - starts
+    # 把各列的 [start, end) 区间展开为一个下标数组，避免逐列循环
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    positions = np.arange(lengths.sum()) + offsets
+    entry_weight = np.repeat(weights, lengths)
+
+    scores = np.bincount(matrix["indices"][positions], weights=matrix["weighted"][positions] * entry_weight,
+                         minlength=n_rows)
+    total = float(np.dot(matrix["idf"][skill_ids], weights))
+    return scores / total * 100 if total > 0 else np.zeros(n_rows)
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """argpartition 取得分最高的 k 行，再只对这 k 行排序"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def matched_skills_for_row(matrix: Dict, skill_ids: Sequence[int], row: int) -> List[str]:
+    """行业 row 需要的候选技能（列内行号升序存储，用二分查找判断）"""
+    indptr, indices = matrix["indptr"], matrix["indices"]
+    matched = []
+    for skill_id in skill_ids:
+        column = indices[indptr[skill_id]:indptr[skill_id + 1]]
+        position = np.searchsorted(column, row)
+        if position < len(column) and column[position] == row:
+            matched.append(matrix["skills"][skill_id])
+    return matched
+
+
+def compute_skill_match(features: Dict, skills: Optional[Sequence[str]]) -> Tuple[np.ndarray, List[int]]:
+    """
+    计算候选技能与行业表每一行的匹配度
+
+    Args:
+        features: transition_ranker.get_transition_features 的结果
+        skills: 简历中的技能说法
+
+    Returns:
+        (每行匹配度 0-100, 识别出的技能编号)；没有可识别技能时匹配度全为 0
+    """
+    taxonomy = load_skill_taxonomy()
+    matrix = get_skill_matrix(features, taxonomy)
+    skill_index = {skill: i for i, skill in enumerate(matrix["skills"])}
+    skill_ids = [skill_index[s] for s in normalize_skills(skills or [], taxonomy) if s in skill_index]
+    return sparse_match(matrix, skill_ids), skill_ids
+
+
+def match_industries_by_skills(df: pd.DataFrame, skills: Sequence[str], top_k: int = 10,
+                               data_version: str = "") -> pd.DataFrame:
+    """
+    按技能匹配度返回最契合的 Top-K 行业
+
+    Returns:
+        DataFrame：行业名称、当前周期阶段、未来1-3年景气度、技能匹配度、匹配技能
+    """
+    from utils.transition_ranker import get_transition_features
+
+    features = get_transition_features(df, data_version)
+    scores, skill_ids = compute_skill_match(features, skills)
+    if not skill_ids:
+        return pd.DataFrame(columns=['行业名称', '当前周期阶段', '未来1-3年景气度', '技能匹配度', '匹配技能'])
+    # 行业表中有同名行，多取一些再按名称去重
+    top = top_k_rows(scores, top_k * 2)
+    top = top[scores[top] > 0]
+    top = top[~pd.Series(features["names"][top]).duplicated().to_numpy()][:top_k]
+    matrix = features["skill_matrix"]
+    return pd.DataFrame({
+        '行业名称': features["names"][top],
+        '当前周期阶段': features["stages"][top],
+        '未来1-3年景气度': features["sentiments"][top],
+        '技能匹配度': np.round(scores[top], 1),
+        '匹配技能': [matched_skills_for_row(matrix, skill_ids, row) for row in top],
+    })
+
+
+# ==========================================
+# 基准测试
+# ==========================================
+def benchmark_skill_matcher(n_industries: int = 50_000, n_skills: int = 10_000, skills_per_industry: int = 20,
+                            query_skills: int = 12, top_k: int = 10, repeat: int = 50,
+                            seed: int = 0) -> Dict[str, float]:
+    """
+    大规模基准：随机生成 n_industries × n_skills 的需求矩阵（技能热度服从 Zipf 分布），
+    测量构建耗时、内存占用（并与稠密 float32 存储对比）与单次匹配 + Top-K 耗时
+    """
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, n_skills + 1) ** 0.8
+    popularity /= popularity.sum()
+
+    t0 = time.perf_counter()
+    nnz = n_industries * skills_per_industry
+    entry_skill = rng.choice(n_skills, size=nnz, p=popularity)
+    entry_row = np.repeat(np.arange(n_industries), skills_per_industry)
+    # 同一行业的重复技能只保留一次，再按 (技能, 行号) 排序得到 CSC
+    pairs = np.unique(entry_skill.astype(np.int64) * n_industries + entry_row)
+    skill_of, row_of = np.divmod(pairs, n_industries)
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(skill_of, minlength=n_skills))))
+    values = np.where(rng.random(len(pairs)) < 0.7, NAME_MATCH_WEIGHT, COMMENT_MATCH_WEIGHT).astype(np.float32)
+    matrix = apply_idf({"shape": (n_industries, n_skills), "data": values,
+                        "indices": row_of.astype(np.int32), "indptr": indptr})
+    build_s = time.perf_counter() - t0
+
+    queries = [rng.choice(n_skills, size=query_skills, replace=False, p=popularity) for _ in range(repeat)]
+    t0 = time.perf_counter()
+    for skill_ids in queries:
+        top_k_rows(sparse_match(matrix, skill_ids), top_k)
+    sparse_ms = (time.perf_counter() - t0) / repeat * 1000
+
+    memory_mb = sum(matrix[k].nbytes for k in ("data", "indices", "indptr", "weighted", "idf")) / 1024 ** 2
+    dense_mb = n_industries * n_skills * 4 / 1024 ** 2
+    return {
+        "industries": n_industries,
+        "skills": n_skills,
+        "nnz": int(len(values)),
+        "build_s": round(build_s, 2),
+        "sparse_memory_mb": round(memory_mb, 1),
+        "dense_memory_mb": round(dense_mb, 1),
+        "match_topk_ms": round(sparse_ms, 3),
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("技能 × 行业稀疏匹配")
+    print("=" * 50)
+    from utils.data_processor import load_industry_data
+    from utils.resume_analyzer import DEFAULT_KB_PATH
+
+    df = load_industry_data(DEFAULT_KB_PATH)
+    example_skills = ["项目管理", "AutoCAD", "结构设计", "成本控制", "储能系统集成"]
+    print("识别技能：", normalize_skills(example_skills))
+    print(match_industries_by_skills(df, example_skills, data_version=get_file_version(DEFAULT_KB_PATH)))
+    print(benchmark_skill_matcher())
@@ -0,0 +1,418 @@
+"""
+职业轨迹推演引擎
+按周期阶段与景气度参数化生成职业价值指数曲线（NumPy 数组），
+支持一次计算“留下”与 N 个候选转型行业的全部轨迹，并向量化检测交叉点
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 所有轨迹的起点职业价值指数
+BASE_SCORE = 50
+
+# ==========================================
+# 轨迹参数
+# ==========================================
+# 留在当前行业：起点 + 年增幅 × 年数
+STAY_SLOPES = {
+    "成长期": 12,
+    "初创期": 12,
+    "成熟期": 5,
+}
+DEFAULT_STAY_SLOPE = -5
+
+# 转型目标行业：第1年为适应期取值，之后按年增幅增长
+MOVE_PARAMS = {
+    "成长期": {"first_year": 45, "slope": 15},
+    "初创期": {"first_year": 50, "slope": 10},
+}
+DEFAULT_MOVE_PARAMS = {"first_year": 50, "slope": 5}
+
+# 未来1-3年景气度对年增幅的修正系数（按关键词匹配，未匹配为1.0）
+SENTIMENT_FACTORS = {
+    "高成长": 1.2,
+    "温和增长": 1.0,
+    "平稳": 1.0,
+    "震荡": 0.9,
+    "承压": 0.8,
+}
+
+
+def get_sentiment_factor(sentiment: Optional[str]) -> float:
+    """根据景气度描述返回年增幅修正系数"""
+    if not isinstance(sentiment, str) or not sentiment:
+        return 1.0
+    for keyword, factor in SENTIMENT_FACTORS.items():
+        if keyword in sentiment:
+            return factor
+    return 1.0
+
+
+def _map_unique(values: Sequence, func) -> np.ndarray:
+    """对序列中的每个不同取值只调用一次 func，再按编码展开（行业表中阶段、景气度取值很少）"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    return np.array([func(u) for u in uniques], dtype=float)[codes]
+
+
+def _sentiment_factors(sentiments: Optional[Sequence[Optional[str]]], n: int) -> np.ndarray:
+    """将景气度序列转换为修正系数向量"""
+    if sentiments is None:
+        return np.ones(n)
+    return _map_unique(sentiments, get_sentiment_factor)
+
+
+# ==========================================
+# 批量轨迹计算
+# ==========================================
+def stay_curves(stages: Sequence[str], years: int,
+                sentiments: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+    """
+    计算留在各行业的职业价值轨迹
+
+    Args:
+        stages: 各行业的当前周期阶段
+        years: 推演年数（轨迹包含第0年，共 years+1 个点）
+        sentiments: 各行业的未来1-3年景气度，用于修正年增幅
+
+    Returns:
+        形状为 (len(stages), years+1) 的轨迹矩阵
+    """
+    slopes = _map_unique(stages, lambda s: STAY_SLOPES.get(s, DEFAULT_STAY_SLOPE))
+    slopes *= _sentiment_factors(sentiments, len(stages))
+    offsets = np.arange(years + 1, dtype=float)
+    return BASE_SCORE + slopes[:, None] * offsets
+
+
+def move_curves(stages: Sequence[str], years: int,
+                sentiments: Optional[Sequence[Optional[str]]] = None) -> np.ndarray:
+    """
+    计算转型到各目标行业的职业价值轨迹
+
+    第0年为转型起点，第1年为适应期，之后按该阶段的年增幅增长。
+
+    Args:
+        stages: 各目标行业的当前周期阶段
+        years: 推演年数
+        sentiments: 各目标行业的未来1-3年景气度，用于修正年增幅
+
+    Returns:
+        形状为 (len(stages), years+1) 的轨迹矩阵
+    """
+    first_year, slopes = get_move_params(stages, sentiments)
+    return move_curves_from_params(first_year, slopes, years)
+
+
+def get_move_params(stages: Sequence[str],
+                    sentiments: Optional[Sequence[Optional[str]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    获取各目标行业转型轨迹的参数
+
+    Returns:
+        (第1年取值, 经景气度修正后的年增幅)，均为长度 len(stages) 的数组
+    """
+    first_year = _map_unique(stages, lambda s: MOVE_PARAMS.get(s, DEFAULT_MOVE_PARAMS)["first_year"])
+    slopes = _map_unique(stages, lambda s: MOVE_PARAMS.get(s, DEFAULT_MOVE_PARAMS)["slope"])
+    return first_year, slopes * _sentiment_factors(sentiments, len(stages))
+
+
+def move_curves_from_params(first_year: np.ndarray, slopes: np.ndarray, years: int) -> np.ndarray:
+    """由 get_move_params 的参数生成转型轨迹矩阵（参数可预先计算并复用）"""
+    offsets = np.arange(years + 1, dtype=float)
+    curves = first_year[:, None] + slopes[:, None] * (offsets - 1)
+    curves[:, 0] = BASE_SCORE
+    return curves
+
+
+def detect_crossovers(stay: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    向量化检测转型轨迹超过留下轨迹的交叉点
+
+    Args:
+        stay: 留下轨迹，形状 (T,)
+        targets: 转型轨迹矩阵，形状 (N, T)
+
+    Returns:
+        形状 (N, T) 的布尔矩阵，True 表示该年转型轨迹由不高于变为高于留下轨迹
+    """
+    above = targets > stay[None, :]
+    crossings = np.zeros_like(above)
+    crossings[:, 1:] = above[:, 1:] & ~above[:, :-1]
+    return crossings
+
+
+def compare_trajectories(stay_stage: str, target_stages: Sequence[str], years: int,
+                         stay_sentiment: Optional[str] = None,
+                         target_sentiments: Optional[Sequence[Optional[str]]] = None) -> Dict[str, np.ndarray]:
+    """
+    一次计算“留下”与 N 个候选转型行业的全部轨迹
+
+    Args:
+        stay_stage: 当前行业的周期阶段
+        target_stages: 候选目标行业的周期阶段
+        years: 推演年数
+        stay_sentiment: 当前行业的景气度
+        target_sentiments: 候选目标行业的景气度
+
+    Returns:
+        offsets: 年份偏移 (T,)
+        stay: 留下轨迹 (T,)
+        targets: 转型轨迹矩阵 (N, T)
+        crossovers: 交叉点布尔矩阵 (N, T)
+        first_crossover: 每个目标首次超过留下轨迹的年份偏移，未超过为 -1
+        final_gap: 推演期末转型相对留下的差值 (N,)
+    """
+    stay = stay_curves([stay_stage], years, [stay_sentiment])[0]
+    targets = move_curves(target_stages, years, target_sentiments)
+    crossovers = detect_crossovers(stay, targets)
+    first_crossover = np.where(crossovers.any(axis=1), crossovers.argmax(axis=1), -1)
+
+    return {
+        "offsets": np.arange(years + 1),
+        "stay": stay,
+        "targets": targets,
+        "crossovers": crossovers,
+        "first_crossover": first_crossover,
+        "final_gap": targets[:, -1] - stay[-1],
+    }
+
+
+# ==========================================
+# 单行业推演曲线
+# ==========================================
+def backtrack_curve(stage: str, years: int) -> Optional[np.ndarray]:
+    """
+    历史回溯：假设 years 年前进入该阶段行业后的职业价值轨迹
+
+    Args:
+        stage: 行业周期阶段
+        years: 回溯年数
+
+    Returns:
+        长度 years+1 的轨迹；无法推演的阶段返回 None
+    """
+    i = np.arange(years + 1, dtype=float)
+    if stage == "成长期":
+        # 加速增长
+        return np.minimum(BASE_SCORE + i * 15 + i * i * 2, 100)
+    if stage == "初创期":
+        # 前两年积累，之后快速增长
+        return np.minimum(np.where(i < 2, BASE_SCORE + i * 5, BASE_SCORE + 10 + (i - 2) * 20), 100)
+    if stage in ("成熟期", "调整期"):
+        # 平缓增长，存在天花板
+        return np.minimum(BASE_SCORE + i * 5, 80)
+    return None
+
+
+def backtrack_labels(years: int) -> List[str]:
+    """历史回溯轨迹各点的标签"""
+    return ["入职" if i == 0 else "当前" if i == years else f"第{i}年" for i in range(years + 1)]
+
+
+def transition_curve(target_stage: str, years: int) -> np.ndarray:
+    """
+    未来推演：现在转型到目标行业后的职业价值轨迹
+
+    转型起点下降，第1年为适应期，期末取值取决于目标行业是否处于成长期。
+
+    Args:
+        target_stage: 目标行业周期阶段
+        years: 推演年数
+
+    Returns:
+        长度 years+1 的轨迹
+    """
+    i = np.arange(years + 1, dtype=float)
+    curve = BASE_SCORE + i * 10
+    curve[0] = 40
+    if years >= 1:
+        curve[1] = 50
+    if years >= 2:
+        curve[-1] = 70 if target_stage == "成长期" else 55
+    return np.minimum(curve, 100)
+
+
+def transition_labels(years: int) -> List[str]:
+    """未来推演轨迹各点的标签"""
+    labels = []
+    for i in range(years + 1):
+        if i == 0:
+            labels.append("转型起点")
+        elif i == 1:
+            labels.append("适应期")
+        elif i == years:
+            labels.append(f"{years}年后")
+        else:
+            labels.append(f"第{i}年")
+    return labels
+
+
+# ==========================================
+# 历史回放
+# ==========================================
+# 行业指数相对沪深300每跑赢1个百分点，职业价值指数变化的分值
+REPLAY_SENSITIVITY = 0.5
+
+
+def replay_curve(relative_returns: Sequence[float], sensitivity: float = REPLAY_SENSITIVITY) -> np.ndarray:
+    """
+    历史回放：由行业指数相对沪深300的逐年累计超额收益推导职业价值轨迹
+
+    Args:
+        relative_returns: 自入行起逐年的累计相对收益（%），第0个元素为0
+        sensitivity: 每1个百分点超额收益对应的职业价值变化
+
+    Returns:
+        与 relative_returns 等长的轨迹，取值 0-100
+    """
+    return np.clip(BASE_SCORE + sensitivity * np.asarray(relative_returns, dtype=float), 0, 100)
+
+
+# ==========================================
+# 蒙特卡洛职业结果模拟
+# ==========================================
+# 各周期阶段的年均变化（drift）与年波动（volatility），单位为职业价值指数
+STAGE_MC_PARAMS = {
+    "初创期": {"drift": 10, "volatility": 15},   # 高风险高回报：可能快速晋升或原地踏步
+    "成长期": {"drift": 12, "volatility": 6},
+    "成熟期": {"drift": 5, "volatility": 4},
+    "调整期": {"drift": -3, "volatility": 8},
+    "衰退期": {"drift": -8, "volatility": 10},
+}
+DEFAULT_MC_PARAMS = {"drift": 2, "volatility": 7}
+
+# 周期组合类型对年均变化的修正（加减）与对波动的放大系数
+COMBINATION_MC_ADJUSTMENTS = {
+    "高风险押宝期": {"drift_shift": 0, "volatility_factor": 1.5},
+    "红利交叠期": {"drift_shift": 2, "volatility_factor": 0.8},
+    "红利退坡期": {"drift_shift": -1, "volatility_factor": 1.0},
+    "红利消失期": {"drift_shift": -3, "volatility_factor": 1.3},
+}
+
+# 转型第1年的适应期：均值下降、波动放大
+ADAPTATION_DRIFT = -5
+ADAPTATION_VOLATILITY_FACTOR = 1.5
+
+DEFAULT_N_PATHS = 20_000
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def get_mc_params(stage: str, combination: Optional[str] = None) -> Dict[str, float]:
+    """
+    获取某周期阶段（及周期组合）下的年均变化与年波动
+
+    Args:
+        stage: 周期阶段
+        combination: 周期组合名称（如“红利交叠期”）
+
+    Returns:
+        包含 drift、volatility 的字典
+    """
+    params = STAGE_MC_PARAMS.get(stage, DEFAULT_MC_PARAMS)
+    adjustment = COMBINATION_MC_ADJUSTMENTS.get(combination, {"drift_shift": 0, "volatility_factor": 1.0})
+    return {
+        "drift": params["drift"] + adjustment["drift_shift"],
+        "volatility": params["volatility"] * adjustment["volatility_factor"],
+    }
+
+
+def simulate_career_paths(stages: Sequence[str], years: int, n_paths: int = DEFAULT_N_PATHS,
+                          combinations: Optional[Sequence[Optional[str]]] = None,
+                          transition: Optional[Sequence[bool]] = None,
+                          seed: Optional[int] = 42) -> np.ndarray:
+    """
+    向量化模拟多个情景的职业价值路径
+
+    每年的变化服从以该情景年均变化为均值、年波动为标准差的正态分布，
+    按年累加得到路径；与其他轨迹一致，职业价值指数限制在 0-100。
+
+    Args:
+        stages: 各情景的周期阶段
+        years: 模拟年数（路径包含第0年，共 years+1 个点）
+        n_paths: 每个情景的路径数
+        combinations: 各情景的周期组合名称
+        transition: 各情景第1年是否为转型适应期
+        seed: 随机种子（相同种子结果可复现）
+
+    Returns:
+        形状为 (len(stages), n_paths, years+1) 的路径数组，取值 0-100
+    """
+    n_scenarios = len(stages)
+    if combinations is None:
+        combinations = [None] * n_scenarios
+    params = [get_mc_params(s, c) for s, c in zip(stages, combinations)]
+
+    # (情景 × 年) 的均值与标准差
+    drift = np.repeat(np.array([p["drift"] for p in params], dtype=float)[:, None], years, axis=1)
+    volatility = np.repeat(np.array([p["volatility"] for p in params], dtype=float)[:, None], years, axis=1)
+    if transition is not None and years >= 1:
+        moving = np.asarray(transition, dtype=bool)
+        drift[moving, 0] = ADAPTATION_DRIFT
+        volatility[moving, 0] *= ADAPTATION_VOLATILITY_FACTOR
+
+    rng = np.random.default_rng(seed)
+    steps = rng.standard_normal((n_scenarios, n_paths, years))
+    steps *= volatility[:, None, :]
+    steps += drift[:, None, :]
+
+    paths = np.empty((n_scenarios, n_paths, years + 1))
+    paths[:, :, 0] = BASE_SCORE
+    np.cumsum(steps, axis=2, out=paths[:, :, 1:])
+    paths[:, :, 1:] += BASE_SCORE
+    np.clip(paths, 0, 100, out=paths)
+    return paths
+
+
+def compute_outcome_bands(paths: np.ndarray,
+                          percentiles: Sequence[int] = DEFAULT_PERCENTILES) -> Dict[str, np.ndarray]:
+    """
+    计算模拟路径的分位数区间
+
+    Args:
+        paths: simulate_career_paths 的输出 (情景 × 路径 × 年)
+        percentiles: 分位数
+
+    Returns:
+        P10/P50/P90 等分位数矩阵 (情景 × 年)，以及 below_start（期末低于起点的概率，每个情景一个值）
+    """
+    values = np.percentile(paths, percentiles, axis=1)
+    bands = {f"P{p}": values[i] for i, p in enumerate(percentiles)}
+    bands["below_start"] = (paths[:, :, -1] < BASE_SCORE).mean(axis=1)
+    return bands
+
+
+def simulate_outcome_bands(stages: Sequence[str], years: int, n_paths: int = DEFAULT_N_PATHS,
+                           combinations: Optional[Sequence[Optional[str]]] = None,
+                           transition: Optional[Sequence[bool]] = None,
+                           seed: Optional[int] = 42) -> Dict[str, np.ndarray]:
+    """模拟多个情景并直接返回分位数区间（见 simulate_career_paths / compute_outcome_bands）"""
+    paths = simulate_career_paths(stages, years, n_paths, combinations, transition, seed)
+    return compute_outcome_bands(paths)
+
+
+def benchmark_monte_carlo(n_paths: int = 100_000, years: int = 10, repeat: int = 5) -> Dict[str, float]:
+    """
+    蒙特卡洛模拟基准测试（单个情景，含分位数计算）
+
+    Returns:
+        路径数、年数与平均耗时（ms）
+    """
+    import time
+
+    simulate_outcome_bands(["成长期"], years, n_paths)  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        simulate_outcome_bands(["成长期"], years, n_paths)
+    elapsed_ms = (time.perf_counter() - start) / repeat * 1000
+    return {"路径数": n_paths, "年数": years, "耗时(ms)": round(elapsed_ms, 1)}
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("蒙特卡洛职业结果模拟基准测试")
+    print("=" * 50)
+    print(benchmark_monte_carlo())
+    bands = simulate_outcome_bands(["成长期", "初创期", "成熟期"], 5, transition=[False, True, False])
+    for name in ("P10", "P50", "P90"):
+        print(name, np.round(bands[name][:, -1], 1))
+    print("期末低于起点概率", np.round(bands["below_start"], 3))
@@ -0,0 +1,642 @@
+"""
+最佳转型方向排序引擎
+针对用户画像（当前行业、工作年限、风险偏好）对行业表中的每一行打分，
+一次向量化计算周期评分、周期组合、推演交叉年份与技能相近度，并用 argpartition 取 Top-K
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence
+
+from utils.data_processor import compute_cycle_scores
+from utils.entity_linker import INDUSTRY_ALIASES
+from utils.trajectory_engine import (
+    detect_crossovers,
+    get_move_params,
+    move_curves_from_params,
+    stay_curves
+)
+
+# ==========================================
+# 评分参数
+# ==========================================
+RISK_PREFERENCES = ["稳健", "平衡", "激进"]
+
+# 产业周期阶段对应的默认周期组合（与 IndustryRAGEngine.get_cycle_combination 的默认映射一致）
+STAGE_COMBINATIONS = {
+    "初创期": "高风险押宝期",
+    "成长期": "红利交叠期",
+    "成熟期": "红利退坡期",
+    "调整期": "红利消失期",
+    "衰退期": "红利消失期",
+}
+UNKNOWN_COMBINATION = "未知组合"
+COMBINATION_NAMES = ["红利交叠期", "红利退坡期", "高风险押宝期", "红利消失期", UNKNOWN_COMBINATION]
+
+# 不同风险偏好下各周期组合的得分（0-100）
+COMBINATION_SCORES = {
+    "稳健": {"红利交叠期": 90, "红利退坡期": 60, "高风险押宝期": 20, "红利消失期": 0, UNKNOWN_COMBINATION: 40},
+    "平衡": {"红利交叠期": 100, "红利退坡期": 40, "高风险押宝期": 50, "红利消失期": 0, UNKNOWN_COMBINATION: 35},
+    "激进": {"红利交叠期": 90, "红利退坡期": 20, "高风险押宝期": 100, "红利消失期": 0, UNKNOWN_COMBINATION: 30},
+}
+
+# 综合得分权重（技能相近度权重随工作年限增加，其余权重按比例缩放）
+BASE_WEIGHTS = {"周期评分": 0.3, "组合类型": 0.25, "交叉年份": 0.25}
+SKILL_WEIGHT_MIN = 0.1
+SKILL_WEIGHT_PER_YEAR = 0.02
+SKILL_WEIGHT_MAX_YEARS = 10
+
+# 识别出技能分类表中的技能时，技能相近度中技能匹配度所占的比例（其余为行业名称相近度）
+SKILL_MATCH_SHARE = 0.5
+
+# 默认推演年数
+DEFAULT_HORIZON = 5
+
+# 传统行业经验可迁移的方向（用于扩展技能相近度的查询词）
+SKILL_MAPPINGS = {
+    "房地产": ["智慧城市", "养老产业", "物业管理", "房地产科技"],
+    "建筑": ["光伏基建", "储能", "虚拟电厂", "智能建造"],
+    "传统制造": ["智能制造", "工业机器人", "新能源装备", "半导体设备"],
+    "教培": ["职业教育", "企业培训", "知识付费", "教育科技"],
+    "互联网": ["人工智能", "SaaS", "产业互联网", "云计算"],
+    "金融": ["金融科技", "绿色金融", "数字人民币", "区块链金融"],
+    "传媒": ["短视频", "直播电商", "AIGC内容", "数字营销"],
+    "能源": ["新能源", "储能", "氢能", "碳中和"],
+    "零售": ["电商", "直播带货", "跨境电商", "新零售"],
+    "医疗": ["生物医药", "医疗器械", "数字医疗", "AI医疗"]
+}
+
+
+# 行业大类的识别别名（SKILL_MAPPINGS 的键 -> 可能出现在行业名称中的说法）
+SECTOR_ALIASES = {
+    sector: list(dict.fromkeys([sector] + INDUSTRY_ALIASES.get(sector, [])))
+    for sector in SKILL_MAPPINGS
+}
+SECTOR_ALIASES["传统制造"] += INDUSTRY_ALIASES["制造业"]
+SECTOR_ALIASES["教培"] += INDUSTRY_ALIASES["教育"]
+
+# 风险预警中推荐的转型方向只取这些阶段的行业
+RECOMMENDABLE_STAGES = ("成长期", "初创期")
+
+
+# ==========================================
+# 行业特征索引（按数据版本缓存）
+# ==========================================
+# 与画像无关的逐行特征只在数据版本变化时计算一次，排序时只做向量运算
+FEATURE_CACHE_SIZE = 4
+_feature_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_feature_cache_lock = threading.Lock()
+
+# 每份特征中按查询字符串缓存行号的条目上限（查询字符串来自用户输入，数量不受控）
+QUERY_CACHE_SIZE = 4096
+
+_MISSING = object()
+
+
+class _LRUCache:
+    """带锁的定长 LRU 缓存（与 _feature_cache 相同的 OrderedDict 淘汰方式），多线程共用同一份特征时使用"""
+
+    def __init__(self, maxsize: int = QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def _char_bigrams(text: str) -> List[str]:
+    """提取文本的字符二元组（单字文本返回其本身）"""
+    text = str(text).strip().lower()
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def build_transition_features(df: pd.DataFrame) -> Dict:
+    """
+    构建行业表的逐行特征
+
+    Args:
+        df: 行业数据DataFrame
+
+    Returns:
+        names / stages / sentiments: 原始列
+        cycle_score: 产业周期评分与政策周期评分的均值
+        combination / combination_code: 周期组合名称及其在 COMBINATION_NAMES 中的序号
+        move_first_year / move_slope: 转型轨迹参数（与画像无关，可预先计算）
+        vocab / indptr / indices / doc_norm: 行业名称二元组的 CSR 稀疏索引（每行一个文档）
+        lookup_cache: 当前行业名称到行号的查找缓存（定长 LRU）
+        search_cache: 行业名称到行号的检索缓存（定长 LRU，与 search_industry 的匹配顺序一致，见 lookup_industry_rows）
+        transition_table: 转型方向预计算表（首次使用时由 get_transition_table 构建）
+        industry_risk: 逐行行业风险分（首次使用时由 exposure_engine.score_exposure_batch 填入）
+        skill_matrix: 行业 × 技能需求矩阵（首次使用时由 skill_matcher.get_skill_matrix 构建）
+    """
+    names = df['行业名称'].astype(str).to_numpy()
+    stages = df['当前周期阶段'].astype(str).to_numpy()
+    sentiments = df['未来1-3年景气度'].astype(str).to_numpy()
+    comments = df['评价'].astype(str).to_numpy() if '评价' in df.columns else np.full(len(df), "", dtype=object)
+
+    scores = compute_cycle_scores(df)
+    cycle_score = ((scores['产业周期评分'] + scores['政策周期评分']) / 2).to_numpy(dtype=float)
+    combination = pd.Series(stages).map(STAGE_COMBINATIONS).fillna(UNKNOWN_COMBINATION).to_numpy()
+    combination_code = pd.Categorical(combination, categories=COMBINATION_NAMES).codes.astype(np.int64)
+    move_first_year, move_slope = get_move_params(stages, sentiments)
+
+    # 名称二元组去重后编码为 CSR（indptr/indices），查询时用 np.add.reduceat 按行累加命中数
+    vocab: Dict[str, int] = {}
+    indices: List[int] = []
+    indptr = [0]
+    for name in names:
+        for gram in dict.fromkeys(_char_bigrams(name)):
+            indices.append(vocab.setdefault(gram, len(vocab)))
+        indptr.append(len(indices))
+    indptr = np.asarray(indptr, dtype=np.int64)
+
+    return {
+        "names": names,
+        "stages": stages,
+        "sentiments": sentiments,
+        "comments": comments,
+        "cycle_score": cycle_score,
+        "combination": combination,
+        "combination_code": combination_code,
+        "move_first_year": move_first_year,
+        "move_slope": move_slope,
+        "vocab": vocab,
+        "indptr": indptr,
+        "indices": np.asarray(indices, dtype=np.int64),
+        "doc_norm": np.sqrt(np.diff(indptr)).astype(float),
+        "lookup_cache": _LRUCache(),
+        "search_cache": _LRUCache(),
+        "transition_table": None,
+        "industry_risk": None,
+        "skill_matrix": None,
+    }
+
+
+def get_transition_features(df: pd.DataFrame, data_version: str = "") -> Dict:
+    """
+    获取（并按数据版本缓存）行业特征索引
+
+    Args:
+        df: 行业数据DataFrame
+        data_version: 数据版本（如 get_file_version 的结果）；为空时使用数据内容指纹
+
+    Returns:
+        build_transition_features 的结果：逐行特征数组只读；查询缓存（lookup_cache / search_cache）
+        与首次使用时填入的惰性字段（transition_table、industry_risk、skill_matrix）会被更新
+    """
+    if not data_version:
+        from utils.visualization import get_data_fingerprint
+        data_version = get_data_fingerprint(df, ['行业名称', '当前周期阶段', '未来1-3年景气度'])
+    key = (data_version, len(df))
+
+    with _feature_cache_lock:
+        features = _feature_cache.get(key)
+        if features is not None:
+            _feature_cache.move_to_end(key)
+            return features
+
+    features = build_transition_features(df)
+
+    with _feature_cache_lock:
+        _feature_cache[key] = features
+        while len(_feature_cache) > FEATURE_CACHE_SIZE:
+            _feature_cache.popitem(last=False)
+    return features
+
+
+# ==========================================
+# 转型方向预计算表
+# ==========================================
+# 行业大类 -> 可迁移方向的每一对都在数据版本变化时解析一次（匹配到的行、阶段、景气度），
+# 查询时只需字典查找加一次排序，不再对每个方向做全表检索
+_transition_table_lock = threading.Lock()
+
+
+def _match_keyword_row(names: np.ndarray, lowered: pd.Series, keyword: str) -> Optional[int]:
+    """按 IndustryRAGEngine.search_industry 的顺序（精确 → 包含 → 中文关键词）匹配一行"""
+    matches = np.flatnonzero(lowered.to_numpy() == keyword.lower())
+    if not len(matches):
+        matches = np.flatnonzero(lowered.str.contains(keyword.lower(), regex=False).to_numpy())
+    if not len(matches):
+        for part in re.findall(r'[\u4e00-\u9fff]{2,}', keyword):
+            matches = np.flatnonzero(lowered.str.contains(part, regex=False).to_numpy())
+            if len(matches):
+                break
+    return int(matches[0]) if len(matches) else None
+
+
+def lookup_industry_rows(features: Dict, industries: Sequence[str]) -> np.ndarray:
+    """
+    批量查找行业名称所在行号（精确 → 包含 → 中文关键词，与 search_industry 的首个结果一致）
+
+    Args:
+        features: get_transition_features 的结果
+        industries: 行业名称序列
+
+    Returns:
+        行号数组，找不到的行业为 -1；每个不同的名称只检索一次并缓存在 features 中
+    """
+    search_cache = features["search_cache"]
+    uniques, codes = np.unique(np.asarray(industries, dtype=object).astype(str), return_inverse=True)
+    found = {name: search_cache.get(name) for name in uniques}
+    missing = [name for name, row in found.items() if row is None]
+    if missing:
+        lowered = pd.Series(features["names"]).str.lower()
+        for name in missing:
+            row = _match_keyword_row(features["names"], lowered, name) if name.strip() else None
+            found[name] = -1 if row is None else row
+            search_cache.put(name, found[name])
+    rows = np.array([found[name] for name in uniques], dtype=np.int64)
+    return rows[codes.reshape(-1)]
+
+
+def resolve_sector(industry: str) -> Optional[str]:
+    """把行业名称归入 SKILL_MAPPINGS 中的行业大类（最长别名优先），无法归类时返回 None"""
+    if industry in SKILL_MAPPINGS:
+        return industry
+    best, best_len = None, 0
+    for sector, aliases in SECTOR_ALIASES.items():
+        for alias in aliases:
+            if len(alias) > best_len and (alias in industry or (len(industry) >= 2 and industry in alias)):
+                best, best_len = sector, len(alias)
+    return best
+
+
+def build_transition_table(features: Dict) -> Dict:
+    """
+    构建转型方向预计算表
+
+    Args:
+        features: build_transition_features 的结果
+
+    Returns:
+        targets: 行业大类 -> 可迁移方向匹配到的成长期/初创期行业（已去重）
+        growth: 全表中成长期/初创期且景气度为高成长的行业（通用推荐）
+        sector_of: 表中全部行业名称 -> 行业大类（构建后只读）
+    """
+    names = features["names"]
+    lowered = pd.Series(names).str.lower()
+    recommendable = np.isin(features["stages"], RECOMMENDABLE_STAGES)
+
+    def record(row: int, reason: str) -> Dict:
+        return {
+            "行业名称": names[row],
+            "周期阶段": features["stages"][row],
+            "景气度": features["sentiments"][row],
+            "周期评分": float(features["cycle_score"][row]),
+            "推荐理由": reason,
+        }
+
+    keyword_rows: Dict[str, Optional[int]] = {}
+    targets: Dict[str, List[Dict]] = {}
+    for sector, keywords in SKILL_MAPPINGS.items():
+        seen, records = set(), []
+        for keyword in keywords:
+            if keyword not in keyword_rows:
+                keyword_rows[keyword] = _match_keyword_row(names, lowered, keyword)
+            row = keyword_rows[keyword]
+            if row is None or not recommendable[row] or names[row] in seen:
+                continue
+            seen.add(names[row])
+            records.append(record(row, f"{sector}经验可迁移方向「{keyword}」；{features['comments'][row]}"))
+        targets[sector] = records
+
+    growth_mask = recommendable & pd.Series(features["sentiments"]).str.contains('高成长|高', na=False).to_numpy()
+    growth = [record(row, features["comments"][row]) for row in np.flatnonzero(growth_mask)]
+
+    return {
+        "targets": targets,
+        "growth": growth,
+        "sector_of": {name: resolve_sector(name) for name in dict.fromkeys(names)},
+    }
+
+
+def get_transition_table(df: pd.DataFrame, data_version: str = "") -> Dict:
+    """获取（按数据版本缓存的）转型方向预计算表，数据文件变化后自动重建"""
+    features = get_transition_features(df, data_version)
+    if features["transition_table"] is None:
+        with _transition_table_lock:
+            if features["transition_table"] is None:
+                features["transition_table"] = build_transition_table(features)
+    return features["transition_table"]
+
+
+def lookup_transition_targets(df: pd.DataFrame, current_industry: str, top_k: int = 5,
+                              data_version: str = "") -> List[Dict]:
+    """
+    查询行业的推荐转型方向：行业大类的可迁移方向优先，不足时用高成长行业补足
+
+    Args:
+        df: 行业数据DataFrame
+        current_industry: 当前行业
+        top_k: 返回数量
+        data_version: 数据版本
+
+    Returns:
+        推荐方向列表（行业名称、周期阶段、景气度、推荐理由），可迁移方向按周期评分降序
+    """
+    table = get_transition_table(df, data_version)
+    # 表中没有的名称（用户输入）就地归类，不写回按数据版本共享的表
+    sector_of = table["sector_of"]
+    sector = sector_of[current_industry] if current_industry in sector_of else resolve_sector(current_industry)
+
+    mapped = sorted(table["targets"].get(sector, []), key=lambda r: -r["周期评分"])
+    recommendations, seen = [], {current_industry}
+    for item in mapped + table["growth"]:
+        if item["行业名称"] in seen:
+            continue
+        seen.add(item["行业名称"])
+        recommendations.append({k: item[k] for k in ("行业名称", "周期阶段", "景气度", "推荐理由")})
+        if len(recommendations) >= top_k:
+            break
+    return recommendations
+
+
+def lookup_growth_targets(df: pd.DataFrame, top_k: int = 5, data_version: str = "") -> List[Dict]:
+    """
+    查询通用推荐方向：成长期/初创期且景气度为高成长的行业，按表中顺序取前 top_k 个
+
+    Args:
+        df: 行业数据DataFrame
+        top_k: 返回数量
+        data_version: 数据版本
+
+    Returns:
+        推荐方向列表（行业名称、周期阶段、景气度、推荐理由）
+    """
+    table = get_transition_table(df, data_version)
+    return [{k: item[k] for k in ("行业名称", "周期阶段", "景气度", "推荐理由")} for item in table["growth"][:top_k]]
+
+
+# ==========================================
+# 画像评分
+# ==========================================
+def expand_skill_query(current_industry: str, skills: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    生成技能相近度的查询词：当前行业、其可迁移方向（SKILL_MAPPINGS）以及用户技能
+    """
+    terms = [current_industry] if current_industry else []
+    for key, targets in SKILL_MAPPINGS.items():
+        if current_industry and key in current_industry:
+            terms.extend(targets)
+    terms.extend(skills or [])
+    return [t for t in dict.fromkeys(terms) if t]
+
+
+def compute_skill_proximity(features: Dict, query_terms: Sequence[str]) -> np.ndarray:
+    """
+    计算每个行业与查询词的技能相近度（名称二元组余弦相似度，0-100）
+
+    Args:
+        features: get_transition_features 的结果
+        query_terms: 查询词列表
+
+    Returns:
+        每行的相近度
+    """
+    n_rows = len(features["names"])
+    query_ids = {features["vocab"][g] for term in query_terms for g in _char_bigrams(term)
+                 if g in features["vocab"]}
+    if not query_ids or n_rows == 0:
+        return np.zeros(n_rows)
+
+    query_mask = np.zeros(len(features["vocab"]), dtype=np.int64)
+    query_mask[list(query_ids)] = 1
+
+    # 命中数前缀和按 indptr 相减，即每行命中的二元组个数（空行为0）
+    indptr = features["indptr"]
+    cumulative_hits = np.concatenate(([0], np.cumsum(query_mask[features["indices"]])))
+    hits = cumulative_hits[indptr[1:]] - cumulative_hits[indptr[:-1]]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        similarity = hits / (features["doc_norm"] * np.sqrt(len(query_ids)))
+    return np.nan_to_num(similarity) * 100
+
+
+def get_ranking_weights(work_years: float) -> Dict[str, float]:
+    """
+    根据工作年限计算综合得分权重（资深从业者的可迁移经验价值更高，技能相近度权重随之提升）
+    """
+    skill_weight = SKILL_WEIGHT_MIN + SKILL_WEIGHT_PER_YEAR * min(max(work_years, 0), SKILL_WEIGHT_MAX_YEARS)
+    scale = (1 - skill_weight) / sum(BASE_WEIGHTS.values())
+    weights = {name: w * scale for name, w in BASE_WEIGHTS.items()}
+    weights["技能相近度"] = skill_weight
+    return weights
+
+
+def _lookup_current(features: Dict, current_industry: str):
+    """在行业表中查找当前行业（精确匹配优先，其次包含匹配），返回 (阶段, 景气度, 行号)"""
+    if not current_industry:
+        return None, None, None
+    lookup_cache = features["lookup_cache"]
+    row = lookup_cache.get(current_industry, _MISSING)
+    if row is _MISSING:
+        row = _find_current_row(features["names"], current_industry)
+        lookup_cache.put(current_industry, row)
+    if row is None:
+        return None, None, None
+    return features["stages"][row], features["sentiments"][row], row
+
+
+def _find_current_row(names: np.ndarray, current_industry: str) -> Optional[int]:
+    """查找当前行业所在行号，找不到返回 None"""
+    matches = np.flatnonzero(names == current_industry)
+    if not len(matches):
+        matches = np.flatnonzero(pd.Series(names).str.contains(current_industry, regex=False).to_numpy())
+    return int(matches[0]) if len(matches) else None
+
+
+def rank_transition_targets(df: pd.DataFrame, current_industry: str, work_years: float = 3,
+                            risk_preference: str = "平衡", top_k: int = 10,
+                            skills: Optional[Sequence[str]] = None, horizon: int = DEFAULT_HORIZON,
+                            current_stage: Optional[str] = None, data_version: str = "") -> pd.DataFrame:
+    """
+    为用户画像对行业表中的所有行业打分并返回 Top-K 转型目标
+
+    Args:
+        df: 行业数据DataFrame
+        current_industry: 当前行业
+        work_years: 工作年限
+        risk_preference: 风险偏好（稳健 / 平衡 / 激进）
+        top_k: 返回数量
+        skills: 用户技能关键词
+        horizon: 推演年数（用于计算交叉年份）
+        current_stage: 当前行业周期阶段，默认从行业表中查找
+        data_version: 数据版本，用于缓存行业特征
+
+    Returns:
+        按综合得分降序排列的 DataFrame
+    """
+    features = get_transition_features(df, data_version)
+    n_rows = len(features["names"])
+    if n_rows == 0:
+        return pd.DataFrame()
+
+    found_stage, current_sentiment, current_row = _lookup_current(features, current_industry)
+    current_stage = current_stage or found_stage
+
+    # 1. 周期评分
+    cycle_score = features["cycle_score"]
+
+    # 2. 周期组合（按风险偏好）
+    combination_table = COMBINATION_SCORES.get(risk_preference, COMBINATION_SCORES["平衡"])
+    combination_lookup = np.array([combination_table[name] for name in COMBINATION_NAMES], dtype=float)
+    combination_score = combination_lookup[features["combination_code"]]
+
+    # 3. 推演交叉年份：所有行业一次计算，越早超过留下轨迹得分越高
+    stay = stay_curves([current_stage], horizon, [current_sentiment])[0]
+    targets = move_curves_from_params(features["move_first_year"], features["move_slope"], horizon)
+    crossovers = detect_crossovers(stay, targets)
+    first_crossover = np.where(crossovers.any(axis=1), crossovers.argmax(axis=1), -1)
+    crossover_score = np.where(first_crossover > 0,
+                               (horizon + 1 - first_crossover) / horizon * 100, 0.0)
+
+    # 4. 技能相近度：行业名称相近度，识别出分类表中的技能时再与稀疏技能匹配度加权
+    from utils.skill_matcher import compute_skill_match, matched_skills_for_row
+
+    skill_score = compute_skill_proximity(features, expand_skill_query(current_industry, skills))
+    match_score, skill_ids = compute_skill_match(features, skills)
+    if skill_ids:
+        skill_score = (1 - SKILL_MATCH_SHARE) * skill_score + SKILL_MATCH_SHARE * match_score
+
+    weights = get_ranking_weights(work_years)
+    total = (weights["周期评分"] * cycle_score
+             + weights["组合类型"] * combination_score
+             + weights["交叉年份"] * crossover_score
+             + weights["技能相近度"] * skill_score)
+
+    # 排除当前行业本身
+    if current_row is not None:
+        total[features["names"] == features["names"][current_row]] = -np.inf
+
+    k = min(top_k, n_rows)
+    top = np.argpartition(-total, k - 1)[:k] if k < n_rows else np.arange(n_rows)
+    top = top[np.argsort(-total[top], kind="stable")]
+    top = top[np.isfinite(total[top])]
+
+    crossover_years = first_crossover[top]
+    return pd.DataFrame({
+        "排名": np.arange(1, len(top) + 1),
+        "行业名称": features["names"][top],
+        "当前周期阶段": features["stages"][top],
+        "未来1-3年景气度": features["sentiments"][top],
+        "周期组合": features["combination"][top],
+        "预计超越年份": [f"第{y}年" if y > 0 else "未超过" for y in crossover_years],
+        "周期评分": np.round(cycle_score[top], 1),
+        "组合得分": np.round(combination_score[top], 1),
+        "交叉得分": np.round(crossover_score[top], 1),
+        "技能相近度": np.round(skill_score[top], 1),
+        "技能匹配度": np.round(match_score[top], 1),
+        "匹配技能": [matched_skills_for_row(features["skill_matrix"], skill_ids, row) for row in top],
+        "综合得分": np.round(total[top], 1),
+    })
+
+
+def benchmark_transition_ranker(n_rows: int = 50_000, repeat: int = 20,
+                                csv_path: str = "data/细分领域行业周期研判表.csv") -> Dict[str, float]:
+    """
+    排序引擎基准测试：对知识库行业有放回抽样到 n_rows 行
+
+    Returns:
+        行数、特征构建耗时与单次排序耗时（ms）
+    """
+    import time
+
+    source = pd.read_csv(csv_path, encoding='utf-8').dropna(subset=['行业名称'])
+    sample = source.sample(n=n_rows, replace=True, random_state=0).reset_index(drop=True)
+    sample['行业名称'] = sample['行业名称'] + "#" + sample.index.astype(str)
+
+    start = time.perf_counter()
+    features = get_transition_features(sample, data_version=f"benchmark-{n_rows}")
+    build_ms = (time.perf_counter() - start) * 1000
+
+    from utils.skill_matcher import get_skill_matrix
+    start = time.perf_counter()
+    get_skill_matrix(features)
+    skill_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rank_transition_targets(sample, "房地产开发", work_years=8, risk_preference="稳健",
+                                skills=["项目管理", "成本控制"], data_version=f"benchmark-{n_rows}")
+    rank_ms = (time.perf_counter() - start) / repeat * 1000
+
+    return {"行数": n_rows, "特征构建(ms)": round(build_ms, 1), "技能矩阵构建(ms)": round(skill_ms, 1),
+            "单次排序(ms)": round(rank_ms, 1)}
+
+
+def benchmark_transition_table(repeat: int = 200, csv_path: str = "data/细分领域行业周期研判表.csv") -> Dict[str, float]:
+    """
+    对比预计算表查询与逐个可迁移方向全表检索（IndustryRAGEngine.search_industry + 阶段过滤）的耗时，
+    以及通用推荐查询与逐次阶段/景气度过滤的耗时
+
+    Returns:
+        特征与表构建耗时、各方式的单次查询耗时（ms）
+    """
+    import time
+    from utils.rag_engine import IndustryRAGEngine
+
+    engine = IndustryRAGEngine(csv_path)
+    df = engine.df
+    sources = list(SKILL_MAPPINGS)
+
+    data_version = f"benchmark-table-{time.time_ns()}"
+    start = time.perf_counter()
+    get_transition_table(df, data_version=data_version)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i in range(repeat):
+        lookup_transition_targets(df, sources[i % len(sources)], data_version=data_version)
+    lookup_ms = (time.perf_counter() - start) / repeat * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        lookup_growth_targets(df, data_version=data_version)
+    growth_ms = (time.perf_counter() - start) / repeat * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        df[df['当前周期阶段'].isin(['成长期', '初创期']) &
+           df['未来1-3年景气度'].str.contains('高成长|高', na=False)].head(5)
+    filter_ms = (time.perf_counter() - start) / repeat * 1000
+
+    start = time.perf_counter()
+    for i in range(repeat // 10):
+        for keyword in SKILL_MAPPINGS[sources[i % len(sources)]]:
+            [r for r in engine.search_industry(keyword, top_k=1) if r['当前周期阶段'] in RECOMMENDABLE_STAGES]
+    scan_ms = (time.perf_counter() - start) / (repeat // 10) * 1000
+
+    return {"特征与表构建(ms)": round(build_ms, 1), "预计算表查询(ms)": round(lookup_ms, 3), "逐个全表检索(ms)": round(scan_ms, 1),
+            "通用推荐查询(ms)": round(growth_ms, 3), "通用推荐逐次过滤(ms)": round(filter_ms, 3)}
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("转型方向排序引擎基准测试")
+    print("=" * 50)
+    print(benchmark_transition_ranker())
+    print(benchmark_transition_table())
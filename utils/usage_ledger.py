@@ -0,0 +1,140 @@
+"""
+AI 调用用量账本
+按「用户标识 + 日期」记录全站的 LLM 调用次数，存放在 SQLite（WAL 模式）中，
+页面刷新、新开会话或多个进程共用同一份计数；配额检查与计数在同一条 UPSERT 语句中原子完成
+"""
+
+import datetime
+import os
+import sqlite3
+import threading
+from typing import Optional, Tuple
+
+# 账本文件位置（可通过环境变量指向持久化卷）
+USAGE_DB_PATH = os.environ.get("CYCLE_USAGE_DB", "data/usage_ledger.sqlite3")
+
+# 写锁被占用时的等待时间（毫秒）
+BUSY_TIMEOUT_MS = 5000
+
+# 账本只保留最近若干天的记录
+RETENTION_DAYS = 7
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    user_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_key, day)
+) WITHOUT ROWID
+"""
+
+# 未超过配额时计数加一并返回新计数；已达配额时 WHERE 不成立，不更新也不返回行
+_CONSUME_SQL = """
+INSERT INTO usage (user_key, day, count) VALUES (?, ?, 1)
+ON CONFLICT (user_key, day) DO UPDATE SET count = count + 1 WHERE count < ?
+RETURNING count
+"""
+
+# 每个线程（Streamlit 的每个会话脚本线程）使用自己的连接，进程内不需要额外加锁
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_paths = set()
+
+
+def _today(today: Optional[datetime.date] = None) -> str:
+    return (today or datetime.date.today()).isoformat()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """返回当前线程到 db_path 的连接；首次打开某个账本时建表、开启 WAL 并清理过期记录"""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is not None:
+        return conn
+
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    with _init_lock:
+        if db_path not in _initialized_paths:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(_SCHEMA)
+            cutoff = datetime.date.today() - datetime.timedelta(days=RETENTION_DAYS)
+            conn.execute("DELETE FROM usage WHERE day < ?", (cutoff.isoformat(),))
+            _initialized_paths.add(db_path)
+    connections[db_path] = conn
+    return conn
+
+
+def try_consume(user_key: str, limit: int, db_path: str = USAGE_DB_PATH,
+                today: Optional[datetime.date] = None) -> Tuple[bool, int]:
+    """
+    原子地检查配额并记一次调用
+
+    Args:
+        user_key: 用户标识（API Key 摘要 / IP / 会话）
+        limit: 每日调用上限
+        db_path: 账本文件
+        today: 计数所属日期，默认今天
+
+    Returns:
+        (是否允许调用, 本次之后的当日计数)；已达上限时不计数，返回当前计数
+    """
+    conn = _connect(db_path)
+    day = _today(today)
+    row = conn.execute(_CONSUME_SQL, (user_key, day, limit)).fetchone()
+    if row is not None:
+        return True, row[0]
+    return False, get_usage(user_key, db_path, today)
+
+
+def get_usage(user_key: str, db_path: str = USAGE_DB_PATH, today: Optional[datetime.date] = None) -> int:
+    """返回 user_key 当日已用次数"""
+    row = _connect(db_path).execute(
+        "SELECT count FROM usage WHERE user_key = ? AND day = ?", (user_key, _today(today))
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def benchmark_ledger(db_path: str, threads: int = 16, calls_per_thread: int = 200, limit: int = 1000) -> dict:
+    """
+    并发压测：多个线程对同一用户抢配额，检查计数既不丢失也不超过上限
+
+    Returns:
+        允许次数、最终计数、上限与每次调用的平均耗时（ms）
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    user_key = f"benchmark-{time.time_ns()}"
+
+    def worker(_):
+        return sum(try_consume(user_key, limit, db_path)[0] for _ in range(calls_per_thread))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        allowed = sum(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "allowed": allowed,
+        "final_count": get_usage(user_key, db_path),
+        "limit": limit,
+        "attempts": threads * calls_per_thread,
+        "avg_ms": round(elapsed / (threads * calls_per_thread) * 1000, 3),
+    }
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("=" * 50)
+    print("用量账本：并发计数压测")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(benchmark_ledger(os.path.join(tmp, "usage.sqlite3")))
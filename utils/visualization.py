@@ -3,20 +3,224 @@
 包含周期象限图、雷达图、仪表盘等职业规划专用可视化
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
+
+# 象限图超过该点数时自动切换为 WebGL 渲染
+WEBGL_POINT_THRESHOLD = 1000
+# WebGL 模式下显示文字标签的点数上限
+WEBGL_LABEL_TOP_K = 30
+
+# 周期阶段配色
+STAGE_ORDER = ['成长期', '初创期', '成熟期', '调整期', '衰退期']
+STAGE_COLORS = {
+    '成长期': '#00C851',  # 绿色
+    '初创期': '#33B5E5',  # 蓝色
+    '成熟期': '#FFBB33',  # 黄色
+    '调整期': '#FF8800',  # 橙色
+    '衰退期': '#CC0000'   # 红色
+}
+
+# ==========================================
+# 图表缓存
+# ==========================================
+# 以（构建函数, 数据版本, 筛选指纹, 高亮）为键缓存已构建的 Figure，
+# 页面重跑时相同输入直接复用，跨会话共享，因此返回的 Figure 不应被原地修改
+FIGURE_CACHE_SIZE = 128
+_figure_cache: "OrderedDict[tuple, go.Figure]" = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def get_data_fingerprint(df, columns: Optional[List[str]] = None) -> str:
+    """
+    计算 DataFrame 内容指纹（向量化哈希），用于区分不同的筛选结果
+
+    Args:
+        df: 数据
+        columns: 参与计算的列，默认全部列
+
+    Returns:
+        指纹字符串
+    """
+    if df is None or df.empty:
+        return "empty"
+    subset = df[columns] if columns else df
+    row_hashes = pd.util.hash_pandas_object(subset, index=False).to_numpy()
+    return f"{len(subset)}:{hashlib.blake2b(row_hashes.tobytes(), digest_size=8).hexdigest()}"
+
+
+def _get_cached_figure(key: tuple, build: Callable[[], go.Figure]) -> go.Figure:
+    """从缓存获取图表，未命中时调用 build 构建并写入缓存（LRU 淘汰）"""
+    with _figure_cache_lock:
+        fig = _figure_cache.get(key)
+        if fig is not None:
+            _figure_cache.move_to_end(key)
+            return fig
+
+    fig = build()
+
+    with _figure_cache_lock:
+        _figure_cache[key] = fig
+        _figure_cache.move_to_end(key)
+        while len(_figure_cache) > FIGURE_CACHE_SIZE:
+            _figure_cache.popitem(last=False)
+    return fig
+
+
+def clear_figure_cache():
+    """清空图表缓存"""
+    with _figure_cache_lock:
+        _figure_cache.clear()
 
 
-def create_cycle_quadrant_chart(df, highlight_industry: Optional[str] = None):
+# ==========================================
+# 时间序列降采样
+# ==========================================
+# 时间序列点数超过图表像素宽度时自动降采样（每个像素最多保留一个点）
+DEFAULT_CHART_WIDTH_PX = 800
+
+
+def lttb_downsample(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    首尾点固定保留，中间点均分为 n_out-2 个桶，每个桶保留与“上一个保留点、
+    下一个桶均值点”构成三角形面积最大的点，可较好地保留峰谷形态。
+    桶均值通过前缀和一次算出，桶内面积计算向量化。
+
+    Args:
+        x: 横坐标（数值）
+        y: 纵坐标（数值）
+        n_out: 目标点数
+
+    Returns:
+        保留点的下标数组（升序）
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+
+    prefix_x = np.concatenate([[0.0], np.cumsum(x)])
+    prefix_y = np.concatenate([[0.0], np.cumsum(y)])
+    bucket_avg_x = (prefix_x[ends] - prefix_x[starts]) / (ends - starts)
+    bucket_avg_y = (prefix_y[ends] - prefix_y[starts]) / (ends - starts)
+    # 每个桶对应的“下一个桶均值点”，最后一个桶使用末尾点
+    next_x = np.append(bucket_avg_x[1:], x[-1])
+    next_y = np.append(bucket_avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = starts[i], ends[i]
+        area = np.abs((x[a] - next_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (next_y[i] - y[a]))
+        a = s + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_downsample(y, n_out: int) -> np.ndarray:
+    """
+    最小/最大值分桶降采样（完全向量化）
+
+    将序列均分为 (n_out-2)/2 个桶，每个桶保留最小值与最大值所在的点，首尾点固定保留。
+
+    Returns:
+        保留点的下标数组（升序）
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max((n_out - 2) // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    bucket = np.arange(n) * n_buckets // n
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    first = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+    last = np.r_[sorted_bucket[1:] != sorted_bucket[:-1], True]
+    return np.unique(np.concatenate([order[first], order[last], [0, n - 1]]))
+
+
+def downsample_series(x, y, max_points: int = DEFAULT_CHART_WIDTH_PX, method: str = "lttb"):
+    """
+    对时间序列降采样（缺失值先剔除）
+
+    Args:
+        x: 横坐标（数值、日期或字符串均可，非数值时按位置计算）
+        y: 纵坐标
+        max_points: 保留点数上限
+        method: "lttb" 或 "minmax"
+
+    Returns:
+        (保留点下标, 统计信息)，统计信息包含 原始点数、保留点数、耗时(ms)
+    """
+    import time
+
+    start = time.perf_counter()
+    y = np.asarray(y, dtype=float)
+    valid_idx = np.flatnonzero(~np.isnan(y))
+
+    if len(valid_idx) <= max_points:
+        kept = valid_idx
+    else:
+        x_arr = np.asarray(x)
+        if np.issubdtype(x_arr.dtype, np.number):
+            x_num = x_arr[valid_idx].astype(float)
+        elif np.issubdtype(x_arr.dtype, np.datetime64):
+            x_num = x_arr[valid_idx].astype('datetime64[ns]').astype(np.int64).astype(float)
+        else:
+            x_num = valid_idx.astype(float)
+        if method == "minmax":
+            local = minmax_downsample(y[valid_idx], max_points)
+        else:
+            local = lttb_downsample(x_num, y[valid_idx], max_points)
+        kept = valid_idx[local]
+
+    info = {
+        "原始点数": int(len(valid_idx)),
+        "保留点数": int(len(kept)),
+        "耗时(ms)": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return kept, info
+
+
+def get_downsample_info(fig) -> Optional[Dict]:
+    """读取时间序列图表的降采样统计（未降采样时返回 None）"""
+    meta = fig.layout.meta if fig is not None else None
+    if isinstance(meta, dict) and meta.get("downsample"):
+        info = meta["downsample"]
+        if info["保留点数"] < info["原始点数"]:
+            return info
+    return None
+
+
+def create_cycle_quadrant_chart(df, highlight_industry: Optional[str] = None, data_version: str = "",
+                                render_mode: str = "auto"):
     """
     创建周期象限图（产业周期 × 政策周期）
     
+    底图按（数据版本, 筛选指纹）缓存；高亮行业以叠加层的形式加在底图副本上，
+    切换高亮时无需重建全部散点。
+    
     Args:
         df: 行业数据DataFrame
         highlight_industry: 要高亮显示的行业名称
+        data_version: 数据源版本标识（如 get_file_version 的返回值）
+        render_mode: "svg"、"webgl" 或 "auto"（超过 WEBGL_POINT_THRESHOLD 个点时使用 WebGL）
         
     Returns:
         Plotly Figure 对象
@@ -24,83 +228,251 @@ def create_cycle_quadrant_chart(df, highlight_industry: Optional[str] = None):
     if df.empty:
         return None
     
-    # 计算坐标
-    from utils.data_processor import get_industry_cycle_score, get_policy_cycle_score
+    if render_mode == "auto":
+        render_mode = "webgl" if len(df) > WEBGL_POINT_THRESHOLD else "svg"
     
-    df = df.copy()
-    df['产业周期评分'] = df['当前周期阶段'].apply(get_industry_cycle_score)
-    df['政策周期评分'] = df['未来1-3年景气度'].apply(get_policy_cycle_score)
+    builder = f"cycle_quadrant:{render_mode}"
+    fingerprint = get_data_fingerprint(df, ['行业名称', '当前周期阶段', '未来1-3年景气度'])
+    base_fig = _get_cached_figure(
+        (builder, data_version, fingerprint, None),
+        lambda: _build_cycle_quadrant_base(df, webgl=(render_mode == "webgl"))
+    )
     
-    # 确定颜色
-    def get_color(row):
-        if highlight_industry and row['行业名称'] == highlight_industry:
-            return '#FF0000'  # 高亮红色
-        
-        stage = row['当前周期阶段']
-        if stage == '成长期':
-            return '#00C851'  # 绿色
-        elif stage == '初创期':
-            return '#33B5E5'  # 蓝色
-        elif stage == '成熟期':
-            return '#FFBB33'  # 黄色
-        elif stage == '调整期':
-            return '#FF8800'  # 橙色
-        else:
-            return '#CC0000'  # 红色
+    if not highlight_industry:
+        return base_fig
+    
+    return _get_cached_figure(
+        (builder, data_version, fingerprint, highlight_industry),
+        lambda: _add_highlight_overlay(base_fig, df, highlight_industry)
+    )
+
+
+def _add_highlight_overlay(base_fig: go.Figure, df, highlight_industry: str) -> go.Figure:
+    """在底图副本上叠加高亮行业标记"""
+    fig = go.Figure(base_fig)
+    
+    highlight_df = df[df['行业名称'] == highlight_industry]
+    if highlight_df.empty:
+        return fig
+    
+    from utils.data_processor import compute_cycle_scores
+    scores = compute_cycle_scores(highlight_df)
+    
+    fig.add_trace(go.Scatter(
+        x=scores['政策周期评分'],
+        y=scores['产业周期评分'],
+        mode='markers+text',
+        name='当前选中',
+        text=highlight_df['行业名称'],
+        textposition="top center",
+        textfont=dict(size=12, color='red'),
+        marker=dict(
+            size=30,
+            color='rgba(255, 0, 0, 0.3)',
+            line=dict(width=3, color='red')
+        ),
+        hoverinfo='skip'
+    ))
+    return fig
+
+
+def _build_cycle_quadrant_base(df, webgl: bool = False) -> go.Figure:
+    """
+    构建不含高亮的象限图底图
+    
+    WebGL 模式使用 Scattergl 且不逐点绘制文字，行业名称通过悬停显示，
+    仅为综合评分最高的 WEBGL_LABEL_TOP_K 个行业添加文字标签。
+    """
+    from utils.data_processor import compute_cycle_scores
     
-    df['颜色'] = df.apply(get_color, axis=1)
-    df['大小'] = df.apply(lambda x: 20 if highlight_industry and x['行业名称'] == highlight_industry else 10, axis=1)
+    # 向量化计算坐标
+    scores = compute_cycle_scores(df)
+    x_all = scores['政策周期评分'].to_numpy()
+    y_all = scores['产业周期评分'].to_numpy()
+    names = df['行业名称'].to_numpy()
+    stages = df['当前周期阶段'].to_numpy()
     
     # 创建散点图
     fig = go.Figure()
     
     # 按周期阶段分组绘制，确保图例正确
-    stage_order = ['成长期', '初创期', '成熟期', '调整期', '衰退期']
-    colors_map = {
-        '成长期': '#00C851',
-        '初创期': '#33B5E5',
-        '成熟期': '#FFBB33',
-        '调整期': '#FF8800',
-        '衰退期': '#CC0000'
-    }
-    
-    for stage in stage_order:
-        stage_df = df[df['当前周期阶段'] == stage]
-        if not stage_df.empty:
+    for stage in STAGE_ORDER:
+        mask = stages == stage
+        if not mask.any():
+            continue
+        marker = dict(
+            size=10 if not webgl else 6,
+            color=STAGE_COLORS.get(stage, '#999999'),
+            opacity=0.8,
+            line=dict(width=1, color='white')
+        )
+        if webgl:
+            fig.add_trace(go.Scattergl(
+                x=x_all[mask],
+                y=y_all[mask],
+                mode='markers',
+                name=stage,
+                hovertext=names[mask],
+                marker=marker,
+                hovertemplate='<b>%{hovertext}</b><br>政策周期评分: %{x}<br>产业周期评分: %{y}<extra></extra>'
+            ))
+        else:
             fig.add_trace(go.Scatter(
-                x=stage_df['政策周期评分'],
-                y=stage_df['产业周期评分'],
+                x=x_all[mask],
+                y=y_all[mask],
                 mode='markers+text',
                 name=stage,
-                text=stage_df['行业名称'],
+                text=names[mask],
                 textposition="top center",
                 textfont=dict(size=8),
-                marker=dict(
-                    size=stage_df['大小'],
-                    color=colors_map.get(stage, '#999999'),
-                    opacity=0.8,
-                    line=dict(width=1, color='white')
-                ),
+                marker=marker,
                 hovertemplate='<b>%{text}</b><br>政策周期评分: %{x}<br>产业周期评分: %{y}<extra></extra>'
             ))
     
-    # 添加高亮行业的特殊标记
-    if highlight_industry:
-        highlight_df = df[df['行业名称'] == highlight_industry]
-        if not highlight_df.empty:
+    # WebGL 模式：只为 top-k 行业添加文字标签
+    if webgl:
+        in_legend = np.isin(stages, STAGE_ORDER)
+        combined = np.where(in_legend, x_all + y_all, -np.inf)
+        k = min(WEBGL_LABEL_TOP_K, int(in_legend.sum()))
+        if k > 0:
+            top = np.argpartition(-combined, k - 1)[:k]
             fig.add_trace(go.Scatter(
-                x=highlight_df['政策周期评分'],
-                y=highlight_df['产业周期评分'],
-                mode='markers',
-                name='当前选中',
-                marker=dict(
-                    size=30,
-                    color='rgba(255, 0, 0, 0.3)',
-                    line=dict(width=3, color='red')
-                ),
-                hoverinfo='skip'
+                x=x_all[top],
+                y=y_all[top],
+                mode='text',
+                name=f'前{k}名标签',
+                text=names[top],
+                textposition="top center",
+                textfont=dict(size=8),
+                hoverinfo='skip',
+                showlegend=False
             ))
     
+    _add_quadrant_decorations(fig)
+    
+    return fig
+
+
+QUADRANT_CELL_KEYS = ['政策周期评分', '产业周期评分', '当前周期阶段']
+
+
+def aggregate_quadrant_cells(df, top_n: int = 5) -> pd.DataFrame:
+    """
+    按（政策评分, 产业评分, 周期阶段）对行业分组聚合
+
+    评分只有少数离散取值，大量行业会重叠在相同坐标上，聚合后图表数据量
+    由 O(行业数) 降为 O(单元格数)。
+
+    Args:
+        df: 行业数据DataFrame
+        top_n: 每个单元格在悬停信息中列出的行业数
+
+    Returns:
+        每个单元格一行，包含坐标、阶段、行业数量及前N个行业名称
+    """
+    from utils.data_processor import compute_cycle_scores
+
+    cells = pd.concat([compute_cycle_scores(df), df[['当前周期阶段', '行业名称']]], axis=1)
+    grouped = cells.groupby(QUADRANT_CELL_KEYS, sort=False)
+    counts = grouped.size().rename('行业数量')
+    preview = cells.groupby(QUADRANT_CELL_KEYS, sort=False).head(top_n) \
+        .groupby(QUADRANT_CELL_KEYS, sort=False)['行业名称'].agg('、'.join).rename('代表行业')
+    return pd.concat([counts, preview], axis=1).reset_index()
+
+
+def get_quadrant_cell_members(df, policy_score: int, industry_score: int, stage: str):
+    """
+    获取象限图某个聚合单元格内的全部行业（用于点击下钻）
+
+    Returns:
+        属于该单元格的行业数据子集
+    """
+    from utils.data_processor import compute_cycle_scores
+
+    scores = compute_cycle_scores(df)
+    mask = (
+        (scores['政策周期评分'] == policy_score) &
+        (scores['产业周期评分'] == industry_score) &
+        (df['当前周期阶段'] == stage)
+    )
+    return df[mask]
+
+
+def create_cycle_bubble_chart(df, highlight_industry: Optional[str] = None, data_version: str = "",
+                              top_n: int = 5):
+    """
+    创建聚合气泡版周期象限图：每个（坐标, 阶段）单元格绘制一个按行业数量缩放的气泡
+
+    Args:
+        df: 行业数据DataFrame
+        highlight_industry: 要高亮显示的行业名称
+        data_version: 数据源版本标识
+        top_n: 悬停信息中列出的行业数
+
+    Returns:
+        Plotly Figure 对象；气泡的 customdata 为 [政策评分, 产业评分, 周期阶段]，供点击下钻使用
+    """
+    if df.empty:
+        return None
+
+    fingerprint = get_data_fingerprint(df, ['行业名称', '当前周期阶段', '未来1-3年景气度'])
+    builder = f"cycle_bubble:{top_n}"
+    base_fig = _get_cached_figure(
+        (builder, data_version, fingerprint, None),
+        lambda: _build_cycle_bubble_base(df, top_n)
+    )
+
+    if not highlight_industry:
+        return base_fig
+
+    return _get_cached_figure(
+        (builder, data_version, fingerprint, highlight_industry),
+        lambda: _add_highlight_overlay(base_fig, df, highlight_industry)
+    )
+
+
+def _build_cycle_bubble_base(df, top_n: int) -> go.Figure:
+    """构建聚合气泡底图"""
+    cells = aggregate_quadrant_cells(df, top_n)
+    max_count = max(int(cells['行业数量'].max()), 1)
+
+    fig = go.Figure()
+
+    stages = [s for s in STAGE_ORDER if s in set(cells['当前周期阶段'])]
+    stages += [s for s in cells['当前周期阶段'].unique() if s not in STAGE_ORDER]
+
+    for stage in stages:
+        stage_cells = cells[cells['当前周期阶段'] == stage]
+        counts = stage_cells['行业数量'].to_numpy()
+        fig.add_trace(go.Scatter(
+            x=stage_cells['政策周期评分'],
+            y=stage_cells['产业周期评分'],
+            mode='markers+text',
+            name=stage,
+            text=counts,
+            textfont=dict(size=10, color='white'),
+            marker=dict(
+                # 气泡面积与行业数量成正比
+                size=16 + 44 * np.sqrt(counts / max_count),
+                color=STAGE_COLORS.get(stage, '#999999'),
+                opacity=0.75,
+                line=dict(width=1, color='white')
+            ),
+            customdata=stage_cells[QUADRANT_CELL_KEYS].to_numpy(),
+            hovertext=stage_cells['代表行业'],
+            hovertemplate=('<b>%{customdata[2]}</b>：%{text} 个行业<br>'
+                           '政策周期评分: %{x}<br>产业周期评分: %{y}<br>'
+                           '代表行业：%{hovertext}<extra></extra>')
+        ))
+
+    _add_quadrant_decorations(fig)
+    fig.update_layout(title="产业周期 × 政策周期 象限图（聚合视图）")
+
+    return fig
+
+
+def _add_quadrant_decorations(fig: go.Figure):
+    """添加象限分割线、象限标注与统一布局"""
     # 添加象限分割线
     fig.add_hline(y=50, line_dash="dash", line_color="gray", opacity=0.5)
     fig.add_vline(x=50, line_dash="dash", line_color="gray", opacity=0.5)
@@ -132,8 +504,37 @@ def create_cycle_quadrant_chart(df, highlight_industry: Optional[str] = None):
             x=1
         )
     )
-    
-    return fig
+
+
+# ==========================================
+# 轻量图表规格（跳过校验）
+# ==========================================
+# 雷达图、仪表盘每次重跑会被调用数十次，而 go.Figure/go.Scatterpolar 的属性校验
+# 占了大部分构建耗时。这里先用校验过的构建函数生成一次模板字典，之后每次调用
+# 只替换数据字段，再以 _validate=False 包装为 Figure 交给前端（st.plotly_chart
+# 对 Figure 对象不会重复校验，对普通字典则会）。
+_figure_templates: Dict[str, dict] = {}
+_figure_templates_lock = threading.Lock()
+
+
+def _get_figure_template(name: str, build: Callable[[], go.Figure]) -> dict:
+    """获取（首次构建并缓存）已校验的图表模板字典，返回值只读"""
+    with _figure_templates_lock:
+        template = _figure_templates.get(name)
+        if template is None:
+            template = build().to_dict()
+            _figure_templates[name] = template
+    return template
+
+
+def _figure_from_spec(spec: dict) -> go.Figure:
+    """将模板派生的规格字典包装为 Figure（跳过属性校验，内部会复制规格）"""
+    return go.Figure(spec, _validate=False)
+
+
+def _close_polygon(values: list) -> list:
+    """闭合雷达图（首点追加到末尾）"""
+    return values + values[:1]
 
 
 def create_radar_chart(indicators: Dict[str, float], title: str = "行业指标雷达图"):
@@ -147,6 +548,16 @@ def create_radar_chart(indicators: Dict[str, float], title: str = "行业指标
     Returns:
         Plotly Figure 对象
     """
+    template = _get_figure_template("radar", lambda: _build_radar_chart({"": 0}, ""))
+    trace = {**template["data"][0],
+             "r": _close_polygon(list(indicators.values())),
+             "theta": _close_polygon(list(indicators.keys()))}
+    layout = {**template["layout"], "title": {**template["layout"]["title"], "text": title}}
+    return _figure_from_spec({"data": [trace], "layout": layout})
+
+
+def _build_radar_chart(indicators: Dict[str, float], title: str) -> go.Figure:
+    """构建雷达图（完整校验版本，用于生成模板和一致性校验）"""
     categories = list(indicators.keys())
     values = list(indicators.values())
     
@@ -177,6 +588,10 @@ def create_radar_chart(indicators: Dict[str, float], title: str = "行业指标
     return fig
 
 
+SENTINEL_RADAR_LABELS = ['技术成本\n下降50%', '龙头毛利\n>20%', '政策\n明确补贴',
+                         '渗透率\n5-30%', '资本开支\n增速>30%', '营收10亿\n企业>3家', '产业链\n配套完善']
+
+
 def create_sentinel_radar(indicators: List[Dict]):
     """
     创建数据哨兵7大指标雷达图
@@ -187,8 +602,18 @@ def create_sentinel_radar(indicators: List[Dict]):
     Returns:
         Plotly Figure 对象
     """
-    labels = ['技术成本\n下降50%', '龙头毛利\n>20%', '政策\n明确补贴', 
-              '渗透率\n5-30%', '资本开支\n增速>30%', '营收10亿\n企业>3家', '产业链\n配套完善']
+    template = _get_figure_template(
+        "sentinel_radar",
+        lambda: _build_sentinel_radar([{"status": False}] * len(SENTINEL_RADAR_LABELS))
+    )
+    values = [100 if ind["status"] else 30 for ind in indicators]
+    trace = {**template["data"][0], "r": _close_polygon(values)}
+    return _figure_from_spec({"data": [trace], "layout": template["layout"]})
+
+
+def _build_sentinel_radar(indicators: List[Dict]) -> go.Figure:
+    """构建数据哨兵雷达图（完整校验版本，用于生成模板和一致性校验）"""
+    labels = list(SENTINEL_RADAR_LABELS)
     
     values = [100 if ind["status"] else 30 for ind in indicators]
     values.append(values[0])  # 闭合
@@ -220,12 +645,115 @@ def create_sentinel_radar(indicators: List[Dict]):
     return fig
 
 
-def create_cycle_distribution_chart(df):
+def create_readiness_trend_chart(months: List[str], scores, rolling_mean=None,
+                                max_points: int = DEFAULT_CHART_WIDTH_PX):
+    """
+    创建数据哨兵就绪度趋势图
+
+    点数超过 max_points 时自动 LTTB 降采样，降采样统计写入 fig.layout.meta
+
+    Args:
+        months: 月份标识列表
+        scores: 各月就绪度（缺失月份为 NaN）
+        rolling_mean: 各月滚动均值（可选）
+        max_points: 保留点数上限（默认按图表像素宽度）
+
+    Returns:
+        Plotly Figure 对象
+    """
+    kept, info = downsample_series(months, scores, max_points)
+    if info["保留点数"] < info["原始点数"]:
+        months = np.asarray(months)[kept]
+        scores = np.asarray(scores, dtype=float)[kept]
+        if rolling_mean is not None:
+            rolling_mean = np.asarray(rolling_mean, dtype=float)[kept]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=months,
+        y=scores,
+        mode='lines+markers' if len(scores) <= 60 else 'lines',
+        name='就绪度',
+        connectgaps=True,
+        line=dict(color='teal', width=2),
+        marker=dict(size=8)
+    ))
+
+    if rolling_mean is not None:
+        fig.add_trace(go.Scatter(
+            x=months,
+            y=rolling_mean,
+            mode='lines',
+            name='滚动均值',
+            line=dict(color='gray', width=2, dash='dot')
+        ))
+
+    fig.add_hline(y=80, line_dash="dash", line_color="green",
+                  annotation_text="推荐入场线")
+    fig.add_hline(y=60, line_dash="dash", line_color="orange",
+                  annotation_text="关注线")
+    fig.update_layout(
+        height=250,
+        margin=dict(l=20, r=20, t=20, b=20),
+        showlegend=False,
+        xaxis_title="月份",
+        yaxis_title="就绪度评分",
+        yaxis=dict(range=[0, 100]),
+        meta={"downsample": info}
+    )
+
+    return fig
+
+
+def create_watchlist_heatmap(industries: List[str], progress_matrix, indicator_names: List[str],
+                             readiness_scores=None):
+    """
+    创建追踪列表对比热力图（行业 × 7大指标），一张图替代逐个行业的雷达图
+
+    Args:
+        industries: 行业名称列表（热力图自上而下的顺序）
+        progress_matrix: (行业 × 指标) 进度矩阵，取值 0-100
+        indicator_names: 指标名称列表
+        readiness_scores: 各行业就绪度（可选，显示在行标签中）
+
+    Returns:
+        Plotly Figure 对象
+    """
+    if readiness_scores is not None:
+        y_labels = [f"{name}（{score:.0f}%）" for name, score in zip(industries, readiness_scores)]
+    else:
+        y_labels = list(industries)
+
+    fig = go.Figure(data=go.Heatmap(
+        z=progress_matrix,
+        x=indicator_names,
+        y=y_labels,
+        zmin=0,
+        zmax=100,
+        colorscale=[[0, '#CC0000'], [0.5, '#FFBB33'], [0.7, '#FFFFFF'], [1, '#00C851']],
+        texttemplate='%{z:.0f}',
+        textfont=dict(size=11),
+        colorbar=dict(title='进度', tickvals=[0, 70, 100], ticktext=['0', '达标线', '100']),
+        hovertemplate='<b>%{y}</b><br>%{x}：%{z:.1f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        height=max(300, 40 * len(y_labels) + 120),
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis=dict(side='top'),
+        yaxis=dict(autorange='reversed')
+    )
+
+    return fig
+
+
+def create_cycle_distribution_chart(df, data_version: str = ""):
     """
     创建周期阶段分布图
     
     Args:
         df: 行业数据DataFrame
+        data_version: 数据源版本标识
         
     Returns:
         Plotly Figure 对象
@@ -233,25 +761,25 @@ def create_cycle_distribution_chart(df):
     if df.empty or '当前周期阶段' not in df.columns:
         return None
     
+    fingerprint = get_data_fingerprint(df, ['当前周期阶段'])
+    return _get_cached_figure(
+        ("cycle_distribution", data_version, fingerprint, None),
+        lambda: _build_cycle_distribution_chart(df)
+    )
+
+
+def _build_cycle_distribution_chart(df) -> go.Figure:
+    """构建周期阶段分布图"""
     cycle_counts = df['当前周期阶段'].value_counts().reset_index()
     cycle_counts.columns = ['周期阶段', '数量']
     
-    # 定义颜色
-    color_map = {
-        '成长期': '#00C851',
-        '初创期': '#33B5E5',
-        '成熟期': '#FFBB33',
-        '调整期': '#FF8800',
-        '衰退期': '#CC0000'
-    }
-    
     fig = px.bar(
         cycle_counts, 
         x='周期阶段', 
         y='数量', 
         text='数量',
         color='周期阶段',
-        color_discrete_map=color_map,
+        color_discrete_map=STAGE_COLORS,
         title="各周期阶段行业分布"
     )
     
@@ -266,12 +794,13 @@ def create_cycle_distribution_chart(df):
     return fig
 
 
-def create_sentiment_pie_chart(df):
+def create_sentiment_pie_chart(df, data_version: str = ""):
     """
     创建景气度分布饼图
     
     Args:
         df: 行业数据DataFrame
+        data_version: 数据源版本标识
         
     Returns:
         Plotly Figure 对象
@@ -279,6 +808,15 @@ def create_sentiment_pie_chart(df):
     if df.empty or '未来1-3年景气度' not in df.columns:
         return None
     
+    fingerprint = get_data_fingerprint(df, ['未来1-3年景气度'])
+    return _get_cached_figure(
+        ("sentiment_pie", data_version, fingerprint, None),
+        lambda: _build_sentiment_pie_chart(df)
+    )
+
+
+def _build_sentiment_pie_chart(df) -> go.Figure:
+    """构建景气度分布饼图"""
     sentiment_counts = df['未来1-3年景气度'].value_counts().reset_index()
     sentiment_counts.columns = ['景气度', '数量']
     
@@ -308,16 +846,30 @@ def create_career_path_timeline(current_industry: str, target_industry: str,
     Returns:
         Plotly Figure 对象
     """
+    fingerprint = repr((current_industry, target_industry,
+                        tuple((m.get('score', 50), m.get('label', '')) for m in milestones)))
+    return _get_cached_figure(
+        ("career_path_timeline", "", fingerprint, None),
+        lambda: _build_career_path_timeline(current_industry, target_industry, milestones)
+    )
+
+
+def _build_career_path_timeline(current_industry: str, target_industry: str,
+                                milestones: List[Dict]) -> go.Figure:
+    """构建职业发展时间线"""
     fig = go.Figure()
     
-    # 添加时间线
-    years = list(range(len(milestones)))
+    # 添加时间线（点数超过图表宽度时降采样，首尾里程碑始终保留）
+    years = np.arange(len(milestones))
+    scores = np.array([m.get('score', 50) for m in milestones], dtype=float)
+    labels = np.array([m.get('label', '') for m in milestones], dtype=object)
+    kept, info = downsample_series(years, scores)
     
     fig.add_trace(go.Scatter(
-        x=years,
-        y=[m.get('score', 50) for m in milestones],
+        x=years[kept],
+        y=scores[kept],
         mode='lines+markers+text',
-        text=[m.get('label', '') for m in milestones],
+        text=labels[kept],
         textposition="top center",
         line=dict(color='#00C851', width=3),
         marker=dict(size=15, color='#00C851'),
@@ -347,12 +899,137 @@ def create_career_path_timeline(current_industry: str, target_industry: str,
         xaxis_title="时间（年）",
         yaxis_title="职业价值指数",
         height=400,
-        showlegend=False
+        showlegend=False,
+        meta={"downsample": info}
     )
     
     return fig
 
 
+TRAJECTORY_COLORS = ['#00C851', '#33B5E5', '#AA66CC', '#FFBB33', '#2BBBAD', '#CC0000']
+
+
+def create_trajectory_comparison_chart(years: List[int], stay, targets, stay_name: str,
+                                       target_names: List[str], crossovers=None):
+    """
+    创建“留下 vs N个转型目标”多轨对比图
+
+    Args:
+        years: 年份序列
+        stay: 留下轨迹 (T,)
+        targets: 转型轨迹矩阵 (N, T)
+        stay_name: 当前行业名称
+        target_names: 目标行业名称列表（与 targets 行对应）
+        crossovers: 交叉点布尔矩阵 (N, T)，True 处标注“转型收益超过留下”
+
+    Returns:
+        Plotly Figure 对象
+    """
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=years, y=stay,
+        mode='lines+markers',
+        name=f'留在{stay_name}',
+        line=dict(color='#FF8800', width=3, dash='dash')
+    ))
+
+    for row, name in enumerate(target_names):
+        color = TRAJECTORY_COLORS[row % len(TRAJECTORY_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=years, y=targets[row],
+            mode='lines+markers',
+            name=f'转型{name}',
+            line=dict(color=color, width=3)
+        ))
+
+    if crossovers is not None:
+        for row, col in zip(*np.nonzero(crossovers)):
+            fig.add_annotation(
+                x=years[col], y=targets[row][col],
+                text=f"{target_names[row]}<br>收益超过留下",
+                showarrow=True,
+                arrowhead=2
+            )
+
+    fig.update_layout(
+        title=f"{len(years) - 1}年多轨对比：留下 vs 转型",
+        xaxis_title="年份",
+        yaxis_title="职业价值指数",
+        height=500,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02)
+    )
+
+    return fig
+
+
+def _hex_to_rgba(color: str, alpha: float) -> str:
+    """将 #RRGGBB 颜色转换为带透明度的 rgba 字符串"""
+    color = color.lstrip('#')
+    r, g, b = (int(color[i:i + 2], 16) for i in (0, 2, 4))
+    return f"rgba({r}, {g}, {b}, {alpha})"
+
+
+def create_outcome_band_chart(years: List[int], bands: Dict, names: List[str],
+                              colors: Optional[List[str]] = None, title: str = "职业价值分布区间（蒙特卡洛模拟）"):
+    """
+    创建蒙特卡洛模拟的分位数区间图（P10-P90 阴影 + P50 中位线）
+
+    Args:
+        years: 年份序列
+        bands: simulate_outcome_bands 的输出，P10/P50/P90 为 (情景 × 年) 矩阵
+        names: 情景名称列表（与 bands 行对应）
+        colors: 各情景颜色，默认使用 TRAJECTORY_COLORS
+        title: 图表标题
+
+    Returns:
+        Plotly Figure 对象
+    """
+    colors = colors or TRAJECTORY_COLORS
+    fig = go.Figure()
+
+    for row, name in enumerate(names):
+        color = colors[row % len(colors)]
+        fig.add_trace(go.Scatter(
+            x=years, y=bands["P90"][row],
+            mode='lines',
+            line=dict(width=0),
+            legendgroup=name,
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=years, y=bands["P10"][row],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=_hex_to_rgba(color, 0.2),
+            name=f'{name} P10-P90',
+            legendgroup=name,
+            customdata=bands["P90"][row],
+            hovertemplate='P10: %{y:.0f}<br>P90: %{customdata:.0f}<extra>' + name + '</extra>'
+        ))
+        fig.add_trace(go.Scatter(
+            x=years, y=bands["P50"][row],
+            mode='lines+markers',
+            line=dict(color=color, width=3),
+            name=f'{name} 中位数',
+            legendgroup=name,
+            hovertemplate='P50: %{y:.0f}<extra>' + name + '</extra>'
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title="年份",
+        yaxis_title="职业价值指数",
+        height=450,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02)
+    )
+
+    return fig
+
+
 def create_gauge_chart(value: int, title: str = "综合评分"):
     """
     创建仪表盘图
@@ -364,6 +1041,28 @@ def create_gauge_chart(value: int, title: str = "综合评分"):
     Returns:
         Plotly Figure 对象
     """
+    return _get_cached_figure(
+        ("gauge", "", repr((value, title)), None),
+        lambda: _build_gauge_spec(value, title)
+    )
+
+
+def _build_gauge_spec(value: int, title: str) -> go.Figure:
+    """基于模板构建仪表盘图（跳过校验）"""
+    template = _get_figure_template("gauge", lambda: _build_gauge_chart(0, ""))
+    trace = template["data"][0]
+    gauge = trace["gauge"]
+    trace = {
+        **trace,
+        "value": value,
+        "title": {**trace["title"], "text": title},
+        "gauge": {**gauge, "threshold": {**gauge["threshold"], "value": value}},
+    }
+    return _figure_from_spec({"data": [trace], "layout": template["layout"]})
+
+
+def _build_gauge_chart(value: int, title: str) -> go.Figure:
+    """构建仪表盘图（完整校验版本，用于生成模板和一致性校验）"""
     fig = go.Figure(go.Indicator(
         mode="gauge+number+delta",
         value=value,
@@ -392,3 +1091,119 @@ def create_gauge_chart(value: int, title: str = "综合评分"):
     fig.update_layout(height=300)
     
     return fig
+
+
+def benchmark_quadrant_chart(sizes=(1000, 10000, 50000),
+                             csv_path: str = "data/细分领域行业周期研判表.csv") -> pd.DataFrame:
+    """
+    对比 SVG 与 WebGL 两种象限图在不同数据规模下的构建耗时与 JSON 体积
+
+    通过对知识库行业有放回抽样生成指定行数的数据（行业名称追加序号以保证唯一）。
+
+    Args:
+        sizes: 测试的数据行数
+        csv_path: 行业周期数据CSV文件路径
+
+    Returns:
+        基准测试结果 DataFrame
+    """
+    import time
+
+    source = pd.read_csv(csv_path, encoding='utf-8').dropna(subset=['行业名称'])
+    results = []
+    for size in sizes:
+        sample = source.sample(n=size, replace=True, random_state=0).reset_index(drop=True)
+        sample['行业名称'] = sample['行业名称'] + "#" + sample.index.astype(str)
+        for mode in ("svg", "webgl"):
+            start = time.perf_counter()
+            fig = _build_cycle_quadrant_base(sample, webgl=(mode == "webgl"))
+            build_ms = (time.perf_counter() - start) * 1000
+            results.append({
+                "行数": size,
+                "渲染模式": mode,
+                "构建耗时(ms)": round(build_ms, 1),
+                "JSON体积(KB)": round(len(fig.to_json()) / 1024, 1),
+            })
+    return pd.DataFrame(results)
+
+
+def check_fast_figure_parity() -> Dict[str, bool]:
+    """
+    校验轻量规格与完整校验版本生成的图表是否完全一致
+
+    Returns:
+        每种图表的一致性结果
+    """
+    radar_cases = [
+        ({"政策支持": 80, "市场需求": 65, "技术成熟": 40, "资本热度": 90, "人才缺口": 55}, "行业指标雷达图"),
+        ({"A": 0, "B": 100, "C": 33.3}, "自定义标题"),
+    ]
+    sentinel_cases = [
+        [{"status": i % 2 == 0} for i in range(len(SENTINEL_RADAR_LABELS))],
+        [{"status": True}] * len(SENTINEL_RADAR_LABELS),
+    ]
+    gauge_cases = [(0, "综合评分"), (73, "转型可行性")]
+
+    return {
+        "radar": all(create_radar_chart(ind, title).to_dict() == _build_radar_chart(ind, title).to_dict()
+                     for ind, title in radar_cases),
+        "sentinel_radar": all(create_sentinel_radar(ind).to_dict() == _build_sentinel_radar(ind).to_dict()
+                              for ind in sentinel_cases),
+        "gauge": all(_build_gauge_spec(v, t).to_dict() == _build_gauge_chart(v, t).to_dict()
+                     for v, t in gauge_cases),
+    }
+
+
+def benchmark_fast_figures(repeat: int = 200) -> pd.DataFrame:
+    """
+    对比轻量规格与完整校验版本的单图构建耗时
+
+    Args:
+        repeat: 每种图表的重复构建次数
+
+    Returns:
+        基准测试结果 DataFrame
+    """
+    import time
+
+    radar_input = {"政策支持": 80, "市场需求": 65, "技术成熟": 40, "资本热度": 90, "人才缺口": 55}
+    sentinel_input = [{"status": i % 2 == 0} for i in range(len(SENTINEL_RADAR_LABELS))]
+    cases = {
+        "radar": (lambda: _build_radar_chart(radar_input, "雷达图"),
+                  lambda: create_radar_chart(radar_input, "雷达图")),
+        "sentinel_radar": (lambda: _build_sentinel_radar(sentinel_input),
+                           lambda: create_sentinel_radar(sentinel_input)),
+        "gauge": (lambda: _build_gauge_chart(73, "综合评分"),
+                  lambda: _build_gauge_spec(73, "综合评分")),
+    }
+
+    def _mean_ms(build: Callable[[], go.Figure]) -> float:
+        build()  # 预热（生成模板）
+        start = time.perf_counter()
+        for _ in range(repeat):
+            build()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    results = []
+    for name, (validated, fast) in cases.items():
+        validated_ms, fast_ms = _mean_ms(validated), _mean_ms(fast)
+        results.append({
+            "图表": name,
+            "完整校验(ms)": round(validated_ms, 2),
+            "轻量规格(ms)": round(fast_ms, 2),
+            "加速比": round(validated_ms / fast_ms, 1),
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("周期象限图渲染基准测试")
+    print("=" * 50)
+    print(benchmark_quadrant_chart().to_string(index=False))
+
+    print("=" * 50)
+    print("轻量图表规格一致性校验与基准测试")
+    print("=" * 50)
+    print(check_fast_figure_parity())
+    print(benchmark_fast_figures().to_string(index=False))